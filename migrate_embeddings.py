@@ -0,0 +1,13 @@
+# Migration des embeddings existants de FLOAT8[] vers le stockage compact bytea float32.
+# À lancer une fois après avoir mis EMBED_STOCKAGE=float32 dans le fichier .env :
+# les nouvelles chansons sont alors directement enregistrées en float32.
+# Sans ce réglage, rien n'est converti : la conversion vide la colonne FLOAT8[].
+# La colonne pgvector est remplie séparément par migrate_pgvector.py.
+from dao.dao_chanson import DAO_chanson
+
+dao = DAO_chanson()
+if dao.stockage_embeddings == "float32":
+    nb_converties = dao.migrer_embeddings_float32()
+    print(f"{nb_converties} embeddings convertis en float32")
+else:
+    print("EMBED_STOCKAGE ne vaut pas float32 : aucun embedding converti")
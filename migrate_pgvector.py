@@ -0,0 +1,11 @@
+# Remplissage de la colonne pgvector des chansons enregistrées avant l'activation de pgvector.
+# À lancer une fois après avoir renseigné EMBED_PGVECTOR dans le fichier .env et lancé
+# migrate_schema.py (création de l'extension, de la colonne et de l'index).
+from dao.dao_chanson import DAO_chanson
+
+dao = DAO_chanson()
+if dao.index_pgvector:
+    nb_migrees = dao.migrer_embeddings_pgvector()
+    print(f"{nb_migrees} embeddings copiés dans la colonne pgvector")
+else:
+    print("EMBED_PGVECTOR n'est pas renseigné : aucun embedding copié")
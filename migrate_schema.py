@@ -0,0 +1,6 @@
+# Migration du schéma d'une BD créée par une version précédente de l'application.
+# À lancer une fois après une mise à jour : l'API ne modifie plus le schéma à chaque requête.
+from dao.dao import DAO
+
+DAO().migrer_schema()
+print("Schéma de la BD à jour")
@@ -0,0 +1,19 @@
+# Reconstruction hors ligne de l'instantané des embeddings, de l'index IVF et de la projection
+# de l'index en deux étapes du catalogue
+# (par exemple après le rechargement nocturne des chansons). L'API ouvre ces fichiers tant
+# que le catalogue n'a pas changé.
+from service.index_catalogue_service import IndexCatalogueService
+
+catalogue = IndexCatalogueService()
+if catalogue.snapshot is not None:
+    version = catalogue.reconstruire_snapshot()
+    print(f"Instantané des embeddings écrit : version {version} -> {catalogue.snapshot.dossier}")
+if catalogue.mode == "ivf":
+    index = catalogue.reconstruire_ivf()
+    print(f"Index IVF reconstruit : {len(index)} chansons -> {catalogue.ivf_fichier}")
+if catalogue.mode == "projection":
+    index = catalogue.reconstruire_projection()
+    print(
+        f"Projection apprise : {index.projection.shape[0]} -> {index.projection.shape[1]} "
+        f"dimensions -> {catalogue.projection_fichier}"
+    )
@@ -1,7 +1,7 @@
 import logging
 from typing import List, Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Response
 from fastapi.responses import RedirectResponse
 from pydantic import BaseModel
 
@@ -22,7 +22,7 @@ chanson_client = ChansonClient()
 class ParolesModel(BaseModel):
     """Modèle de représentation des paroles et du vecteur d'embedding."""
 
-    vecteur: List[float]
+    vecteur: Optional[List[float]] = None
     content: Optional[str] = None
 
 
@@ -31,7 +31,7 @@ class ChansonModel(BaseModel):
 
     titre: str
     artiste: str
-    paroles: Optional[ParolesModel]
+    paroles: Optional[ParolesModel] = None
     # année: Optional[int]
     model_config = {"from_attributes": True}
 
@@ -53,6 +53,22 @@ class PlaylistCreationModel(BaseModel):
     nbsongs: int  # Nombre de chansons souhaitées
 
 
+class PlaylistsLotModel(BaseModel):
+    """Modèle d'entrée pour la création de plusieurs playlists en un seul lot."""
+
+    playlists: List[PlaylistCreationModel]
+
+
+class PlaylistResultatModel(BaseModel):
+    """Résultat de la création d'une playlist d'un lot : la playlist ou l'erreur."""
+
+    nom: str
+    playlist: Optional[PlaylistModel] = None
+    erreur: Optional[str] = None
+
+    model_config = {"from_attributes": True}
+
+
 class NewChansonInput(BaseModel):
     """
     Modèle Pydantic pour les données reçues lors d'une requête POST.
@@ -71,6 +87,65 @@ class ParolesContentModel(BaseModel):
     paroles: str
 
 
+class ResultatRechercheModel(BaseModel):
+    """Modèle pour un résultat de recherche de chansons, avec son score."""
+
+    titre: str
+    artiste: str
+    score: float
+
+
+# Valeur du paramètre include : champs facultatifs des chansons renvoyés par défaut
+INCLUDE_DEFAUT = "paroles,vecteur"
+DESCRIPTION_INCLUDE = (
+    "Champs facultatifs des chansons, séparés par des virgules : paroles (texte), "
+    "vecteur (embedding). Vide : titres et artistes seulement."
+)
+
+
+# Pagination par clé, sur demande (limit) : l'en-tête de réponse porte le curseur de la
+# page suivante
+ENTETE_CURSEUR = "X-Next-Cursor"
+DESCRIPTION_LIMIT = "Taille de page. Absent : toute la liste, sans pagination."
+DESCRIPTION_AFTER = (
+    "Curseur opaque de la page suivante, lu dans l'en-tête X-Next-Cursor de la page "
+    "précédente. Absent : première page."
+)
+
+
+def lire_include(include: str) -> tuple[str, ...]:
+    """Convertit le paramètre include en champs facultatifs pour la DAO."""
+    return tuple(champ.strip() for champ in include.split(",") if champ.strip())
+
+
+def playlist_vers_model(playlist) -> PlaylistModel:
+    """Convertit un objet Playlist métier en PlaylistModel."""
+    chansons_model = []
+    for chanson in playlist.chansons:
+        # Gestion des paroles (optionnelles)
+        paroles_model = None
+        if chanson.paroles:
+            paroles_model = ParolesModel(
+                vecteur=chanson.paroles.vecteur, content=chanson.paroles.content
+            )
+
+        # Création du modèle de chanson
+        chanson_model = ChansonModel(
+            titre=chanson.titre,
+            artiste=chanson.artiste,
+            # annee=chanson.annee,
+            paroles=paroles_model,
+        )
+        chansons_model.append(chanson_model)
+
+    # Création du modèle de playlist final
+    return PlaylistModel(
+        id_playlist=getattr(playlist, "id", None),
+        nom=playlist.nom,
+        chansons=chansons_model,
+    )
+
+
 #   Redirection automatique vers la documentation interactive
 
 
@@ -115,30 +190,7 @@ async def create_playlist(data: PlaylistCreationModel):
             raise HTTPException(status_code=500, detail="La création de la playlist a échoué")
 
         # Conversion de l'objet Playlist métier en PlaylistModel
-        chansons_model = []
-        for chanson in nouvelle_playlist_objet.chansons:
-            # Gestion des paroles (optionnelles)
-            paroles_model = None
-            if chanson.paroles:
-                paroles_model = ParolesModel(
-                    vecteur=chanson.paroles.vecteur, content=chanson.paroles.content
-                )
-
-            # Création du modèle de chanson
-            chanson_model = ChansonModel(
-                titre=chanson.titre,
-                artiste=chanson.artiste,
-                # annee=chanson.annee,
-                paroles=paroles_model,
-            )
-            chansons_model.append(chanson_model)
-
-        # Création du modèle de playlist final
-        playlist_model = PlaylistModel(
-            id_playlist=getattr(nouvelle_playlist_objet, "id", None),
-            nom=nouvelle_playlist_objet.nom,
-            chansons=chansons_model,
-        )
+        playlist_model = playlist_vers_model(nouvelle_playlist_objet)
 
         return playlist_model
 
@@ -150,49 +202,107 @@ async def create_playlist(data: PlaylistCreationModel):
         raise HTTPException(status_code=500, detail=f"Erreur interne: {e}")
 
 
+@app.post("/playlists/batch", response_model=List[PlaylistResultatModel], tags=["Playlists"])
+async def create_playlists(data: PlaylistsLotModel):
+    """
+    Crée plusieurs playlists en un seul lot, à partir de couples (nom/mot-clé, nbsongs).
+
+    - Tous les mots-clés sont vectorisés et comparés au catalogue ensemble
+    - Toutes les playlists sont enregistrées en une seule transaction
+    - Retourne, pour chaque demande et dans l'ordre, la playlist créée ou l'erreur rencontrée
+    """
+    resultats = [None] * len(data.playlists)
+    demandes, positions = [], []
+    # Validation des entrées : une demande invalide n'empêche pas les autres
+    for i, demande in enumerate(data.playlists):
+        if demande.nbsongs <= 0 or demande.nbsongs > 50:
+            erreur = "Le nombre de chansons doit être entre 1 et 50"
+        elif len(demande.nom.strip()) < 2:
+            erreur = "Le nom/mot-clé doit contenir au moins 2 caractères"
+        else:
+            demandes.append((demande.nom, demande.nbsongs))
+            positions.append(i)
+            continue
+        resultats[i] = PlaylistResultatModel(nom=demande.nom, erreur=erreur)
+    try:
+        creees = playlist_client.request_playlists(demandes) if demandes else []
+    except Exception as e:
+        logging.error(f"Erreur lors de la création du lot de playlists : {e}")
+        raise HTTPException(status_code=500, detail=f"Erreur interne: {e}")
+    for i, (playlist, erreur) in zip(positions, creees):
+        resultats[i] = PlaylistResultatModel(
+            nom=data.playlists[i].nom,
+            playlist=playlist_vers_model(playlist) if playlist else None,
+            erreur=erreur,
+        )
+    return resultats
+
+
 @app.get("/playlists", response_model=List[PlaylistModel], tags=["Playlists"])
-async def get_all_playlists():
+async def get_all_playlists(
+    response: Response,
+    include: str = Query(INCLUDE_DEFAUT, description=DESCRIPTION_INCLUDE),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description=DESCRIPTION_LIMIT),
+    after: Optional[str] = Query(None, description=DESCRIPTION_AFTER),
+):
     """
-    Récupère la liste de toutes les playlists via le client.
+    Récupère les playlists via le client, par ordre de création.
+    Les paroles et vecteurs des chansons ne sont lus en BD que s'ils sont demandés (include).
+    Si limit est renseigné, seule une page est renvoyée et le curseur de la page suivante
+    est dans l'en-tête X-Next-Cursor (absent à la dernière page).
     """
     try:
-        playlists = playlist_client.get_playlists()
+        playlists, curseur = playlist_client.get_playlists_page(
+            limit, after, lire_include(include)
+        )
+        if curseur:
+            response.headers[ENTETE_CURSEUR] = curseur
         return playlists
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         logging.error(f"Erreur lors de la récupération des playlists via client : {e}")
         raise HTTPException(status_code=500, detail="Erreur interne.")
 
 
 @app.get("/playlists/{nom}", response_model=PlaylistModel, tags=["Playlists"])
-async def get_playlist_by_nom(nom: str):
+async def get_playlist_by_nom(
+    nom: str, include: str = Query(INCLUDE_DEFAUT, description=DESCRIPTION_INCLUDE)
+):
     """
     Récupère une playlist spécifique par son nom via le client.
     """
     try:
-        playlist = playlist_client.get_playlist(nom)
+        playlist = playlist_client.get_playlist(nom, lire_include(include))
         if not playlist:
             raise HTTPException(status_code=404, detail="Playlist introuvable.")
         return playlist
     except HTTPException as he:
         raise he
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         logging.error(f"Erreur récupération playlist {nom} via client : {e}")
         raise HTTPException(status_code=500, detail="Erreur interne.")
 
 
 @app.get("/playlists/{nom}/songs", response_model=List[ChansonModel], tags=["Playlists"])
-async def get_songs_from_playlist(nom: str):
+async def get_songs_from_playlist(
+    nom: str, include: str = Query(INCLUDE_DEFAUT, description=DESCRIPTION_INCLUDE)
+):
     """
     Retourne toutes les chansons d'une playlist via le client.
     """
     try:
-        chansons = playlist_client.get_playlist_chansons(nom)
+        chansons = playlist_client.get_playlist_chansons(nom, lire_include(include))
 
         if chansons is None:
             raise HTTPException(status_code=404, detail="Playlist introuvable.")
         return chansons
     except HTTPException as he:
         raise he
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         logging.error(f"Erreur récupération chansons de playlist {nom} via client : {e}")
         raise HTTPException(status_code=500, detail="Erreur interne.")
@@ -204,15 +314,29 @@ async def get_songs_from_playlist(nom: str):
 @app.get(
     "/chansons/",
     response_model=List[ChansonModel],
-    summary="Retourne la liste complète des chansons disponibles.",
+    summary="Retourne la liste des chansons disponibles, éventuellement par pages.",
 )
-async def get_all_chansons():
+async def get_all_chansons(
+    response: Response,
+    include: str = Query(INCLUDE_DEFAUT, description=DESCRIPTION_INCLUDE),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description=DESCRIPTION_LIMIT),
+    after: Optional[str] = Query(None, description=DESCRIPTION_AFTER),
+):
     """
-    Récupère toutes les chansons via le client.
+    Récupère les chansons via le client, par ordre d'ajout.
+    Les paroles et vecteurs ne sont lus en BD que s'ils sont demandés (include).
+    Si limit est renseigné, seule une page est renvoyée et le curseur de la page suivante
+    est dans l'en-tête X-Next-Cursor (absent à la dernière page).
     """
     try:
-        liste_chansons = chanson_client.get_chansons()
+        liste_chansons, curseur = chanson_client.get_chansons_page(
+            limit, after, lire_include(include)
+        )
+        if curseur:
+            response.headers[ENTETE_CURSEUR] = curseur
         return liste_chansons
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         logging.error(f"Erreur lors de la récupération des chansons via client: {e}")
         raise HTTPException(status_code=500, detail="Erreur interne.")
@@ -237,6 +361,38 @@ async def add_chanson_from_api(chanson_data: NewChansonInput):
         raise HTTPException(status_code=500, detail=f"Échec de la création de la chanson: {e}")
 
 
+@app.get(
+    "/chansons/artistes",
+    response_model=List[str],
+    summary="Retourne la liste des artistes du catalogue (noms seulement).",
+)
+async def get_artistes():
+    """
+    Récupère les artistes distincts via le client, sans les chansons.
+    """
+    try:
+        return chanson_client.get_artistes()
+    except Exception as e:
+        logging.error(f"Erreur lors de la récupération des artistes via client: {e}")
+        raise HTTPException(status_code=500, detail="Erreur interne.")
+
+
+@app.get(
+    "/chansons/titres",
+    response_model=List[str],
+    summary="Retourne les titres des chansons d'un artiste (noms seulement).",
+)
+async def get_titres_artiste(artiste: str):
+    """
+    Récupère les titres des chansons d'un artiste via le client.
+    """
+    try:
+        return chanson_client.get_titres(artiste)
+    except Exception as e:
+        logging.error(f"Erreur récupération des titres de {artiste} via client: {e}")
+        raise HTTPException(status_code=500, detail="Erreur interne.")
+
+
 @app.get(
     "/chansons/search",  # NOUVEAU PATH
     response_model=ChansonModel,
@@ -266,6 +422,41 @@ async def get_chanson_by_search(
         raise HTTPException(status_code=500, detail="Erreur interne.")
 
 
+@app.get(
+    "/chansons/fuzzy",
+    response_model=List[ResultatRechercheModel],
+    summary="Recherche approchée de chansons par titre et/ou artiste (fautes tolérées).",
+)
+async def search_chansons_fuzzy(
+    titre: Optional[str] = None,
+    artiste: Optional[str] = None,
+    seuil: float = 0.3,
+    limit: int = 10,
+):
+    """
+    Retourne les chansons dont le titre et/ou l'artiste ressemblent à ceux demandés,
+    par similarité décroissante.
+    """
+    if not titre and not artiste:
+        raise HTTPException(status_code=422, detail="Un titre ou un artiste est nécessaire.")
+    if not 0 <= seuil <= 1 or limit <= 0:
+        raise HTTPException(
+            status_code=422, detail="seuil doit être entre 0 et 1 et limit un entier positif."
+        )
+    try:
+        resultats = chanson_client.search_titre_artiste(titre, artiste, seuil, limit)
+        return [
+            ResultatRechercheModel(titre=chanson.titre, artiste=chanson.artiste, score=score)
+            for chanson, score in resultats
+        ]
+    except RuntimeError as e:
+        # Recherche approchée non activée, ou extension pg_trgm absente
+        raise HTTPException(status_code=501, detail=f"Recherche approchée indisponible : {e}")
+    except Exception as e:
+        logging.error(f"Erreur recherche approchée '{titre}' de {artiste} via client: {e}")
+        raise HTTPException(status_code=500, detail="Erreur interne.")
+
+
 @app.get(
     "/chansons/lyrics/search",  # NOUVEAU PATH
     response_model=ParolesContentModel,
@@ -291,6 +482,28 @@ async def get_lyrics_for_song(titre: str, artiste: str):  # NOUVEAUX PARAMETRES
         raise HTTPException(status_code=500, detail="Erreur interne.")
 
 
+@app.get(
+    "/chansons/lyrics/query",
+    response_model=List[ResultatRechercheModel],
+    summary="Recherche plein texte dans les paroles des chansons (classement BM25).",
+)
+async def search_lyrics(q: str, k: int = 10):
+    """
+    Retourne les k chansons dont les paroles correspondent le mieux aux mots de q.
+    """
+    if k <= 0:
+        raise HTTPException(status_code=422, detail="k doit être un entier positif.")
+    try:
+        resultats = chanson_client.search_lyrics(q, k)
+        return [
+            ResultatRechercheModel(titre=chanson.titre, artiste=chanson.artiste, score=score)
+            for chanson, score in resultats
+        ]
+    except Exception as e:
+        logging.error(f"Erreur recherche dans les paroles '{q}' via client: {e}")
+        raise HTTPException(status_code=500, detail="Erreur interne.")
+
+
 # --- Lancement de l'application ---
 if __name__ == "__main__":
     import uvicorn
@@ -17,6 +17,8 @@ class Chanson:
         Année de sortie de la chanson. Par défaut None.
     paroles : Paroles ou None
         Objet Paroles associé à la chanson. Par défaut None.
+    id_chanson : int ou None
+        Identifiant de la chanson en BD, connu une fois la chanson enregistrée. Par défaut None.
 
     Méthodes
     --------
@@ -31,11 +33,19 @@ class Chanson:
     Imagine - John Lennon (1971)
     """
 
-    def __init__(self, titre: str, artiste: str, annee: int = None, paroles: Paroles = None):
+    def __init__(
+        self,
+        titre: str,
+        artiste: str,
+        annee: int = None,
+        paroles: Paroles = None,
+        id_chanson: int = None,
+    ):
         self.titre = titre
         self.artiste = artiste
         self.annee = annee
         self.paroles = paroles
+        self.id_chanson = id_chanson
 
     def __eq__(self, chanson2):
         """Pour tester si deux objets chansons sont identiques"""
@@ -8,6 +8,11 @@ class Paroles:
         Contenu textuel des paroles.
     vecteur : list[float] ou None
         Représentation vectorielle (embedding) des paroles. Par défaut None.
+    norme : float ou None
+        Norme euclidienne du vecteur, calculée une seule fois à l'insertion en BD.
+        Par défaut None.
+    id_chanson : int ou None
+        Identifiant en BD de la chanson à laquelle appartiennent les paroles. Par défaut None.
 
     Méthodes
     --------
@@ -21,9 +26,13 @@ class Paroles:
     Here comes the sun...
     """
 
-    def __init__(self, content: str, vecteur: list = None):
+    def __init__(
+        self, content: str, vecteur: list = None, norme: float = None, id_chanson: int = None
+    ):
         self.content = content
         self.vecteur = vecteur
+        self.norme = norme
+        self.id_chanson = id_chanson
 
     def afficher(self) -> str:
         """
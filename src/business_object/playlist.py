@@ -11,6 +11,8 @@ class Playlist:
         Nom attribué à la playlist.
     chansons : list[Chanson]
         Liste des chansons contenues dans la playlist.
+    id_playlist : int ou None
+        Identifiant de la playlist en BD, connu une fois la playlist lue en BD. Par défaut None.
 
     Méthodes
     --------
@@ -30,9 +32,10 @@ class Playlist:
       1. Imagine - John Lennon (1971)
     """
 
-    def __init__(self, nom: str, chansons: list[Chanson] = None):
+    def __init__(self, nom: str, chansons: list[Chanson] = None, id_playlist: int = None):
         self.nom = nom
         self.chansons = chansons if chansons is not None else []
+        self.id_playlist = id_playlist
 
     def afficher(self) -> str:
         """
@@ -1,5 +1,7 @@
 from dao.dao_chanson import DAO_chanson
 from service.chanson_service import ChansonService
+from service.index_lexical_service import IndexLexicalService
+from utils.curseur import decoder_curseur, encoder_curseur
 
 
 class ChansonClient:
@@ -33,16 +35,94 @@ class ChansonClient:
             return "La chanson n'est pas trouvable sur l'API"
         DAO_chanson().add_chanson(new_chanson)
 
-    def get_chansons(self):
+    def add_new_chansons(self, titres_artistes: list[tuple[str, str]]) -> list[str | None]:
+        """
+        Ajoute plusieurs chansons dans la database.
+        Les paroles sont vectorisées par lots, ce qui évite un appel à l'API d'embedding
+        par chanson lors d'un chargement en masse.
+
+        Parameters
+        ----------
+        titres_artistes : list[tuple[str, str]]
+            les couples (titre, artiste) des chansons à ajouter
+
+        Returns
+        ----------
+        list[str | None]
+            pour chaque chanson, None si elle a été ajoutée, sinon un message d'erreur
+        """
+        chansons = [
+            ChansonService().instantiate_chanson(titre, artiste)
+            for titre, artiste in titres_artistes
+        ]
+        trouvees = ChansonService().add_chansons_paroles(chansons)
+        messages = []
+        for chanson, trouvee in zip(chansons, trouvees):
+            if not trouvee:
+                messages.append("La chanson n'est pas trouvable sur l'API")
+                continue
+            DAO_chanson().add_chanson(chanson)
+            messages.append(None)
+        return messages
+
+    def get_chansons(self, champs=DAO_chanson.CHAMPS_PAROLES):
         """
         Récupère et retourne la liste de toutes les chansons de la base de données
 
+        Parameters
+        ----------
+        champs : tuple[str]
+            les champs facultatifs à lire ("paroles", "vecteur")
+
         Returns
         ----------
         list[Chanson]
             une liste de chansons
         """
-        return DAO_chanson().get_chansons()
+        return DAO_chanson().get_chansons(champs)
+
+    def get_chansons_page(
+        self, limite: int, curseur: str = None, champs=DAO_chanson.CHAMPS_PAROLES
+    ):
+        """
+        Récupère une page de chansons, par identifiant croissant (pagination par clé)
+
+        Parameters
+        ----------
+        limite : int ou None
+            le nombre maximal de chansons de la page (None : toutes les chansons suivantes)
+        curseur : str ou None
+            le curseur retourné avec la page précédente (None pour la première page)
+        champs : tuple[str]
+            les champs facultatifs à lire ("paroles", "vecteur")
+
+        Returns
+        ----------
+        tuple[list[Chanson], str | None]
+            les chansons de la page et le curseur de la page suivante (None si c'est la
+            dernière) ; lève ValueError si le curseur est invalide
+        """
+        apres = decoder_curseur(curseur) if curseur else None
+        if limite is None:
+            return DAO_chanson().get_chansons(champs, None, apres) or [], None
+        # Une chanson de plus que la page : elle indique s'il reste une page suivante
+        chansons = DAO_chanson().get_chansons(champs, limite + 1, apres) or []
+        if len(chansons) <= limite:
+            return chansons, None
+        chansons = chansons[:limite]
+        return chansons, encoder_curseur(chansons[-1].id_chanson)
+
+    def get_artistes(self) -> list[str]:
+        """
+        Retourne la liste des artistes distincts du catalogue
+        """
+        return DAO_chanson().get_artistes()
+
+    def get_titres(self, artiste: str) -> list[str]:
+        """
+        Retourne la liste des titres des chansons d'un artiste
+        """
+        return DAO_chanson().get_titres_from_artiste(artiste)
 
     def get_chanson(self, titre, artiste):
         """
@@ -75,3 +155,46 @@ class ChansonClient:
             }
 
         return None
+
+    def search_lyrics(self, requete: str, k: int = 10):
+        """
+        Recherche plein texte dans les paroles du catalogue (index inversé BM25).
+
+        Parameters
+        ----------
+        requete : str
+            les mots à chercher dans les paroles
+        k : int
+            le nombre maximal de chansons retournées
+
+        Returns
+        ----------
+        list[tuple[Chanson, float]]
+            les chansons trouvées et leur score BM25, du plus pertinent au moins pertinent
+        """
+        resultats = IndexLexicalService().rechercher(requete, k)
+        scores = dict(resultats)
+        chansons = DAO_chanson().get_chansons_from_ids([id_chanson for id_chanson, _ in resultats])
+        return [(chanson, scores[chanson.paroles.id_chanson]) for chanson in chansons]
+
+    def search_titre_artiste(
+        self, titre: str = None, artiste: str = None, seuil: float = 0.3, limite: int = 10
+    ):
+        """
+        Recherche approchée de chansons par titre et/ou artiste (tolère les fautes de frappe).
+
+        Parameters
+        ----------
+        titre, artiste : str ou None
+            les critères de recherche (au moins un des deux)
+        seuil : float
+            similarité minimale, entre 0 et 1
+        limite : int
+            le nombre maximal de chansons retournées
+
+        Returns
+        ----------
+        list[tuple[Chanson, float]]
+            les chansons trouvées et leur similarité, de la plus proche à la moins proche
+        """
+        return DAO_chanson().get_chansons_approchees(titre, artiste, seuil, limite)
@@ -1,5 +1,6 @@
 from dao.dao_playlist import DAO_playlist
 from service.playlist_service import PlaylistService
+from utils.curseur import decoder_curseur, encoder_curseur
 
 
 class PlaylistClient:
@@ -17,18 +18,70 @@ class PlaylistClient:
         DAO_playlist().add_playlist(new_playlist)
         return new_playlist
 
-    def get_playlists(self):
+    def request_playlists(self, demandes):
         """
-        Récupère et retourne la liste de toutes les playlists de la base de données
+        Crée plusieurs playlists en un seul lot à partir de couples (mot-clé, nombre de
+        chansons) et les enregistre toutes en une seule transaction.
+
+        Returns
+        ----------
+        list[tuple[Playlist | None, str | None]]
+            pour chaque demande, dans l'ordre, la playlist créée ou le message d'erreur
+        """
+        resultats = PlaylistService().instantiate_playlists(demandes)
+        playlists = [playlist for playlist, _ in resultats if playlist is not None]
+        creees = iter(DAO_playlist().add_playlists(playlists))
+        for i, (playlist, _) in enumerate(resultats):
+            if playlist is not None and not next(creees):
+                resultats[i] = (
+                    None,
+                    f"Une playlist nommée '{playlist.nom}' existe déjà "
+                    "ou l'une de ses chansons est introuvable",
+                )
+        return resultats
+
+    def get_playlists(self, champs=DAO_playlist.CHAMPS_PAROLES):
+        """
+        Récupère et retourne la liste de toutes les playlists de la base de données,
+        avec les seuls champs facultatifs demandés des chansons ("paroles", "vecteur")
 
         Returns
         ----------
         list[Playlist]
             une liste de playlists
         """
-        return DAO_playlist().get_playlists()
+        return DAO_playlist().get_playlists(champs)
+
+    def get_playlists_page(self, limite, curseur=None, champs=DAO_playlist.CHAMPS_PAROLES):
+        """
+        Récupère une page de playlists, par identifiant croissant (pagination par clé)
+
+        Parameters
+        ----------
+        limite : int ou None
+            le nombre maximal de playlists de la page (None : toutes les playlists suivantes)
+        curseur : str ou None
+            le curseur retourné avec la page précédente (None pour la première page)
+        champs : tuple[str]
+            les champs facultatifs à lire pour les chansons ("paroles", "vecteur")
+
+        Returns
+        ----------
+        tuple[list[Playlist], str | None]
+            les playlists de la page et le curseur de la page suivante (None si c'est la
+            dernière) ; lève ValueError si le curseur est invalide
+        """
+        apres = decoder_curseur(curseur) if curseur else None
+        if limite is None:
+            return DAO_playlist().get_playlists(champs, None, apres) or [], None
+        # Une playlist de plus que la page : elle indique s'il reste une page suivante
+        playlists = DAO_playlist().get_playlists(champs, limite + 1, apres) or []
+        if len(playlists) <= limite:
+            return playlists, None
+        playlists = playlists[:limite]
+        return playlists, encoder_curseur(playlists[-1].id_playlist)
 
-    def get_playlist(self, nom):
+    def get_playlist(self, nom, champs=DAO_playlist.CHAMPS_PAROLES):
         """
         Récupère une playlist à partir de son id
 
@@ -36,15 +89,17 @@ class PlaylistClient:
         ----------
         id : int
             l'id de la playlist à récupérer
+        champs : tuple[str]
+            les champs facultatifs à lire pour les chansons ("paroles", "vecteur")
 
         Returns
         ----------
         Playlist
             un objet playlist
         """
-        return DAO_playlist().get_playlist_from_nom(nom)
+        return DAO_playlist().get_playlist_from_nom(nom, champs)
 
-    def get_playlist_chansons(self, nom):
+    def get_playlist_chansons(self, nom, champs=DAO_playlist.CHAMPS_PAROLES):
         """
         Récupère les chansons d'une playlist à partir de son id
 
@@ -52,13 +107,15 @@ class PlaylistClient:
         ----------
         id : int
             l'id de la playlist à partir de laquelle récupérer les chansons
+        champs : tuple[str]
+            les champs facultatifs à lire pour les chansons ("paroles", "vecteur")
 
         Returns
         ----------
         list[Chanson]
             une liste d'objets chansons
         """
-        playlist = DAO_playlist().get_playlist_from_nom(nom)
+        playlist = DAO_playlist().get_playlist_from_nom(nom, champs)
 
         if playlist:
             return playlist.get_chansons()
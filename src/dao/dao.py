@@ -1,14 +1,53 @@
+import os
 from abc import ABC
 
+from business_object.paroles import Paroles
 from dao.db_connection import DBConnection
+from utils.embedding_binaire import decoder_float32
+from utils.evenements_catalogue import BusCatalogue, EvenementCatalogue
 
 
 class DAO(ABC):
+    # Champs facultatifs des chansons lues en BD : texte des paroles et embedding
+    CHAMPS_PAROLES = ("paroles", "vecteur")
+
     def __init__(self):
         """
         Crée la BD si elle n'est pas créée
+
+        Les embeddings sont stockés en FLOAT8[] (embed_paroles) ou, si la variable
+        d'environnement EMBED_STOCKAGE vaut "float32", en bytea float32 little-endian
+        (embed_paroles_f32), deux fois plus compact et décodé directement par NumPy.
+
+        Si la variable d'environnement EMBED_PGVECTOR vaut "hnsw" ou "ivfflat", l'extension
+        pgvector est activée par migrer_schema : les embeddings sont aussi stockés dans une
+        colonne vector(PGVECTOR_DIMENSION) indexée, et la recherche des chansons les plus proches
+        d'un mot-clé se fait directement en SQL (voir DAO_chanson.get_chansons_proches).
+
+        Le texte des paroles est aussi indexé pour la recherche plein texte de PostgreSQL par
+        migrer_schema : colonne générée tsv_paroles (tsvector, configuration "simple" car le
+        catalogue mêle français et anglais) et index GIN (voir DAO_paroles.get_embeddings_fts).
+        Si la variable d'environnement RECHERCHE_APPROCHEE vaut "trgm", migrer_schema active
+        l'extension pg_trgm et indexe les trigrammes des titres et artistes pour la recherche
+        approchée (voir DAO_chanson.get_chansons_approchees). L'index
+        (artiste, titre) de migrer_schema sert la liste des artistes et des titres d'un artiste.
+
+        La table GENERATION_CHANSON garde un jeton aléatoire, la génération du catalogue : il
+        est tiré à la création des tables et retiré lorsque CHANSON est vidée ou supprimée ;
+        les déclencheurs de migrer_schema le changent aussi à chaque TRUNCATE de CHANSON ou
+        réécriture de ses embeddings. Les fichiers d'index construits hors ligne (instantané,
+        index IVF) enregistrent cette génération et sont ignorés si elle a changé.
         """
         self.ordre_suppr_tables = ["CATALOGUE", "PLAYLIST", "CHANSON"]
+        self.stockage_embeddings = os.environ.get("EMBED_STOCKAGE", "float8").lower()
+        if self.stockage_embeddings not in ("float8", "float32"):
+            raise ValueError("EMBED_STOCKAGE doit valoir 'float8' ou 'float32'")
+        self.index_pgvector = os.environ.get("EMBED_PGVECTOR", "").lower()
+        if self.index_pgvector not in ("", "hnsw", "ivfflat"):
+            raise ValueError("EMBED_PGVECTOR doit valoir '', 'hnsw' ou 'ivfflat'")
+        self.recherche_approchee = os.environ.get("RECHERCHE_APPROCHEE", "").lower()
+        if self.recherche_approchee not in ("", "trgm"):
+            raise ValueError("RECHERCHE_APPROCHEE doit valoir '' ou 'trgm'")
         # Ordre logique de suppression pour respecter les contraintes FK
         with DBConnection().connection as connection:
             with connection.cursor() as cursor:
@@ -22,9 +61,13 @@ class DAO(ABC):
                     titre VARCHAR(255) NOT NULL,
                     artiste VARCHAR(255) NOT NULL,
                     annee INT, 
-                    embed_paroles FLOAT8[] NOT NULL,
+                    embed_paroles FLOAT8[],
+                    embed_paroles_f32 BYTEA,
+                    norme_paroles FLOAT8,
                     str_paroles TEXT NOT NULL,
-                    UNIQUE(titre, artiste)
+                    UNIQUE(titre, artiste),
+                    CONSTRAINT chanson_embedding_present
+                    CHECK (embed_paroles IS NOT NULL OR embed_paroles_f32 IS NOT NULL)
                     );
                     CREATE TABLE IF NOT EXISTS CATALOGUE (
                     id_playlist INT NOT NULL,
@@ -33,9 +76,147 @@ class DAO(ABC):
                     FOREIGN KEY (id_playlist) REFERENCES PLAYLIST(id_playlist) ON DELETE CASCADE,
                     FOREIGN KEY (id_chanson) REFERENCES CHANSON(id_chanson) ON DELETE CASCADE
                     );
+                    CREATE TABLE IF NOT EXISTS GENERATION_CHANSON (valeur TEXT NOT NULL);
+                    INSERT INTO GENERATION_CHANSON (valeur)
+                    SELECT md5(random()::text || clock_timestamp()::text)
+                    WHERE NOT EXISTS (SELECT 1 FROM GENERATION_CHANSON);
+                    """)
+            connection.commit()
+
+    def migrer_schema(self) -> None:
+        """
+        Met à jour le schéma d'une BD créée par une version précédente. À lancer une seule
+        fois (python migrate_schema.py, ou start.py), et non à chaque construction d'une DAO :
+        un ALTER TABLE verrouille CHANSON en exclusif même s'il ne change rien, et le calcul
+        des normes parcourt toute la table.
+        """
+        with DBConnection().connection as connection:
+            with connection.cursor() as cursor:
+                cursor.execute("""
+                    ALTER TABLE CHANSON ADD COLUMN IF NOT EXISTS norme_paroles FLOAT8;
+                    ALTER TABLE CHANSON ADD COLUMN IF NOT EXISTS embed_paroles_f32 BYTEA;
+                    ALTER TABLE CHANSON ALTER COLUMN embed_paroles DROP NOT NULL;
+                    """)
+                # Chaque chanson garde un embedding, dans l'un ou l'autre format de stockage
+                cursor.execute("""
+                    DO $$
+                    BEGIN
+                        IF NOT EXISTS (
+                            SELECT 1 FROM pg_constraint
+                            WHERE conname = 'chanson_embedding_present'
+                        ) THEN
+                            ALTER TABLE CHANSON ADD CONSTRAINT chanson_embedding_present
+                            CHECK (embed_paroles IS NOT NULL OR embed_paroles_f32 IS NOT NULL);
+                        END IF;
+                    END $$;
+                    """)
+                # Recherche plein texte : la colonne générée réécrit la table à son ajout
+                cursor.execute("""
+                    ALTER TABLE CHANSON ADD COLUMN IF NOT EXISTS tsv_paroles tsvector
+                    GENERATED ALWAYS AS (to_tsvector('simple', str_paroles)) STORED;
+                    CREATE INDEX IF NOT EXISTS chanson_tsv_paroles
+                    ON CHANSON USING gin (tsv_paroles);
+                    """)
+                # Liste des artistes et des titres d'un artiste
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS chanson_artiste_titre ON CHANSON (artiste, titre);
+                    """)
+                if self.recherche_approchee:
+                    cursor.execute("""
+                        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+                        CREATE INDEX IF NOT EXISTS chanson_titre_trgm
+                        ON CHANSON USING gin (titre gin_trgm_ops);
+                        CREATE INDEX IF NOT EXISTS chanson_artiste_trgm
+                        ON CHANSON USING gin (artiste gin_trgm_ops);
+                        """)
+                if self.index_pgvector:
+                    cursor.execute(self._schema_pgvector())
+                # Nouvelle génération du catalogue quand CHANSON est tronquée (les id SERIAL
+                # peuvent alors repartir de 1) ou que ses embeddings sont réécrits
+                cursor.execute("""
+                    CREATE OR REPLACE FUNCTION nouvelle_generation_chanson() RETURNS trigger AS $$
+                    BEGIN
+                        UPDATE GENERATION_CHANSON
+                        SET valeur = md5(random()::text || clock_timestamp()::text);
+                        RETURN NULL;
+                    END $$ LANGUAGE plpgsql;
+                    DROP TRIGGER IF EXISTS chanson_generation_truncate ON CHANSON;
+                    CREATE TRIGGER chanson_generation_truncate AFTER TRUNCATE ON CHANSON
+                    FOR EACH STATEMENT EXECUTE FUNCTION nouvelle_generation_chanson();
+                    DROP TRIGGER IF EXISTS chanson_generation_embeddings ON CHANSON;
+                    CREATE TRIGGER chanson_generation_embeddings
+                    AFTER UPDATE OF embed_paroles, embed_paroles_f32 ON CHANSON
+                    FOR EACH STATEMENT EXECUTE FUNCTION nouvelle_generation_chanson();
+                    """)
+                # Calcul des normes des chansons insérées avant l'ajout de la colonne
+                cursor.execute("""
+                    UPDATE CHANSON
+                    SET norme_paroles = (SELECT sqrt(sum(x * x)) FROM unnest(embed_paroles) AS x)
+                    WHERE norme_paroles IS NULL;
                     """)
             connection.commit()
 
+    def _schema_pgvector(self) -> str:
+        """
+        Requête d'activation de pgvector : extension, colonne vector et index de similarité
+        cosinus (HNSW, ou IVFFlat avec PGVECTOR_LISTS listes)
+        """
+        dimension = int(os.environ.get("PGVECTOR_DIMENSION", 1024))
+        if self.index_pgvector == "hnsw":
+            index = "USING hnsw (embed_paroles_vec vector_cosine_ops)"
+        else:
+            listes = int(os.environ.get("PGVECTOR_LISTS", 100))
+            index = f"USING ivfflat (embed_paroles_vec vector_cosine_ops) WITH (lists = {listes})"
+        return f"""
+            CREATE EXTENSION IF NOT EXISTS vector;
+            ALTER TABLE CHANSON ADD COLUMN IF NOT EXISTS embed_paroles_vec vector({dimension});
+            CREATE INDEX IF NOT EXISTS chanson_embed_paroles_{self.index_pgvector}
+            ON CHANSON {index};
+            """
+
+    @staticmethod
+    def _litteral_vector(vecteur: list[float]) -> str:
+        """
+        Représentation textuelle d'un embedding pour le type vector de pgvector
+        """
+        return "[" + ",".join(f"{float(x):.8g}" for x in vecteur) + "]"
+
+    @classmethod
+    def _colonnes_paroles(cls, champs: tuple[str, ...], alias: str = "") -> str:
+        """
+        Colonnes à ajouter au SELECT pour lire les champs facultatifs demandés : les colonnes
+        des champs non demandés ne sont ni lues en BD ni transférées.
+        Lève ValueError pour un champ inconnu.
+        """
+        inconnus = set(champs) - set(cls.CHAMPS_PAROLES)
+        if inconnus:
+            raise ValueError(f"champs inconnus : {', '.join(sorted(inconnus))}")
+        colonnes = []
+        if "vecteur" in champs:
+            colonnes += ["embed_paroles", "embed_paroles_f32"]
+        if "paroles" in champs:
+            colonnes.append("str_paroles")
+        return "".join(f", {alias}{colonne}" for colonne in colonnes)
+
+    def _paroles(self, ligne: dict, champs: tuple[str, ...]) -> Paroles | None:
+        """
+        Paroles d'une ligne de CHANSON limitées aux champs demandés (None si aucun)
+        """
+        if not champs:
+            return None
+        return Paroles(content=ligne.get("str_paroles"), vecteur=self._vecteur(ligne))
+
+    @staticmethod
+    def _vecteur(ligne: dict) -> list[float] | None:
+        """
+        Retourne l'embedding d'une ligne de CHANSON, quel que soit son format de stockage
+        """
+        if ligne.get("embed_paroles") is not None:
+            return ligne["embed_paroles"]
+        if ligne.get("embed_paroles_f32") is not None:
+            return decoder_float32(ligne["embed_paroles_f32"]).tolist()
+        return None
+
     def _del_data_table(self, nom_table: str | None = None) -> str | None:
         """
         Vide la table donnée en argument en majuscule
@@ -43,14 +224,18 @@ class DAO(ABC):
         """
         with DBConnection().connection as connection:
             with connection.cursor() as cursor:
-                if nom_table in self.ordre_suppr_table:
+                if nom_table in self.ordre_suppr_tables:
                     cursor.execute(f"DELETE FROM {nom_table};")
+                    self._retirer_generation(cursor, nom_table)
                     connection.commit()
+                    self._publier_vidage(nom_table)
                     return "table vidée"
                 if nom_table is None:
-                    for nom_table in self.ordre_suppr_table:
-                        cursor.execute(f"DELETE FROM {nom_table};")
+                    for table in self.ordre_suppr_tables:
+                        cursor.execute(f"DELETE FROM {table};")
+                    self._retirer_generation(cursor, nom_table)
                     connection.commit()
+                    self._publier_vidage(nom_table)
                     return "tables vidées"
 
     def _drop_table(self, nom_table: str | None = None) -> str | None:
@@ -62,10 +247,32 @@ class DAO(ABC):
             with connection.cursor() as cursor:
                 if nom_table in self.ordre_suppr_tables:
                     cursor.execute(f"DROP TABLE IF EXISTS {nom_table} CASCADE;")
+                    self._retirer_generation(cursor, nom_table)
                     connection.commit()
+                    self._publier_vidage(nom_table)
                     return "table supprimée"
                 if nom_table is None:
                     for table in self.ordre_suppr_tables:
                         cursor.execute(f"DROP TABLE IF EXISTS {table} CASCADE;")
+                    self._retirer_generation(cursor, nom_table)
                     connection.commit()
+                    self._publier_vidage(nom_table)
                     return "tables supprimées"
+
+    @staticmethod
+    def _retirer_generation(cursor, nom_table: str | None) -> None:
+        """
+        Retire la génération du catalogue quand CHANSON est vidée ou supprimée : une nouvelle
+        est tirée à la prochaine construction d'une DAO, même si le catalogue rechargé a le
+        même nombre de chansons et les mêmes id
+        """
+        if nom_table in ("CHANSON", None):
+            cursor.execute("DROP TABLE IF EXISTS GENERATION_CHANSON;")
+
+    @staticmethod
+    def _publier_vidage(nom_table: str | None) -> None:
+        """
+        Signale aux index en mémoire que toutes les chansons ont disparu
+        """
+        if nom_table in ("CHANSON", None):
+            BusCatalogue().publier(EvenementCatalogue(EvenementCatalogue.VIDAGE))
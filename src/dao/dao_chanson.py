@@ -1,7 +1,15 @@
+import os
+
+import numpy as np
+from psycopg2 import errors
+from psycopg2.extras import execute_values
+
 from business_object.chanson import Chanson
 from business_object.paroles import Paroles
 from dao.dao import DAO
 from dao.db_connection import DBConnection
+from utils.embedding_binaire import decoder_float32, encoder_float32
+from utils.evenements_catalogue import BusCatalogue, EvenementCatalogue
 
 
 class DAO_chanson(DAO):
@@ -25,58 +33,137 @@ class DAO_chanson(DAO):
             raise TypeError("chanson.paroles.vecteur not list")
         if not isinstance(chanson.paroles.content, str):
             raise TypeError("chanson.paroles.content not str")
-        """
-        """
+        if self.stockage_embeddings == "float32":
+            embed_paroles = None
+            embed_paroles_f32 = encoder_float32(chanson.paroles.vecteur)
+            stocke = decoder_float32(embed_paroles_f32)
+        else:
+            embed_paroles = [round(x, 6) for x in chanson.paroles.vecteur]
+            embed_paroles_f32 = None
+            stocke = embed_paroles
+        # La norme est calculée une seule fois ici pour ne plus la recalculer à chaque requête
+        norme_paroles = float(np.linalg.norm(stocke))
+        valeurs = {
+            "titre": chanson.titre,
+            "artiste": chanson.artiste,
+            "annee": chanson.annee,
+            "embed_paroles": embed_paroles,
+            "embed_paroles_f32": embed_paroles_f32,
+            "norme_paroles": norme_paroles,
+            "str_paroles": chanson.paroles.content,
+        }
+        # Avec pgvector, l'embedding est aussi écrit dans la colonne vector indexée
+        colonne_vec, valeur_vec = "", ""
+        if self.index_pgvector:
+            colonne_vec, valeur_vec = ", embed_paroles_vec", ", %(embed_paroles_vec)s::vector"
+            valeurs["embed_paroles_vec"] = self._litteral_vector(stocke)
         with DBConnection().connection as connection:
             with connection.cursor() as cursor:
                 modif = 0
                 # si la requête n'est pas correcte, modif ne serait pas initialisée
                 # correcte si : requête correcte, requête correcte avec valeur dupliquée
                 cursor.execute(
-                    """
-                    INSERT INTO CHANSON (titre, artiste, annee, embed_paroles, str_paroles)
-                    VALUES (%(titre)s, %(artiste)s, %(annee)s, %(embed_paroles)s, %(str_paroles)s)
-                    ON CONFLICT DO NOTHING;
+                    f"""
+                    INSERT INTO CHANSON
+                    (titre, artiste, annee, embed_paroles, embed_paroles_f32, norme_paroles,
+                    str_paroles{colonne_vec})
+                    VALUES (%(titre)s, %(artiste)s, %(annee)s, %(embed_paroles)s,
+                    %(embed_paroles_f32)s, %(norme_paroles)s, %(str_paroles)s{valeur_vec})
+                    ON CONFLICT DO NOTHING
+                    RETURNING id_chanson;
                     """,
                     # ON CONFLICT DO NOTHING pour les attributs UNIQUE
-                    {
-                        "titre": chanson.titre,
-                        "artiste": chanson.artiste,
-                        "annee": chanson.annee,
-                        "embed_paroles": [round(x, 6) for x in chanson.paroles.vecteur],
-                        "str_paroles": chanson.paroles.content,
-                    },
+                    valeurs,
                 )
                 modif += cursor.rowcount
+                ligne = cursor.fetchone() if modif == 1 else None
                 connection.commit()
+        if ligne is not None:
+            # Les index en mémoire ajoutent ce seul vecteur au lieu de tout reconstruire
+            BusCatalogue().publier(
+                EvenementCatalogue(
+                    EvenementCatalogue.AJOUT,
+                    ligne["id_chanson"],
+                    stocke,
+                    norme_paroles,
+                    paroles=chanson.paroles.content,
+                )
+            )
         return modif == 1
 
-    def get_chansons(self) -> list[Chanson] | None:
+    def get_chansons(
+        self,
+        champs: tuple[str, ...] = DAO.CHAMPS_PAROLES,
+        limite: int = None,
+        apres: int = None,
+    ) -> list[Chanson] | None:
         """
-        Liste toutes les Chanson enregistrées dans la BD
+        Liste les Chanson enregistrées dans la BD, par id_chanson croissant
+        Seuls les champs facultatifs demandés ("paroles", "vecteur") sont lus
+        Pagination par clé : au plus limite chansons (toutes si None) dont l'id_chanson
+        est supérieur à apres ; la requête parcourt la clé primaire depuis apres, son coût
+        ne dépend pas de la position de la page dans le catalogue.
         """
         list_Chansons = []
         with DBConnection().connection as connection:
             with connection.cursor() as cursor:
-                cursor.execute("""
-                    SELECT titre, artiste, annee, embed_paroles, str_paroles
-                    FROM CHANSON;
-                    """)  # [(titre, artiste, annee, embed_paroles, str_paroles), (...), ...]
+                cursor.execute(
+                    f"""
+                    SELECT id_chanson, titre, artiste, annee{self._colonnes_paroles(champs)}
+                    FROM CHANSON
+                    WHERE id_chanson > %(apres)s
+                    ORDER BY id_chanson
+                    LIMIT %(limite)s;
+                    """,
+                    {"apres": apres or 0, "limite": limite},
+                )  # [(id_chanson, titre, artiste, annee, embed_paroles, str_paroles), ...]
                 res = cursor.fetchall() or None
                 if res:  # None traité comme False : la condition n'est pas remplie
                     for chanson in res:
-                        paroles = Paroles(
-                            content=chanson["str_paroles"], vecteur=chanson["embed_paroles"]
-                        )
+                        paroles = self._paroles(chanson, champs)
                         chanson = Chanson(
                             titre=chanson["titre"],
                             artiste=chanson["artiste"],
                             annee=chanson["annee"],
                             paroles=paroles,
+                            id_chanson=chanson["id_chanson"],
                         )
                         list_Chansons.append(chanson)
                     return list_Chansons
 
+    def get_artistes(self) -> list[str]:
+        """
+        Liste les artistes distincts du catalogue, par ordre alphabétique.
+        Seul l'index (artiste, titre) est lu : ni les paroles ni les embeddings.
+        """
+        with DBConnection().connection as connection:
+            with connection.cursor() as cursor:
+                cursor.execute("""
+                    SELECT DISTINCT artiste
+                    FROM CHANSON
+                    ORDER BY artiste;
+                    """)  # [(artiste), (...), ...]
+                res = cursor.fetchall() or []
+        return [ligne["artiste"] for ligne in res]
+
+    def get_titres_from_artiste(self, artiste: str) -> list[str]:
+        """
+        Liste les titres des chansons d'un artiste, par ordre alphabétique
+        """
+        with DBConnection().connection as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT titre
+                    FROM CHANSON
+                    WHERE artiste = %s
+                    ORDER BY titre;
+                    """,
+                    (artiste,),
+                )  # [(titre), (...), ...]
+                res = cursor.fetchall() or []
+        return [ligne["titre"] for ligne in res]
+
     def get_chanson_from_embed_paroles(self, embed_paroles: list[float]) -> Chanson | None:
         """
         Récupère un object Chanson via l'embedding de paroles
@@ -85,15 +172,16 @@ class DAO_chanson(DAO):
             with connection.cursor() as cursor:
                 cursor.execute(
                     """
-                    SELECT titre, artiste, annee, embed_paroles, str_paroles
+                    SELECT titre, artiste, annee, embed_paroles, embed_paroles_f32, str_paroles
                     FROM CHANSON
-                    WHERE embed_paroles = %s::float8[];
+                    WHERE embed_paroles = %s::float8[]
+                    OR embed_paroles_f32 = %s;
                     """,
-                    (embed_paroles,),
+                    (embed_paroles, encoder_float32(embed_paroles)),
                 )  # (tire, artiste, annee, embed_paroles, str_paroles)
                 res = cursor.fetchone()
                 if res:
-                    paroles = Paroles(content=res["str_paroles"], vecteur=res["embed_paroles"])
+                    paroles = Paroles(content=res["str_paroles"], vecteur=self._vecteur(res))
                     chanson = Chanson(
                         titre=res["titre"],
                         artiste=res["artiste"],
@@ -102,6 +190,98 @@ class DAO_chanson(DAO):
                     )
                     return chanson
 
+    def get_chanson_from_id(self, id_chanson: int) -> Chanson | None:
+        """
+        Récupère une Chanson via son identifiant
+        """
+        chansons = self.get_chansons_from_ids([id_chanson])
+        return chansons[0] if chansons else None
+
+    def get_chansons_from_ids(self, ids: list[int]) -> list[Chanson]:
+        """
+        Récupère en une seule requête les Chansons d'une liste d'identifiants,
+        dans l'ordre de la liste (par exemple l'ordre de classement d'une playlist).
+        Les identifiants absents de la BD sont ignorés.
+        """
+        if not ids:
+            return []
+        with DBConnection().connection as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT id_chanson, titre, artiste, annee, embed_paroles, embed_paroles_f32,
+                    norme_paroles, str_paroles
+                    FROM CHANSON
+                    WHERE id_chanson = ANY(%s);
+                    """,
+                    (list(ids),),
+                )  # [(id_chanson, titre, artiste, annee, embed_paroles, ...), (...), ...]
+                res = cursor.fetchall() or []
+        chansons = {}
+        for ligne in res:
+            paroles = Paroles(
+                content=ligne["str_paroles"],
+                vecteur=self._vecteur(ligne),
+                norme=ligne["norme_paroles"],
+                id_chanson=ligne["id_chanson"],
+            )
+            chansons[ligne["id_chanson"]] = Chanson(
+                titre=ligne["titre"],
+                artiste=ligne["artiste"],
+                annee=ligne["annee"],
+                paroles=paroles,
+                id_chanson=ligne["id_chanson"],
+            )
+        return [chansons[id_chanson] for id_chanson in ids if id_chanson in chansons]
+
+    def get_chansons_proches(self, vecteur: list[float], k: int) -> list[Chanson]:
+        """
+        Récupère en une seule requête les k Chansons dont les paroles sont les plus proches
+        du vecteur (similarité cosinus), par score décroissant, grâce à l'index pgvector.
+        Les embeddings ne sont pas lus : la recherche se fait entièrement dans PostgreSQL.
+        """
+        if not self.index_pgvector:
+            raise ValueError("la recherche en SQL nécessite EMBED_PGVECTOR")
+        with DBConnection().connection as connection:
+            with connection.cursor() as cursor:
+                # Compromis rappel / latence de l'index, limité à cette transaction
+                if self.index_pgvector == "hnsw":
+                    cursor.execute(
+                        "SET LOCAL hnsw.ef_search = %s;",
+                        (max(k, int(os.environ.get("PGVECTOR_EF_SEARCH", 40))),),
+                    )
+                else:
+                    cursor.execute(
+                        "SET LOCAL ivfflat.probes = %s;",
+                        (int(os.environ.get("PGVECTOR_PROBES", 10)),),
+                    )
+                cursor.execute(
+                    """
+                    SELECT id_chanson, titre, artiste, annee, norme_paroles, str_paroles
+                    FROM CHANSON
+                    WHERE embed_paroles_vec IS NOT NULL
+                    ORDER BY embed_paroles_vec <=> %(vecteur)s::vector
+                    LIMIT %(k)s;
+                    """,
+                    {"vecteur": self._litteral_vector(vecteur), "k": k},
+                )  # [(id_chanson, titre, artiste, annee, norme_paroles, str_paroles), ...]
+                res = cursor.fetchall() or []
+                connection.commit()
+        return [
+            Chanson(
+                titre=ligne["titre"],
+                artiste=ligne["artiste"],
+                annee=ligne["annee"],
+                paroles=Paroles(
+                    content=ligne["str_paroles"],
+                    norme=ligne["norme_paroles"],
+                    id_chanson=ligne["id_chanson"],
+                ),
+                id_chanson=ligne["id_chanson"],
+            )
+            for ligne in res
+        ]
+
     def get_chanson_from_titre_artiste(self, titre: str, artiste: str) -> Chanson | None:
         """
         Récupère une Chanson via l'embedding de paroles
@@ -110,7 +290,7 @@ class DAO_chanson(DAO):
             with connection.cursor() as cursor:
                 cursor.execute(
                     """
-                    SELECT titre, artiste, annee, embed_paroles, str_paroles
+                    SELECT titre, artiste, annee, embed_paroles, embed_paroles_f32, str_paroles
                     FROM CHANSON
                     WHERE titre = %s
                     AND artiste = %s;
@@ -119,7 +299,7 @@ class DAO_chanson(DAO):
                 )  # (tire, artiste, annee, embed_paroles, str_paroles)
                 res = cursor.fetchone()
                 if res:
-                    paroles = Paroles(content=res["str_paroles"], vecteur=res["embed_paroles"])
+                    paroles = Paroles(content=res["str_paroles"], vecteur=self._vecteur(res))
                     chanson = Chanson(
                         titre=res["titre"],
                         artiste=res["artiste"],
@@ -128,6 +308,66 @@ class DAO_chanson(DAO):
                     )
                     return chanson
 
+    def get_chansons_approchees(
+        self, titre: str = None, artiste: str = None, seuil: float = 0.3, limite: int = 10
+    ) -> list[tuple[Chanson, float]]:
+        """
+        Recherche approchée (tolérante aux fautes de frappe) par titre et/ou artiste, grâce
+        aux index de trigrammes : seules les chansons dont la similarité pg_trgm dépasse le
+        seuil pour chaque critère donné sont retenues, par similarité décroissante.
+        Ni les paroles ni les embeddings ne sont lus.
+
+        Returns
+        ----------
+        list[tuple[Chanson, float]]
+            au plus limite chansons et leur similarité (moyenne des critères donnés)
+
+        Lève RuntimeError si la recherche approchée n'est pas activée (RECHERCHE_APPROCHEE)
+        ou si l'extension pg_trgm n'a pas été installée par migrer_schema.
+        """
+        criteres = [(nom, v) for nom, v in (("titre", titre), ("artiste", artiste)) if v]
+        if not criteres:
+            raise ValueError("un titre ou un artiste est nécessaire")
+        if not self.recherche_approchee:
+            raise RuntimeError("la recherche approchée nécessite RECHERCHE_APPROCHEE=trgm")
+        conditions = " AND ".join(f"{nom} %% %({nom})s" for nom, _ in criteres)
+        score = " + ".join(f"similarity({nom}, %({nom})s)" for nom, _ in criteres)
+        try:
+            with DBConnection().connection as connection:
+                with connection.cursor() as cursor:
+                    # Seuil de l'opérateur %, limité à cette transaction
+                    cursor.execute("SET LOCAL pg_trgm.similarity_threshold = %s;", (seuil,))
+                    cursor.execute(
+                        f"""
+                        SELECT id_chanson, titre, artiste, annee,
+                        ({score}) / {len(criteres)} AS score
+                        FROM CHANSON
+                        WHERE {conditions}
+                        ORDER BY score DESC, id_chanson
+                        LIMIT %(limite)s;
+                        """,
+                        {**dict(criteres), "limite": limite},
+                    )  # [(id_chanson, titre, artiste, annee, score), (...), ...]
+                    res = cursor.fetchall() or []
+                    connection.commit()
+        except errors.UndefinedFunction:
+            # Opérateur % ou similarity() inconnus : la transaction a été annulée
+            raise RuntimeError(
+                "l'extension pg_trgm est absente de la BD : lancer python migrate_schema.py"
+            )
+        return [
+            (
+                Chanson(
+                    titre=ligne["titre"],
+                    artiste=ligne["artiste"],
+                    annee=ligne["annee"],
+                    id_chanson=ligne["id_chanson"],
+                ),
+                float(ligne["score"]),
+            )
+            for ligne in res
+        ]
+
     def _del_chanson_via_titre_artiste(self, titre: str, artiste: str) -> bool:
         """
         Supprime une chanson de la table CHANSON via l'embedding pour l'identifier
@@ -140,10 +380,98 @@ class DAO_chanson(DAO):
                     """
                     DELETE FROM CHANSON
                     WHERE titre = %s
-                    AND artiste = %s;
+                    AND artiste = %s
+                    RETURNING id_chanson;
                     """,
                     (titre, artiste),
                 )
                 modif += cursor.rowcount
+                supprimees = cursor.fetchall() if modif else []
                 connection.commit()
+        for ligne in supprimees:
+            BusCatalogue().publier(
+                EvenementCatalogue(EvenementCatalogue.SUPPRESSION, ligne["id_chanson"])
+            )
         return modif == 1
+
+    def migrer_embeddings_float32(self, taille_lot: int = 500) -> int:
+        """
+        Convertit par lots les embeddings FLOAT8[] existants en bytea float32
+        et vide l'ancienne colonne. Retourne le nombre de chansons converties.
+        Refusé si EMBED_STOCKAGE ne vaut pas "float32", pour ne pas vider la colonne FLOAT8[].
+        """
+        if self.stockage_embeddings != "float32":
+            raise ValueError("la conversion en float32 nécessite EMBED_STOCKAGE=float32")
+        nb_converties = 0
+        with DBConnection().connection as connection:
+            with connection.cursor() as cursor:
+                while True:
+                    cursor.execute(
+                        """
+                        SELECT id_chanson, embed_paroles
+                        FROM CHANSON
+                        WHERE embed_paroles IS NOT NULL
+                        LIMIT %s;
+                        """,
+                        (taille_lot,),
+                    )  # [(id_chanson, embed_paroles), (...), ...]
+                    res = cursor.fetchall()
+                    if not res:
+                        break
+                    execute_values(
+                        cursor,
+                        """
+                        UPDATE CHANSON AS c
+                        SET embed_paroles_f32 = v.embed_paroles_f32, embed_paroles = NULL
+                        FROM (VALUES %s) AS v (id_chanson, embed_paroles_f32)
+                        WHERE c.id_chanson = v.id_chanson;
+                        """,
+                        [
+                            (chanson["id_chanson"], encoder_float32(chanson["embed_paroles"]))
+                            for chanson in res
+                        ],
+                    )
+                    connection.commit()
+                    nb_converties += len(res)
+        return nb_converties
+
+    def migrer_embeddings_pgvector(self, taille_lot: int = 500) -> int:
+        """
+        Remplit par lots la colonne vector des chansons enregistrées avant l'activation de
+        pgvector. Retourne le nombre de chansons migrées.
+        """
+        if not self.index_pgvector:
+            raise ValueError("la migration vers pgvector nécessite EMBED_PGVECTOR")
+        nb_migrees = 0
+        with DBConnection().connection as connection:
+            with connection.cursor() as cursor:
+                while True:
+                    cursor.execute(
+                        """
+                        SELECT id_chanson, embed_paroles, embed_paroles_f32
+                        FROM CHANSON
+                        WHERE embed_paroles_vec IS NULL
+                        AND (embed_paroles IS NOT NULL OR embed_paroles_f32 IS NOT NULL)
+                        LIMIT %s;
+                        """,
+                        (taille_lot,),
+                    )  # [(id_chanson, embed_paroles, embed_paroles_f32), (...), ...]
+                    res = cursor.fetchall()
+                    if not res:
+                        break
+                    execute_values(
+                        cursor,
+                        """
+                        UPDATE CHANSON AS c
+                        SET embed_paroles_vec = v.embed_paroles_vec::vector
+                        FROM (VALUES %s) AS v (id_chanson, embed_paroles_vec)
+                        WHERE c.id_chanson = v.id_chanson;
+                        """,
+                        [
+                            (chanson["id_chanson"], self._litteral_vector(self._vecteur(chanson)))
+                            for chanson in res
+                        ],
+                    )
+                    connection.commit()
+                    nb_migrees += len(res)
+        return nb_migrees
@@ -1,25 +1,167 @@
+from collections.abc import Iterator
+
+import numpy as np
+
 from business_object.paroles import Paroles
 from dao.dao import DAO
 from dao.db_connection import DBConnection
+from utils.embedding_binaire import decoder_matrice_float32
 
 
 class DAO_paroles(DAO):
     def get_paroles(self) -> list[Paroles] | None:
         """
-        Liste les Paroles de toutes les chansons enregistrées dans la BD
+        Liste les Paroles de toutes les chansons enregistrées dans la BD,
+        avec l'identifiant de leur chanson
         """
         list_Paroles = []
         with DBConnection().connection as connection:
             with connection.cursor() as cursor:
                 cursor.execute("""
-                    SELECT embed_paroles, str_paroles 
+                    SELECT id_chanson, embed_paroles, embed_paroles_f32, norme_paroles,
+                    str_paroles
                     FROM CHANSON;
-                    """)  # [(embed_paroles, str_paroles), (embed_paroles, str_paroles), ...]
+                    """)  # [(id_chanson, embed_paroles, norme_paroles, str_paroles), (...), ...]
                 res = cursor.fetchall() or None
                 if res:
                     for chanson in res:
                         paroles = Paroles(
-                            content=chanson["str_paroles"], vecteur=chanson["embed_paroles"]
+                            content=chanson["str_paroles"],
+                            vecteur=self._vecteur(chanson),
+                            norme=chanson.get("norme_paroles"),
+                            id_chanson=chanson.get("id_chanson"),
                         )
                         list_Paroles.append(paroles)
                     return list_Paroles
+
+    def _matrice(self, res: list) -> list | np.ndarray:
+        """
+        Rassemble les embeddings lus en BD. Si tous sont stockés en bytea float32,
+        ils sont décodés d'un bloc en une matrice NumPy, sans passer par des listes Python.
+        """
+        if res and all(chanson.get("embed_paroles_f32") is not None for chanson in res):
+            return decoder_matrice_float32([chanson["embed_paroles_f32"] for chanson in res])
+        return [self._vecteur(chanson) for chanson in res]
+
+    def get_embeddings(self) -> tuple[list[int], list[list[float]], list[float]] | None:
+        """
+        Liste les identifiants, embeddings et normes des paroles, sans le texte,
+        pour la construction des index de recherche
+        """
+        with DBConnection().connection as connection:
+            with connection.cursor() as cursor:
+                cursor.execute("""
+                    SELECT id_chanson, embed_paroles, embed_paroles_f32, norme_paroles
+                    FROM CHANSON
+                    ORDER BY id_chanson;
+                    """)  # [(id_chanson, embed_paroles, norme_paroles), (...), ...]
+                res = cursor.fetchall() or None
+                if res:
+                    ids = [chanson["id_chanson"] for chanson in res]
+                    vecteurs = self._matrice(res)
+                    normes = [chanson["norme_paroles"] for chanson in res]
+                    return ids, vecteurs, normes
+
+    def get_textes(self) -> tuple[list[int], list[str]]:
+        """
+        Liste les identifiants et le texte des paroles de toutes les chansons, sans les
+        embeddings, pour la construction de l'index lexical
+        """
+        with DBConnection().connection as connection:
+            with connection.cursor() as cursor:
+                cursor.execute("""
+                    SELECT id_chanson, str_paroles
+                    FROM CHANSON;
+                    """)  # [(id_chanson, str_paroles), (...), ...]
+                res = cursor.fetchall() or []
+        return [ligne["id_chanson"] for ligne in res], [ligne["str_paroles"] for ligne in res]
+
+    def iter_embeddings(
+        self, itersize: int = 2000
+    ) -> Iterator[tuple[list[int], list[list[float]] | np.ndarray, list[float]]]:
+        """
+        Parcourt les identifiants, embeddings et normes du catalogue par blocs de itersize
+        chansons, avec un curseur nommé (côté serveur) : seul le bloc courant est en mémoire,
+        quelle que soit la taille du catalogue. Le texte des paroles n'est pas lu.
+        """
+        with DBConnection().connection as connection:
+            with connection.cursor(name="flux_embeddings") as cursor:
+                cursor.itersize = itersize
+                cursor.execute("""
+                    SELECT id_chanson, embed_paroles, embed_paroles_f32, norme_paroles
+                    FROM CHANSON;
+                    """)  # [(id_chanson, embed_paroles, norme_paroles), (...), ...]
+                while True:
+                    res = cursor.fetchmany(itersize)
+                    if not res:
+                        break
+                    ids = [chanson["id_chanson"] for chanson in res]
+                    normes = [chanson["norme_paroles"] for chanson in res]
+                    yield ids, self._matrice(res), normes
+
+    def get_embeddings_from_ids(
+        self, ids: list[int]
+    ) -> tuple[list[int], list[list[float]], list[float]]:
+        """
+        Récupère les embeddings et normes complets d'une liste de chansons
+        (l'ordre des résultats n'est pas celui de la liste d'identifiants)
+        """
+        with DBConnection().connection as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT id_chanson, embed_paroles, embed_paroles_f32, norme_paroles
+                    FROM CHANSON
+                    WHERE id_chanson = ANY(%s);
+                    """,
+                    (list(ids),),
+                )  # [(id_chanson, embed_paroles, norme_paroles), (...), ...]
+                res = cursor.fetchall() or []
+                ids = [chanson["id_chanson"] for chanson in res]
+                vecteurs = self._matrice(res)
+                normes = [chanson["norme_paroles"] for chanson in res]
+                return ids, vecteurs, normes
+
+    def get_embeddings_fts(
+        self, requete: str, limite: int
+    ) -> tuple[list[int], list[list[float]] | np.ndarray, list[float]]:
+        """
+        Récupère les embeddings et normes des chansons dont les paroles contiennent tous les
+        mots de la requête (recherche plein texte sur l'index GIN de tsv_paroles).
+        Au plus limite chansons sont retournées, les plus pertinentes selon ts_rank.
+        """
+        with DBConnection().connection as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT id_chanson, embed_paroles, embed_paroles_f32, norme_paroles
+                    FROM CHANSON, plainto_tsquery('simple', %(requete)s) AS requete
+                    WHERE tsv_paroles @@ requete
+                    ORDER BY ts_rank(tsv_paroles, requete) DESC
+                    LIMIT %(limite)s;
+                    """,
+                    {"requete": requete, "limite": limite},
+                )  # [(id_chanson, embed_paroles, norme_paroles), (...), ...]
+                res = cursor.fetchall() or []
+                ids = [chanson["id_chanson"] for chanson in res]
+                vecteurs = self._matrice(res)
+                normes = [chanson["norme_paroles"] for chanson in res]
+                return ids, vecteurs, normes
+
+    def get_signature(self) -> tuple[int, int | None, str | None]:
+        """
+        Retourne le nombre de chansons, le plus grand id_chanson et la génération du catalogue.
+        Toute insertion ou suppression modifie le couple (nombre, id max) ; la génération
+        change quand le catalogue est vidé, supprimé ou tronqué (les id SERIAL peuvent alors
+        être réutilisés) ou que ses embeddings sont réécrits. La signature permet de savoir si
+        un index en mémoire ou sur disque est encore à jour sans relire les vecteurs.
+        """
+        with DBConnection().connection as connection:
+            with connection.cursor() as cursor:
+                cursor.execute("""
+                    SELECT count(*) AS nb_chansons, max(id_chanson) AS id_max,
+                    (SELECT valeur FROM GENERATION_CHANSON LIMIT 1) AS generation
+                    FROM CHANSON;
+                    """)  # (nb_chansons, id_max, generation)
+                res = cursor.fetchone()
+                return res["nb_chansons"], res["id_max"], res["generation"]
@@ -1,8 +1,8 @@
+from collections import Counter
 from itertools import groupby
 from operator import itemgetter
 
 from business_object.chanson import Chanson
-from business_object.paroles import Paroles
 from business_object.playlist import Playlist
 from dao.dao import DAO
 from dao.db_connection import DBConnection
@@ -12,8 +12,25 @@ class DAO_playlist(DAO):
     def add_playlist(self, playlist: Playlist) -> bool:
         """
         Ajoute une playlist à la table PLAYLIST de la BD et remplit la table CATALOGUE de la BD
+        Les chansons sont identifiées par leur id_chanson (renseigné lorsqu'elles ont été lues
+        en BD), à défaut par leur titre et leur artiste. Retourne False, sans rien enregistrer,
+        si l'une d'elles est introuvable
         """
-        modif = 0
+        ids_chansons = [chanson.id_chanson for chanson in playlist.chansons]
+        if None in ids_chansons:
+            ids_chansons = self._get_ids_chansons(playlist.chansons)
+            if len(ids_chansons) != len(playlist.chansons):
+                return False
+        return self.add_playlist_from_ids(playlist.nom, ids_chansons)
+
+    def add_playlist_from_ids(self, nom: str, ids_chansons: list[int]) -> bool:
+        """
+        Ajoute une playlist et toutes ses lignes CATALOGUE en une seule transaction :
+        une requête pour la playlist, une seule requête pour l'ensemble des chansons.
+        Retourne True si la playlist et toutes ses chansons ont été enregistrées ; si une
+        chanson est introuvable, la transaction est annulée et rien n'est enregistré
+        """
+        ids_chansons = list(dict.fromkeys(ids_chansons))  # sans doublons, ordre conservé
         with DBConnection().connection as connection:
             with connection.cursor() as cursor:
                 cursor.execute(
@@ -23,55 +40,160 @@ class DAO_playlist(DAO):
                     ON CONFLICT DO NOTHING
                     RETURNING id_playlist;
                     """,
-                    (playlist.nom,),
+                    (nom,),
                 )  # (id_playlist, )
                 res = cursor.fetchone()
-                if res:  # si une playlist porte déjà le même nom : retourne None
-                    id_playlist = res["id_playlist"]
-                    chansons = playlist.chansons
-                    for chanson in chansons:
-                        embed_paroles = chanson.paroles.vecteur
-                        # Récupération de id_chanson via l'embedding des paroles qui est unique
-                        cursor.execute(
-                            """
-                            SELECT id_chanson 
-                            FROM CHANSON
-                            WHERE embed_paroles = %s::float8[];
-                            """,
-                            (embed_paroles,),
-                        )  # (id_chanson, )
-                        res = cursor.fetchone()
-                        if res:
-                            id_chanson = res["id_chanson"]
-                            cursor.execute(
-                                """
-                                INSERT INTO CATALOGUE (id_playlist, id_chanson)
-                                VALUES (%s, %s);
-                                """,
-                                (id_playlist, id_chanson),
-                            )
-                            modif += cursor.rowcount
-                            connection.commit()
-        return modif == 1
+                if not res:  # si une playlist porte déjà le même nom
+                    return False
+                modif = 0
+                if ids_chansons:
+                    # Une chanson supprimée entre-temps ne fait pas échouer la clé étrangère :
+                    # elle manque au nombre de lignes insérées et la transaction est annulée
+                    cursor.execute(
+                        """
+                        INSERT INTO CATALOGUE (id_playlist, id_chanson)
+                        SELECT %s, id_chanson
+                        FROM CHANSON
+                        WHERE id_chanson = ANY(%s)
+                        ON CONFLICT DO NOTHING;
+                        """,
+                        (res["id_playlist"], ids_chansons),
+                    )
+                    modif = cursor.rowcount
+                if modif != len(ids_chansons):
+                    connection.rollback()
+                    return False
+                connection.commit()
+        return True
+
+    def add_playlists(self, playlists: list[Playlist]) -> list[bool]:
+        """
+        Ajoute plusieurs playlists et toutes leurs lignes CATALOGUE en une seule transaction
+        Retourne, pour chaque playlist, True si elle a été créée avec toutes ses chansons
+        (False si son nom existe déjà en BD ou apparaît plus tôt dans la liste, ou si l'une
+        de ses chansons est introuvable : elle n'est alors pas enregistrée)
+        """
+        if not playlists:
+            return []
+        ids_chansons = []
+        for playlist in playlists:
+            ids = [chanson.id_chanson for chanson in playlist.chansons]
+            if None in ids:
+                ids = self._get_ids_chansons(playlist.chansons)
+                if len(ids) != len(playlist.chansons):
+                    ids = None  # une chanson introuvable : la playlist n'est pas enregistrée
+            ids_chansons.append(ids)
+        noms = [p.nom for p, ids in zip(playlists, ids_chansons) if ids is not None]
+        with DBConnection().connection as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    INSERT INTO PLAYLIST (nom)
+                    SELECT unnest(%s::text[])
+                    ON CONFLICT DO NOTHING
+                    RETURNING id_playlist, nom;
+                    """,
+                    (list(dict.fromkeys(noms)),),
+                )  # [(id_playlist, nom), (...), ...] des seules playlists créées
+                ids_playlists = {ligne["nom"]: ligne["id_playlist"] for ligne in cursor.fetchall()}
+                id_par_playlist = []
+                attendues = {}  # id_playlist -> nombre de chansons à enregistrer
+                colonne_playlists, colonne_chansons = [], []
+                for playlist, ids in zip(playlists, ids_chansons):
+                    id_playlist = None
+                    if ids is not None:
+                        id_playlist = ids_playlists.pop(playlist.nom, None)
+                    id_par_playlist.append(id_playlist)
+                    if id_playlist is not None:
+                        ids = list(dict.fromkeys(ids))
+                        attendues[id_playlist] = len(ids)
+                        colonne_playlists += [id_playlist] * len(ids)
+                        colonne_chansons += ids
+                inserees = Counter()
+                if colonne_chansons:
+                    # Les chansons supprimées entre-temps sont écartées par la jointure : le
+                    # nombre de lignes insérées par playlist les révèle
+                    cursor.execute(
+                        """
+                        INSERT INTO CATALOGUE (id_playlist, id_chanson)
+                        SELECT t.id_playlist, t.id_chanson
+                        FROM unnest(%s::int[], %s::int[]) AS t(id_playlist, id_chanson)
+                        JOIN CHANSON c ON c.id_chanson = t.id_chanson
+                        ON CONFLICT DO NOTHING
+                        RETURNING id_playlist;
+                        """,
+                        (colonne_playlists, colonne_chansons),
+                    )
+                    inserees = Counter(ligne["id_playlist"] for ligne in cursor.fetchall())
+                incompletes = [i for i, n in attendues.items() if inserees[i] != n]
+                if incompletes:
+                    # Les lignes CATALOGUE sont supprimées en cascade
+                    cursor.execute(
+                        "DELETE FROM PLAYLIST WHERE id_playlist = ANY(%s);", (incompletes,)
+                    )
+                connection.commit()
+        return [i is not None and i not in incompletes for i in id_par_playlist]
+
+    def _get_ids_chansons(self, chansons: list[Chanson]) -> list[int]:
+        """
+        Retrouve en une seule requête les id_chanson d'une liste de chansons
+        via leur couple (titre, artiste), qui est unique
+        """
+        if not chansons:
+            return []
+        with DBConnection().connection as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT c.id_chanson, c.titre, c.artiste
+                    FROM CHANSON c
+                    JOIN unnest(%s::text[], %s::text[]) AS t(titre, artiste)
+                    ON c.titre = t.titre AND c.artiste = t.artiste;
+                    """,
+                    ([c.titre for c in chansons], [c.artiste for c in chansons]),
+                )  # [(id_chanson, titre, artiste), (...), ...]
+                res = cursor.fetchall() or []
+        ids = {(ligne["titre"], ligne["artiste"]): ligne["id_chanson"] for ligne in res}
+        return [ids[(c.titre, c.artiste)] for c in chansons if (c.titre, c.artiste) in ids]
 
-    def get_playlists(self) -> list[Playlist] | None:
+    def get_playlists(
+        self,
+        champs: tuple[str, ...] = DAO.CHAMPS_PAROLES,
+        limite: int = None,
+        apres: int = None,
+    ) -> list[Playlist] | None:
+        """
+        Liste les playlists (non vides) et leurs chansons, par id_playlist croissant
+        Seuls les champs facultatifs demandés ("paroles", "vecteur") sont lus
+        Pagination par clé : au plus limite playlists (toutes si None) dont l'id_playlist
+        est supérieur à apres. La page est choisie sur PLAYLIST avant la jointure : seules
+        les chansons de ces playlists sont lues.
+        """
         playlists = []
         with DBConnection().connection as connection:
             with connection.cursor() as cursor:
-                cursor.execute("""
+                cursor.execute(
+                    f"""
                     SELECT 
                         p.id_playlist,
                         p.nom, 
                         c.titre,
                         c.artiste,
-                        c.annee,
-                        c.embed_paroles,
-                        c.str_paroles
-                    FROM PLAYLIST p
+                        c.annee{self._colonnes_paroles(champs, "c.")}
+                    FROM (
+                        SELECT id_playlist, nom
+                        FROM PLAYLIST pl
+                        WHERE id_playlist > %(apres)s
+                        AND EXISTS (SELECT 1 FROM CATALOGUE WHERE id_playlist = pl.id_playlist)
+                        ORDER BY id_playlist
+                        LIMIT %(limite)s
+                    ) p
                     JOIN CATALOGUE cat ON p.id_playlist = cat.id_playlist
                     JOIN CHANSON c ON cat.id_chanson = c.id_chanson
                     ORDER BY p.id_playlist;
-                """)
+                    """,
+                    {"apres": apres or 0, "limite": limite},
+                )
                 # ORDER BY nécessaire pour GROUP BY
                 # [(id_playlist, nom, titre, artiste, annee, embed_paroles, str_paroles),
                 # (...), ...]
@@ -88,39 +210,38 @@ class DAO_playlist(DAO):
                             chanson["titre"],
                             chanson["artiste"],
                             chanson["annee"],
-                            chanson["embed_paroles"],
-                            chanson["str_paroles"],
+                            self._paroles(chanson, champs),
                         )
                         for chanson in res
                     ]
                     for id_playlist, group in groupby(list_tup, key=itemgetter(0)):
                         group = list(group)
-                        # [(id_playlist, nom, titre, artiste, annee, embed_paroles, str_paroles),
+                        # [(id_playlist, nom, titre, artiste, annee, paroles),
                         # (...), ...] avec le même id_playlist dans chaque tuple
                         chansons = []
-                        for _, _, titre, artiste, annee, embed_paroles, str_paroles in group:
-                            paroles = Paroles(content=str_paroles, vecteur=embed_paroles)
+                        for _, _, titre, artiste, annee, paroles in group:
                             chanson = Chanson(titre, artiste, annee, paroles)
                             chansons.append(chanson)
                         nom = group[0][1]
-                        playlist = Playlist(nom, chansons)
+                        playlist = Playlist(nom, chansons, id_playlist)
                         playlists.append(playlist)
                     return playlists
 
-    def get_playlist_from_nom(self, nom: str) -> Playlist | None:
+    def get_playlist_from_nom(
+        self, nom: str, champs: tuple[str, ...] = DAO.CHAMPS_PAROLES
+    ) -> Playlist | None:
         """
         Récupère un objet Playlist à partir de son nom.
+        Seuls les champs facultatifs demandés ("paroles", "vecteur") sont lus
         """
         with DBConnection().connection as connection:
             with connection.cursor() as cursor:
                 cursor.execute(
-                    """
+                    f"""
                     SELECT 
                         c.titre, 
                         c.artiste, 
-                        c.annee, 
-                        c.embed_paroles, 
-                        c.str_paroles
+                        c.annee{self._colonnes_paroles(champs, "c.")}
                     FROM PLAYLIST p
                     JOIN CATALOGUE cat ON p.id_playlist = cat.id_playlist
                     JOIN CHANSON c ON c.id_chanson = cat.id_chanson
@@ -134,9 +255,7 @@ class DAO_playlist(DAO):
                 if res:
                     chansons = []
                     for chanson in res:
-                        paroles = Paroles(
-                            content=chanson["str_paroles"], vecteur=chanson["embed_paroles"]
-                        )
+                        paroles = self._paroles(chanson, champs)
                         chanson = Chanson(
                             titre=chanson["titre"],
                             artiste=chanson["artiste"],
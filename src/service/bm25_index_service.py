@@ -0,0 +1,104 @@
+import heapq
+import math
+from collections import Counter
+
+from utils.tokeniseur import tokeniser
+
+
+class Bm25IndexService:
+    """
+    Index inversé des paroles avec classement BM25.
+    Chaque terme pointe vers les chansons qui le contiennent et son nombre d'occurrences
+    dans chacune : une recherche ne parcourt que les listes des termes de la requête.
+    L'index est tenu à jour sur place : ajouter() et supprimer() ne touchent que les
+    listes des termes de la chanson concernée.
+
+    Attributs
+    ---------
+    k1 : float
+        saturation de la fréquence d'un terme dans une chanson
+    b : float
+        normalisation par la longueur des paroles (0 = aucune, 1 = complète)
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = {}  # terme -> {id_chanson: nombre d'occurrences}
+        self.longueurs = {}  # id_chanson -> nombre de termes des paroles
+        self.termes = {}  # id_chanson -> termes distincts des paroles
+        self.longueur_totale = 0
+
+    def construire(self, ids: list[int], textes: list[str]) -> None:
+        """
+        Construit l'index à partir des paroles du catalogue.
+        """
+        self.postings = {}
+        self.longueurs = {}
+        self.termes = {}
+        self.longueur_totale = 0
+        for id_chanson, texte in zip(ids, textes):
+            self.ajouter(id_chanson, texte)
+
+    def ajouter(self, id_chanson: int, texte: str) -> None:
+        """
+        Indexe les paroles d'une chanson (remplace celles déjà indexées pour cet id).
+        """
+        if id_chanson in self.longueurs:
+            self.supprimer(id_chanson)
+        termes = tokeniser(texte or "")
+        occurrences_par_terme = Counter(termes)
+        for terme, occurrences in occurrences_par_terme.items():
+            self.postings.setdefault(terme, {})[id_chanson] = occurrences
+        self.termes[id_chanson] = tuple(occurrences_par_terme)
+        self.longueurs[id_chanson] = len(termes)
+        self.longueur_totale += len(termes)
+
+    def supprimer(self, id_chanson: int) -> None:
+        """
+        Retire une chanson de l'index, des seules listes de ses termes.
+        """
+        longueur = self.longueurs.pop(id_chanson, None)
+        if longueur is None:
+            return
+        self.longueur_totale -= longueur
+        for terme in self.termes.pop(id_chanson, ()):
+            del self.postings[terme][id_chanson]
+            if not self.postings[terme]:
+                del self.postings[terme]
+
+    def contient(self, id_chanson: int) -> bool:
+        return id_chanson in self.longueurs
+
+    def signature(self) -> tuple[int, int | None]:
+        """
+        Nombre de chansons et plus grand identifiant indexés, comparable à la signature
+        du catalogue en BD (DAO_paroles.get_signature).
+        """
+        return len(self.longueurs), max(self.longueurs) if self.longueurs else None
+
+    def __len__(self) -> int:
+        return len(self.longueurs)
+
+    def rechercher(self, requete: str, k: int) -> list[tuple[int, float]]:
+        """
+        Retourne les k chansons dont les paroles correspondent le mieux à la requête,
+        par score BM25 décroissant. Les chansons sans aucun terme de la requête sont exclues.
+        """
+        n = len(self.longueurs)
+        if n == 0 or k <= 0:
+            return []
+        longueur_moyenne = self.longueur_totale / n or 1.0
+        scores = {}
+        for terme in set(tokeniser(requete)):
+            liste = self.postings.get(terme)
+            if not liste:
+                continue
+            idf = math.log(1 + (n - len(liste) + 0.5) / (len(liste) + 0.5))
+            for id_chanson, occurrences in liste.items():
+                longueur = self.longueurs[id_chanson] / longueur_moyenne
+                poids = occurrences * (self.k1 + 1)
+                poids /= occurrences + self.k1 * (1 - self.b + self.b * longueur)
+                scores[id_chanson] = scores.get(id_chanson, 0.0) + idf * poids
+        meilleurs = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [(id_chanson, float(score)) for id_chanson, score in meilleurs]
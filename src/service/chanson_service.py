@@ -21,6 +21,32 @@ class ChansonService:
         paroles.vecteur = ParolesEmbeddingService().vectorise(paroles.content)
         chanson.paroles = paroles
 
+    def add_chansons_paroles(self, chansons: list[Chanson]) -> list[bool]:
+        """
+        Ajout des paroles de plusieurs chansons, vectorisées par lots
+        (un appel à l'API d'embedding par lot au lieu d'un par chanson)
+
+        Returns
+        ----------
+        list[bool]
+            pour chaque chanson, True si ses paroles ont été trouvées et vectorisées
+        """
+        trouvees = []
+        for chanson in chansons:
+            paroles = ParolesService().add_from_API(chanson)
+            if paroles is not None:
+                chanson.paroles = paroles
+                trouvees.append(chanson)
+        vecteurs = ParolesEmbeddingService().vectorise_many(
+            [chanson.paroles.content for chanson in trouvees]
+        )
+        for chanson, vecteur in zip(trouvees, vecteurs):
+            chanson.paroles.vecteur = vecteur
+        return [
+            chanson.paroles is not None and chanson.paroles.vecteur is not None
+            for chanson in chansons
+        ]
+
     # def add_annee(self, chanson: Chanson):
     #     """
     #     Recherche l'année de sortie d'une chanson via LRCLIB à partir du titre et de l'artiste.
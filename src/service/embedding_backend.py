@@ -0,0 +1,109 @@
+import json
+import threading
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from utils.session_http import SessionHttp
+
+
+class EmbeddingBackend(ABC):
+    """
+    Moteur qui calcule les embeddings pour EmbeddingService.
+
+    Attributs
+    ---------
+    modele : str
+        nom du modèle, utilisé aussi dans les clés des caches d'embeddings
+    """
+
+    modele: str
+
+    @abstractmethod
+    def vectoriser(self, entree: str | list[str]) -> list | None:
+        """
+        Vectorise un texte ou une liste de textes.
+
+        Returns:
+            list: Les embeddings, un par texte, ou None en cas d'erreur
+        """
+
+
+class HttpEmbeddingBackend(EmbeddingBackend):
+    """
+    Embeddings calculés par l'API Ollama distante (/api/embed).
+    """
+
+    def __init__(self, url: str, token: str, modele: str):
+        self.url = url
+        self.token = token
+        self.modele = modele
+
+    def vectoriser(self, entree: str | list[str]) -> list | None:
+        headers = {"Content-Type": "application/json", "Authorization": f"Bearer {self.token}"}
+        data = {"model": self.modele, "input": entree}
+        attendus = len(entree) if isinstance(entree, list) else 1
+
+        try:
+            response = SessionHttp().post(self.url, headers=headers, data=json.dumps(data))
+
+            if response.status_code == 200:
+                embeddings = response.json().get("embeddings")
+                if embeddings and len(embeddings) == attendus:
+                    return embeddings
+                print("Erreur : nombre d'embeddings différent du nombre de textes")
+            else:
+                print(f"Erreur {response.status_code}: {response.text}")
+
+        except Exception as e:
+            print(f"Exception lors de la vectorisation: {str(e)}")
+        return None
+
+
+class LocalEmbeddingBackend(EmbeddingBackend):
+    """
+    Embeddings calculés dans le processus, sur CPU, par un modèle sentence-transformers
+    chargé depuis un dossier local (aucun appel réseau).
+    Avec moteur="onnx", le modèle est exécuté par ONNX Runtime.
+
+    Dépendance optionnelle : pip install sentence-transformers (et onnxruntime pour "onnx").
+    Un modèle n'est chargé qu'une fois par processus, quel que soit le nombre de services.
+    """
+
+    _modeles = {}
+    _verrou = threading.Lock()
+
+    def __init__(self, chemin: str, moteur: str = "torch"):
+        if not chemin:
+            raise ValueError("EMBED_MODELE_LOCAL doit indiquer le dossier du modèle local")
+        self.chemin = chemin
+        self.moteur = moteur
+        self.modele = f"local:{chemin}"
+
+    def _charger_modele(self):
+        """
+        Charge le modèle au premier appel puis le réutilise.
+        """
+        cle = (self.chemin, self.moteur)
+        with self._verrou:
+            if cle not in self._modeles:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                except ImportError as e:
+                    raise ImportError(
+                        "Le backend d'embedding local nécessite le paquet sentence-transformers"
+                    ) from e
+                options = {"backend": "onnx"} if self.moteur == "onnx" else {}
+                self._modeles[cle] = SentenceTransformer(self.chemin, device="cpu", **options)
+            return self._modeles[cle]
+
+    def vectoriser(self, entree: str | list[str]) -> list | None:
+        textes = entree if isinstance(entree, list) else [entree]
+        try:
+            embeddings = self._charger_modele().encode(textes, convert_to_numpy=True)
+            return np.asarray(embeddings, dtype=np.float32).tolist()
+        except ImportError:
+            raise
+        except Exception as e:
+            print(f"Exception lors de la vectorisation: {str(e)}")
+            return None
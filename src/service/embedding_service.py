@@ -1,23 +1,48 @@
-import json
+import os
 from abc import ABC
 
-import requests
+import dotenv
+
+from service.embedding_backend import HttpEmbeddingBackend, LocalEmbeddingBackend
+
+# Le fichier .env est lu une fois par processus, au chargement du module, et non à chaque
+# service créé (un par requête)
+dotenv.load_dotenv(override=True)
 
 
 class EmbeddingService(ABC):
     """
     Classe abstraite pour les services d'embedding.
-    Fournit la méthode vectorise() commune à toutes les classes dérivées.
+    Fournit les méthodes vectorise() et vectorise_many() communes à toutes les classes
+    dérivées.
+
+    Le moteur d'embedding est choisi par la variable d'environnement EMBED_BACKEND :
+    "http" (API Ollama distante, par défaut) ou "local" (modèle chargé dans le processus
+    depuis le dossier EMBED_MODELE_LOCAL).
     """
 
     def __init__(self):
-        self.OLLAMA_EMBED_URL = "https://llm.lab.sspcloud.fr/ollama/api/embed"
-        self.token = "sk-9362a2b2bec045af9dfc896ee3d4e14c"  # Clem
-        self.model = "bge-m3"
+        self.OLLAMA_EMBED_URL = os.environ.get(
+            "EMBED_URL", "https://llm.lab.sspcloud.fr/ollama/api/embed"
+        )
+        self.token = os.environ.get("EMBED_TOKEN", "sk-9362a2b2bec045af9dfc896ee3d4e14c")  # Clem
+        self.model = os.environ.get("EMBED_MODELE", "bge-m3")
+        if os.environ.get("EMBED_BACKEND", "http").lower() == "local":
+            self.backend = LocalEmbeddingBackend(
+                os.environ.get("EMBED_MODELE_LOCAL", ""),
+                os.environ.get("EMBED_LOCAL_MOTEUR", "torch").lower(),
+            )
+        else:
+            self.backend = HttpEmbeddingBackend(self.OLLAMA_EMBED_URL, self.token, self.model)
+        # Le nom du modèle distingue les embeddings des différents moteurs dans les caches
+        self.model = self.backend.modele
+        # Taille des lots envoyés par vectorise_many, en textes et en tokens estimés
+        self.taille_lot = int(os.environ.get("EMBED_TAILLE_LOT", 32))
+        self.tokens_lot = int(os.environ.get("EMBED_TOKENS_LOT", 8192))
 
     def vectorise(self, texte: str) -> list:
         """
-        Vectorise un texte via l'API Ollama.
+        Vectorise un texte avec le moteur d'embedding configuré.
 
         Args:
             texte: Le texte à vectoriser
@@ -25,22 +50,69 @@ class EmbeddingService(ABC):
         Returns:
             list: Le vecteur embedding ou None en cas d'erreur
         """
-        headers = {"Content-Type": "application/json", "Authorization": f"Bearer {self.token}"}
-        data = {"model": self.model, "input": texte}
+        embeddings = self._envoyer(texte)
+        return embeddings[0] if embeddings else None
+
+    def vectorise_many(self, textes: list[str], batch_size: int = None) -> list:
+        """
+        Vectorise plusieurs textes en les envoyant par lots au moteur d'embedding.
+        Chaque lot contient au plus batch_size textes et environ EMBED_TOKENS_LOT tokens.
+        Si l'appel d'un lot échoue, ses textes sont renvoyés un par un.
+
+        Args:
+            textes: Les textes à vectoriser
+            batch_size: Nombre maximal de textes par appel (par défaut EMBED_TAILLE_LOT)
+
+        Returns:
+            list: Un vecteur par texte, dans le même ordre (None pour un texte en erreur)
+        """
+        if batch_size is None:
+            batch_size = self.taille_lot
+        if batch_size < 1:
+            raise ValueError("batch_size doit être supérieur ou égal à 1")
+        vecteurs = []
+        for lot in self._decouper_lots(textes, batch_size):
+            embeddings = self._envoyer(lot)
+            if embeddings is None and len(lot) > 1:
+                embeddings = [EmbeddingService.vectorise(self, texte) for texte in lot]
+            vecteurs.extend(embeddings or [None])
+        return vecteurs
 
-        try:
-            response = requests.post(self.OLLAMA_EMBED_URL, headers=headers, data=json.dumps(data))
+    def _decouper_lots(self, textes: list[str], batch_size: int) -> list[list[str]]:
+        """
+        Découpe les textes en lots consécutifs bornés en nombre de textes et en tokens.
+        Un texte plus long que le budget de tokens forme un lot à lui seul.
+        """
+        lots = []
+        lot = []
+        tokens = 0
+        for texte in textes:
+            tokens_texte = self.estimer_tokens(texte)
+            if lot and (len(lot) >= batch_size or tokens + tokens_texte > self.tokens_lot):
+                lots.append(lot)
+                lot = []
+                tokens = 0
+            lot.append(texte)
+            tokens += tokens_texte
+        if lot:
+            lots.append(lot)
+        return lots
 
-            if response.status_code == 200:
-                embedding = response.json().get("embeddings")[0]
-                return embedding
-            else:
-                print(f"Erreur {response.status_code}: {response.text}")
-                return None
+    @staticmethod
+    def estimer_tokens(texte: str) -> int:
+        """
+        Estime grossièrement le nombre de tokens d'un texte (environ 4 caractères par token).
+        """
+        return len(texte) // 4 + 1
 
-        except Exception as e:
-            print(f"Exception lors de la vectorisation: {str(e)}")
-            return None
+    def _envoyer(self, entree: str | list[str]) -> list | None:
+        """
+        Envoie un texte ou une liste de textes au moteur d'embedding en un seul appel.
+
+        Returns:
+            list: Les embeddings, un par texte, ou None en cas d'erreur
+        """
+        return self.backend.vectoriser(entree)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,95 @@
+import numpy as np
+
+from service.index_service import IndexService
+
+
+class ExactIndexService(IndexService):
+    """
+    Index exact : parcourt tout le catalogue.
+    Les embeddings sont stockés normalisés dans une seule matrice float32 contiguë,
+    les similarités sont obtenues par un unique produit matrice-vecteur et les
+    k meilleures chansons sont extraites par sélection partielle.
+    """
+
+    def __init__(self):
+        self.ids = np.empty(0, dtype=np.int64)
+        self.matrice = np.empty((0, 0), dtype=np.float32)
+        self.supprimes = set()
+        # ids et matrice sont des vues sur les n premières lignes de ces tampons
+        self._tampon_ids = self.ids
+        self._tampon = self.matrice
+
+    def construire(self, ids: list, vecteurs: list, normes: list = None) -> None:
+        """
+        Construit la matrice normalisée des embeddings.
+        Si les normes ont été enregistrées en BD, elles sont utilisées directement
+        et aucune norme n'est recalculée.
+        """
+        self.ids = self._tampon_ids = np.asarray(list(ids), dtype=np.int64)
+        self.matrice = self._tampon = self._normaliser(vecteurs, normes)
+        self.supprimes = set()
+
+    @classmethod
+    def depuis_matrice(cls, ids, matrice: np.ndarray) -> "ExactIndexService":
+        """
+        Crée un index à partir d'une matrice déjà normalisée, utilisée telle quelle
+        (sans copie), par exemple une matrice ouverte en memmap.
+        """
+        index = cls()
+        index.ids = index._tampon_ids = ids
+        index.matrice = index._tampon = matrice
+        return index
+
+    def ajouter(self, id_chanson: int, vecteur: list, norme: float = None) -> None:
+        """
+        Ajoute une ligne à la matrice (en O(1) amorti, sans renormaliser le catalogue).
+        """
+        n = len(self.ids)
+        vecteur = self._normaliser_vecteur(vecteur, norme)
+        self._tampon = self._ajouter_ligne(self._tampon, n, vecteur)
+        self._tampon_ids = self._ajouter_ligne(self._tampon_ids, n, id_chanson)
+        # ids d'abord : une recherche concurrente ne voit jamais plus de lignes que d'ids
+        self.ids = self._tampon_ids[: n + 1]
+        self.matrice = self._tampon[: n + 1]
+
+    def compacte(self, etat: tuple[int, frozenset]) -> "ExactIndexService":
+        """
+        Retourne un index ne contenant que les lignes des chansons non supprimées.
+        """
+        n, supprimes = etat
+        ids = np.asarray(self.ids[:n])
+        garder = ~np.isin(ids, list(supprimes))
+        return ExactIndexService.depuis_matrice(
+            np.ascontiguousarray(ids[garder]), np.ascontiguousarray(self.matrice[:n][garder])
+        )
+
+    def scores(self, vecteur: list) -> np.ndarray:
+        """
+        Calcule la similarité cosinus entre le vecteur et toutes les chansons de l'index.
+        """
+        requete = self._normaliser(np.asarray(vecteur, dtype=np.float32))
+        return self.matrice @ requete
+
+    def rechercher(self, vecteur: list, k: int) -> list[tuple[int, float]]:
+        """
+        Retourne les k chansons les plus proches du vecteur, par score décroissant.
+        """
+        if len(self.ids) == 0:
+            return []
+        scores = self.scores(vecteur)
+        ids = self.ids[: len(scores)]
+        scores = self._masquer(scores, ids)
+        return self._resultats(ids, scores, self._top_k(scores, k))
+
+    def rechercher_lot(self, vecteurs: list, k: int) -> list[list[tuple[int, float]]]:
+        """
+        Score tous les vecteurs contre le catalogue en un seul produit matrice-matrice
+        (BLAS), puis extrait les k meilleures chansons de chaque vecteur.
+        """
+        if len(self.ids) == 0 or len(vecteurs) == 0:
+            return [[] for _ in vecteurs]
+        matrice = self.matrice
+        ids = self.ids[: len(matrice)]
+        requetes = self._normaliser(np.asarray(vecteurs, dtype=np.float32))
+        scores = self._masquer(requetes @ matrice.T, ids)  # (nb_vecteurs, nb_chansons)
+        return [self._resultats(ids, ligne, self._top_k(ligne, k)) for ligne in scores]
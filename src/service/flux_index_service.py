@@ -0,0 +1,91 @@
+import heapq
+
+import numpy as np
+
+from dao.dao_paroles import DAO_paroles
+from service.index_service import IndexService
+
+
+class FluxIndexService(IndexService):
+    """
+    Recherche en flux, sans index en mémoire.
+    Chaque recherche parcourt le catalogue en BD par blocs de itersize chansons (curseur
+    côté serveur), score chaque bloc puis ne garde que les k meilleurs candidats dans un
+    tas borné : la mémoire utilisée ne dépend pas de la taille du catalogue.
+    Les ajouts et suppressions sont lus directement en BD à la recherche suivante.
+
+    Attributs
+    ---------
+    itersize : int
+        nombre de chansons lues et scorées à la fois
+    """
+
+    def __init__(self, itersize: int = 2000, signature: tuple = (0, None)):
+        self.itersize = itersize
+        self.supprimes = set()
+        self._signature = tuple(signature)
+
+    def construire(self, ids: list, vecteurs: list, normes: list = None) -> None:
+        """
+        Rien à construire : les embeddings sont relus en BD à chaque recherche.
+        """
+        self._signature = (len(ids), max(ids) if len(ids) else None)
+
+    def ajouter(self, id_chanson: int, vecteur: list, norme: float = None) -> None:
+        """
+        La chanson sera lue en BD ; seule la signature suivie est mise à jour.
+        """
+        nb_chansons, id_max = self._signature
+        self._signature = (nb_chansons + 1, max(id_chanson, id_max or id_chanson))
+
+    def contient(self, id_chanson: int) -> bool:
+        """
+        Retourne toujours False : un ajout met à jour la signature suivie, une suppression
+        est ignorée. La signature ne correspond alors plus à la BD et l'index, qui ne coûte
+        rien à construire, est recréé à la recherche suivante.
+        """
+        return False
+
+    def compacte(self, etat: tuple[int, frozenset]) -> "FluxIndexService":
+        """
+        Aucune chanson supprimée n'est conservée : rien à compacter.
+        """
+        return self
+
+    def signature(self) -> tuple[int, int | None]:
+        return self._signature
+
+    def __len__(self) -> int:
+        return self._signature[0]
+
+    def rechercher(self, vecteur: list, k: int) -> list[tuple[int, float]]:
+        """
+        Retourne les k chansons les plus proches du vecteur, en un parcours du catalogue.
+        """
+        return self.rechercher_lot([vecteur], k)[0]
+
+    def rechercher_lot(self, vecteurs: list, k: int) -> list[list[tuple[int, float]]]:
+        """
+        Score tous les vecteurs en un seul parcours du catalogue : chaque bloc lu est
+        comparé à tous les vecteurs par un produit matrice-matrice.
+        """
+        if len(vecteurs) == 0 or k <= 0:
+            return [[] for _ in vecteurs]
+        requetes = self._normaliser(np.asarray(vecteurs, dtype=np.float32))
+        # Un tas min par vecteur : le plus mauvais des k meilleurs est en tête
+        tas = [[] for _ in vecteurs]
+        for ids, bloc, normes in DAO_paroles().iter_embeddings(self.itersize):
+            if None in normes:
+                normes = None
+            scores = self._normaliser(bloc, normes) @ requetes.T  # (taille du bloc, nb_vecteurs)
+            for j, tas_vecteur in enumerate(tas):
+                colonne = scores[:, j]
+                for i in self._top_k(colonne, k):
+                    candidat = (float(colonne[i]), int(ids[i]))
+                    if len(tas_vecteur) < k:
+                        heapq.heappush(tas_vecteur, candidat)
+                    elif candidat > tas_vecteur[0]:
+                        heapq.heapreplace(tas_vecteur, candidat)
+        return [
+            [(id_chanson, score) for score, id_chanson in sorted(t, reverse=True)] for t in tas
+        ]
@@ -0,0 +1,203 @@
+import heapq
+import math
+import random
+
+import numpy as np
+
+from service.index_service import IndexService
+
+
+class HnswIndexService(IndexService):
+    """
+    Index approximatif HNSW (Hierarchical Navigable Small World).
+    Les vecteurs normalisés sont organisés en graphes de proximité superposés :
+    une recherche descend glouton les couches hautes (peu de nœuds) puis explore
+    la couche 0 avec une file de taille ef_search. Le temps de requête est
+    sous-linéaire en la taille du catalogue.
+
+    Attributs
+    ---------
+    M : int
+        nombre de voisins par nœud (2 * M sur la couche 0)
+    ef_construction : int
+        taille de la liste de candidats lors de l'insertion
+    ef_search : int
+        taille de la liste de candidats lors d'une recherche
+    """
+
+    def __init__(self, M: int = 16, ef_construction: int = 200, ef_search: int = 50, graine=None):
+        if M < 2:
+            raise ValueError("M doit être supérieur ou égal à 2")
+        self.M = M
+        self.M0 = 2 * M
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self._mult_niveau = 1 / math.log(M)
+        self._aleatoire = random.Random(graine)
+        self.ids = np.empty(0, dtype=np.int64)
+        self.supprimes = set()
+        self._vecteurs = np.empty((0, 0), dtype=np.float32)
+        # ids et _vecteurs sont des vues sur les n premières lignes de ces tampons
+        self._tampon_ids = self.ids
+        self._tampon_vecteurs = self._vecteurs
+        self._niveaux = []  # niveau maximal de chaque nœud
+        self._graphe = []  # une liste d'adjacence (dict nœud -> voisins) par couche
+        self._point_entree = None
+
+    def construire(self, ids: list, vecteurs: list, normes: list = None) -> None:
+        """
+        Construit le graphe en insérant les vecteurs un par un.
+        """
+        matrice = self._normaliser(vecteurs, normes)
+        n = matrice.shape[0]
+        self.ids = self._tampon_ids = np.asarray(list(ids), dtype=np.int64)
+        self._vecteurs = self._tampon_vecteurs = matrice
+        self.supprimes = set()
+        self._niveaux = []
+        self._graphe = []
+        self._point_entree = None
+        for noeud in range(n):
+            self._inserer(noeud)
+
+    def ajouter(self, id_chanson: int, vecteur: list, norme: float = None) -> None:
+        """
+        Insère un seul nœud dans le graphe existant.
+        """
+        n = len(self.ids)
+        self._tampon_vecteurs = self._ajouter_ligne(
+            self._tampon_vecteurs, n, self._normaliser_vecteur(vecteur, norme)
+        )
+        self._tampon_ids = self._ajouter_ligne(self._tampon_ids, n, id_chanson)
+        self.ids = self._tampon_ids[: n + 1]
+        self._vecteurs = self._tampon_vecteurs[: n + 1]
+        self._inserer(n)
+
+    def compacte(self, etat: tuple[int, frozenset]) -> "HnswIndexService":
+        """
+        Reconstruit un graphe avec les seuls nœuds non supprimés : les nœuds supprimés
+        ne peuvent pas être retirés du graphe sans dégrader sa navigabilité.
+        """
+        n, supprimes = etat
+        ids = np.asarray(self.ids[:n])
+        garder = ~np.isin(ids, list(supprimes))
+        index = HnswIndexService(self.M, self.ef_construction, self.ef_search)
+        index.construire(ids[garder], self._vecteurs[:n][garder])
+        return index
+
+    def rechercher(self, vecteur: list, k: int) -> list[tuple[int, float]]:
+        """
+        Retourne les k chansons approximativement les plus proches du vecteur.
+        Les nœuds supprimés servent encore au parcours du graphe mais n'entrent jamais
+        dans la liste des résultats de la couche 0.
+        """
+        if self._point_entree is None or k <= 0:
+            return []
+        requete = self._normaliser(np.asarray(vecteur, dtype=np.float32))
+        entree = [self._point_entree]
+        for niveau in range(self._niveaux[self._point_entree], 0, -1):
+            entree = [self._plus_proche(requete, entree, niveau)]
+        resultats = self._rechercher_couche(
+            requete, entree, max(self.ef_search, k), 0, self.supprimes
+        )
+        return [(int(self.ids[noeud]), score) for score, noeud in heapq.nlargest(k, resultats)]
+
+    def _tirer_niveau(self) -> int:
+        """
+        Tire le niveau maximal d'un nouveau nœud selon une loi exponentielle.
+        """
+        return int(-math.log(1.0 - self._aleatoire.random()) * self._mult_niveau)
+
+    def _inserer(self, noeud: int) -> None:
+        """
+        Insère le nœud (déjà présent dans la matrice des vecteurs) dans le graphe.
+        """
+        niveau = self._tirer_niveau()
+        self._niveaux.append(niveau)
+        while len(self._graphe) <= niveau:
+            self._graphe.append({})
+        for couche in range(niveau + 1):
+            self._graphe[couche][noeud] = []
+
+        if self._point_entree is None:
+            self._point_entree = noeud
+            return
+
+        vecteur = self._vecteurs[noeud]
+        niveau_entree = self._niveaux[self._point_entree]
+        entree = [self._point_entree]
+        for couche in range(niveau_entree, niveau, -1):
+            entree = [self._plus_proche(vecteur, entree, couche)]
+
+        for couche in range(min(niveau, niveau_entree), -1, -1):
+            candidats = self._rechercher_couche(vecteur, entree, self.ef_construction, couche)
+            m_max = self.M0 if couche == 0 else self.M
+            voisins = [v for _, v in heapq.nlargest(self.M, candidats)]
+            self._graphe[couche][noeud] = voisins
+            for voisin in voisins:
+                liens = self._graphe[couche][voisin]
+                liens.append(noeud)
+                if len(liens) > m_max:
+                    self._graphe[couche][voisin] = self._elaguer(voisin, liens, m_max)
+            entree = [v for _, v in candidats]
+
+        if niveau > niveau_entree:
+            self._point_entree = noeud
+
+    def _elaguer(self, noeud: int, liens: list, m_max: int) -> list:
+        """
+        Ne garde que les m_max voisins les plus proches d'un nœud.
+        """
+        scores = self._vecteurs[liens] @ self._vecteurs[noeud]
+        garder = np.argsort(-scores, kind="stable")[:m_max]
+        return [liens[i] for i in garder]
+
+    def _plus_proche(self, requete: np.ndarray, entree: list, couche: int) -> int:
+        """
+        Recherche gloutonne du nœud le plus proche sur une couche haute.
+        """
+        return max(self._rechercher_couche(requete, entree, 1, couche))[1]
+
+    def _rechercher_couche(
+        self, requete: np.ndarray, entree: list, ef: int, couche: int, exclus: set = None
+    ) -> list[tuple[float, int]]:
+        """
+        Recherche en faisceau sur une couche du graphe.
+        Les nœuds dont l'identifiant est dans exclus sont parcourus mais jamais retenus.
+
+        Returns
+        ----------
+        list[tuple[float, int]]
+            au plus ef couples (similarité, nœud), sous forme de tas min
+        """
+        visites = set(entree)
+        scores = self._vecteurs[entree] @ requete
+        candidats = [(-float(s), n) for s, n in zip(scores, entree)]
+        resultats = [(-o, n) for o, n in candidats if not self._exclu(n, exclus)]
+        heapq.heapify(resultats)
+        heapq.heapify(candidats)
+        while len(resultats) > ef:
+            heapq.heappop(resultats)
+        adjacence = self._graphe[couche]
+        while candidats:
+            oppose, courant = heapq.heappop(candidats)
+            if len(resultats) >= ef and -oppose < resultats[0][0]:
+                break
+            voisins = [v for v in adjacence.get(courant, ()) if v not in visites]
+            if not voisins:
+                continue
+            visites.update(voisins)
+            scores = self._vecteurs[voisins] @ requete
+            for score, voisin in zip(scores.tolist(), voisins):
+                if len(resultats) < ef or score > resultats[0][0]:
+                    heapq.heappush(candidats, (-score, voisin))
+                    if not self._exclu(voisin, exclus):
+                        heapq.heappush(resultats, (score, voisin))
+                        if len(resultats) > ef:
+                            heapq.heappop(resultats)
+        return resultats
+
+    def _exclu(self, noeud: int, exclus: set) -> bool:
+        """
+        Indique si l'identifiant du nœud fait partie des identifiants exclus.
+        """
+        return bool(exclus) and int(self.ids[noeud]) in exclus
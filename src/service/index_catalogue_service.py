@@ -0,0 +1,405 @@
+import logging
+import os
+import threading
+
+import dotenv
+import numpy as np
+
+from dao.dao_paroles import DAO_paroles
+from service.exact_index_service import ExactIndexService
+from service.flux_index_service import FluxIndexService
+from service.hnsw_index_service import HnswIndexService
+from service.index_service import IndexService
+from service.ivf_index_service import IvfIndexService
+from service.pq_index_service import PqIndexService
+from service.projection_index_service import ProjectionIndexService
+from service.snapshot_service import SnapshotService
+from utils.evenements_catalogue import BusCatalogue, EvenementCatalogue
+from utils.singleton import Singleton
+
+
+class IndexCatalogueService(metaclass=Singleton):
+    """
+    Garde en mémoire, pour tout le processus, l'index de recherche du catalogue.
+    L'index n'est reconstruit que lorsque la signature du catalogue en BD change (voir
+    DAO_paroles.get_signature : nombre de chansons, id max et génération du catalogue).
+
+    Les ajouts et suppressions de chansons faits par ce processus (évènements publiés par
+    la couche DAO) sont appliqués sur place à l'index, dont la signature suit celle de la
+    BD : aucune reconstruction n'est alors nécessaire. Quand la part de chansons supprimées
+    dépasse INDEX_SEUIL_COMPACTION, l'index est compacté dans un thread en arrière-plan.
+
+    Les index longs à construire (graphe HNSW, k-means d'un index IVF sans fichier à jour)
+    ne le sont jamais pendant une requête : un index exact est servi le temps que l'index
+    configuré soit construit dans un thread en arrière-plan.
+
+    Le type d'index est choisi par variables d'environnement (fichier .env) :
+    - PLAYLIST_INDEX : "exact" (par défaut), "hnsw", "ivf", "pq", "projection" ou "flux"
+      (aucun index en mémoire : chaque recherche parcourt la BD par blocs)
+    - INDEX_SEUIL_EXACT : en dessous de ce nombre de chansons, l'index exact est utilisé
+    - HNSW_M, HNSW_EF_CONSTRUCTION, HNSW_EF_SEARCH : paramètres de l'index HNSW
+    - IVF_NLIST (0 = automatique), IVF_NPROBE : paramètres de l'index IVF
+    - IVF_FICHIER : fichier de l'index IVF reconstruit hors ligne (rebuild_index.py)
+    - PQ_NB_SOUS_ESPACES : nombre d'octets par embedding compressé
+    - PQ_RECLASSEMENT : facteur de candidats reclassés avec les vecteurs complets (0 = aucun)
+    - PROJECTION_DIMENSION, PROJECTION_METHODE ("acp" ou "aleatoire") : espace réduit de
+      la présélection en deux étapes
+    - PROJECTION_MULTIPLICATEUR : candidats reclassés exactement par résultat demandé
+    - PROJECTION_FICHIER : fichier de la projection apprise hors ligne (rebuild_index.py)
+    - FLUX_ITERSIZE : nombre de chansons lues à la fois par la recherche en flux
+    - SNAPSHOT_DOSSIER : dossier de l'instantané memmap des embeddings (vide = désactivé)
+    - INDEX_SEUIL_COMPACTION : part de chansons supprimées déclenchant une compaction
+    """
+
+    MODES = ("exact", "hnsw", "ivf", "pq", "projection", "flux")
+
+    def __init__(self):
+        dotenv.load_dotenv(override=True)
+        self.mode = os.environ.get("PLAYLIST_INDEX", "exact").lower()
+        if self.mode not in self.MODES:
+            raise ValueError(f"PLAYLIST_INDEX doit valoir l'une des valeurs {self.MODES}")
+        self.seuil_exact = int(os.environ.get("INDEX_SEUIL_EXACT", 1000))
+        self.hnsw_M = int(os.environ.get("HNSW_M", 16))
+        self.hnsw_ef_construction = int(os.environ.get("HNSW_EF_CONSTRUCTION", 200))
+        self.hnsw_ef_search = int(os.environ.get("HNSW_EF_SEARCH", 50))
+        self.ivf_nlist = int(os.environ.get("IVF_NLIST", 0)) or None
+        self.ivf_nprobe = int(os.environ.get("IVF_NPROBE", 8))
+        self.ivf_fichier = os.environ.get("IVF_FICHIER", "data/index_ivf.npz")
+        self.pq_nb_sous_espaces = int(os.environ.get("PQ_NB_SOUS_ESPACES", 32))
+        self.pq_reclassement = int(os.environ.get("PQ_RECLASSEMENT", 4))
+        self.projection_dimension = int(os.environ.get("PROJECTION_DIMENSION", 64))
+        self.projection_methode = os.environ.get("PROJECTION_METHODE", "acp").lower()
+        self.projection_multiplicateur = int(os.environ.get("PROJECTION_MULTIPLICATEUR", 10))
+        self.projection_fichier = os.environ.get("PROJECTION_FICHIER", "data/projection.npz")
+        self.flux_itersize = int(os.environ.get("FLUX_ITERSIZE", 2000))
+        dossier_snapshot = os.environ.get("SNAPSHOT_DOSSIER", "")
+        self.snapshot = SnapshotService(dossier_snapshot) if dossier_snapshot else None
+        self.seuil_compaction = float(os.environ.get("INDEX_SEUIL_COMPACTION", 0.2))
+        self.index = None
+        self.signature = None
+        self._verrou = threading.RLock()
+        # Évènements reçus pendant une compaction, rejoués ensuite sur l'index compacté
+        self._journal = None
+        self._compaction = None
+        self._construction = None
+        self._ecriture_snapshot = None
+        BusCatalogue().abonner(self.appliquer_evenement)
+
+    def get_index(self) -> IndexService:
+        """
+        Retourne l'index du catalogue, reconstruit si le catalogue a changé en BD.
+        """
+        signature = DAO_paroles().get_signature()
+        with self._verrou:
+            if self.index is None or signature != self.signature:
+                self.index = self._index_a_servir(signature)
+                self.signature = signature
+            return self.index
+
+    def _index_a_servir(self, signature: tuple) -> IndexService:
+        """
+        Construit l'index configuré, ou, s'il est long à construire, retourne un index exact
+        provisoire et lance la construction de l'index configuré en arrière-plan.
+        """
+        if self.mode not in ("hnsw", "ivf") or signature[0] < self.seuil_exact:
+            return self.construire_index(signature)
+        if self.mode == "ivf":
+            index = self._charger_ivf(signature)
+            if index is not None:
+                return index
+        ids, vecteurs, normes = self._lire_embeddings(signature)
+        if isinstance(vecteurs, np.memmap):
+            provisoire = ExactIndexService.depuis_matrice(ids, vecteurs)
+        else:
+            provisoire = ExactIndexService()
+            if len(ids):
+                provisoire.construire(ids, vecteurs, normes)
+        if len(ids) >= self.seuil_exact:
+            self._lancer_construction(provisoire, ids, vecteurs, normes)
+        return provisoire
+
+    def appliquer_evenement(self, evenement: EvenementCatalogue) -> None:
+        """
+        Applique à l'index en mémoire un changement du catalogue, sans le reconstruire.
+        """
+        with self._verrou:
+            if evenement.type_evenement == EvenementCatalogue.VIDAGE:
+                self.index = None
+                self.signature = None
+                return
+            if self.index is None:
+                return
+            self._appliquer(self.index, evenement)
+            if self._journal is not None:
+                self._journal.append(evenement)
+            # La génération du catalogue ne change pas avec un ajout ou une suppression
+            self.signature = self.index.signature() + tuple(self.signature[2:])
+            if self._journal is None and self.index.taux_supprimes() > self.seuil_compaction:
+                self._lancer_compaction()
+
+    @staticmethod
+    def _appliquer(index: IndexService, evenement: EvenementCatalogue) -> None:
+        """
+        Ajoute ou marque comme supprimée une chanson ; un évènement déjà pris en compte
+        (chanson déjà lue en BD lors de la construction) est ignoré.
+        """
+        if evenement.type_evenement == EvenementCatalogue.AJOUT:
+            if not index.contient(evenement.id_chanson):
+                index.ajouter(evenement.id_chanson, evenement.vecteur, evenement.norme)
+        elif evenement.type_evenement == EvenementCatalogue.SUPPRESSION:
+            if index.contient(evenement.id_chanson):
+                index.supprimer(evenement.id_chanson)
+
+    def _lancer_compaction(self) -> None:
+        """
+        Démarre la compaction de l'index courant dans un thread en arrière-plan.
+        Les recherches continuent sur l'index courant pendant ce temps.
+        """
+        index = self.index
+        etat = index.etat()
+        self._journal = []
+        self._compaction = threading.Thread(
+            target=self._compacter, args=(index, etat, self._journal), daemon=True
+        )
+        self._compaction.start()
+
+    def _compacter(self, index: IndexService, etat: tuple, journal: list) -> None:
+        """
+        Compacte l'index puis l'installe à sa place (voir _installer).
+        """
+        try:
+            compacte = index.compacte(etat)
+        except Exception as e:
+            logging.error(f"Erreur lors de la compaction de l'index : {e}")
+            compacte = None
+        self._installer(index, compacte, journal)
+
+    def _lancer_construction(
+        self, provisoire: IndexService, ids: list, vecteurs: list, normes: list | None
+    ) -> None:
+        """
+        Démarre la construction de l'index configuré dans un thread en arrière-plan.
+        Les recherches utilisent l'index provisoire pendant ce temps.
+        """
+        self._journal = []
+        self._construction = threading.Thread(
+            target=self._construire,
+            args=(provisoire, ids, vecteurs, normes, self._journal),
+            daemon=True,
+        )
+        self._construction.start()
+
+    def _construire(
+        self,
+        provisoire: IndexService,
+        ids: list,
+        vecteurs: list,
+        normes: list | None,
+        journal: list,
+    ) -> None:
+        """
+        Construit l'index configuré puis l'installe à la place de l'index provisoire.
+        """
+        try:
+            index = self._index_long_a_construire()
+            index.construire(ids, vecteurs, normes)
+        except Exception as e:
+            logging.error(f"Erreur lors de la construction de l'index : {e}")
+            index = None
+        self._installer(provisoire, index, journal)
+
+    def _installer(
+        self, remplace: IndexService, index: IndexService | None, journal: list
+    ) -> None:
+        """
+        Si l'index à remplacer est toujours servi, rejoue sur le nouvel index les évènements
+        reçus pendant sa construction puis l'installe ; sinon (catalogue vidé ou reconstruit
+        entre-temps) le nouvel index est abandonné.
+        """
+        with self._verrou:
+            if index is not None and self.index is remplace:
+                for evenement in journal:
+                    self._appliquer(index, evenement)
+                self.index = index
+            if self._journal is journal:
+                self._journal = None
+
+    def construire_index(self, signature: tuple = None) -> IndexService:
+        """
+        Construit l'index configuré à partir des embeddings de la BD.
+        Les petits catalogues utilisent toujours l'index exact, sauf en mode flux.
+        En mode IVF, l'index reconstruit hors ligne est chargé s'il correspond au catalogue.
+        """
+        if self.mode == "flux":
+            # Rien n'est lu ici : la recherche relit les embeddings en BD par blocs
+            return FluxIndexService(self.flux_itersize, (signature or (0, None))[:2])
+        if self.mode == "ivf" and signature is not None:
+            index = self._charger_ivf(signature)
+            if index is not None:
+                return index
+        ids, vecteurs, normes = self._lire_embeddings(signature)
+        if self.mode in ("hnsw", "ivf") and len(ids) >= self.seuil_exact:
+            index = self._index_long_a_construire()
+        elif self.mode == "pq" and len(ids) >= self.seuil_exact:
+            index = PqIndexService(
+                nb_sous_espaces=self.pq_nb_sous_espaces, reclassement=self.pq_reclassement
+            )
+            # Le reclassement relit en BD les vecteurs complets des seuls candidats
+            index.lecteur_vecteurs = DAO_paroles().get_embeddings_from_ids
+        elif self.mode == "projection" and len(ids) >= self.seuil_exact:
+            index = self._index_projection()
+            if os.path.exists(self.projection_fichier):
+                index.charger_projection(self.projection_fichier)
+            if isinstance(vecteurs, np.memmap):
+                # Le reclassement lit directement les lignes de l'instantané
+                index.indexer_matrice(ids, vecteurs)
+                return index
+        elif isinstance(vecteurs, np.memmap):
+            # La matrice de l'instantané est déjà normalisée : l'index la lit sans la copier
+            return ExactIndexService.depuis_matrice(ids, vecteurs)
+        else:
+            index = ExactIndexService()
+        if len(ids):
+            index.construire(ids, vecteurs, normes)
+        return index
+
+    def _index_long_a_construire(self) -> IndexService:
+        """
+        Index HNSW ou IVF vide, configuré par les variables d'environnement.
+        """
+        if self.mode == "hnsw":
+            return HnswIndexService(
+                M=self.hnsw_M,
+                ef_construction=self.hnsw_ef_construction,
+                ef_search=self.hnsw_ef_search,
+            )
+        return IvfIndexService(nlist=self.ivf_nlist, nprobe=self.ivf_nprobe)
+
+    def _charger_ivf(self, signature: tuple) -> IvfIndexService | None:
+        """
+        Charge l'index IVF reconstruit hors ligne s'il correspond à la signature du catalogue.
+        """
+        if not os.path.exists(self.ivf_fichier):
+            return None
+        index, signature_fichier = IvfIndexService.charger(self.ivf_fichier)
+        return index if signature_fichier == tuple(signature) else None
+
+    def reconstruire_ivf(self) -> IvfIndexService:
+        """
+        Reconstruit l'index IVF à partir de la BD et l'enregistre dans IVF_FICHIER,
+        avec la signature du catalogue pour détecter un fichier périmé.
+        """
+        signature = DAO_paroles().get_signature()
+        ids, vecteurs, normes = self._lire_embeddings()
+        if not ids:
+            raise Exception("Il n'y a pas de chansons dans la base de données")
+        index = IvfIndexService(nlist=self.ivf_nlist, nprobe=self.ivf_nprobe)
+        index.construire(ids, vecteurs, normes)
+        dossier = os.path.dirname(self.ivf_fichier)
+        if dossier:
+            os.makedirs(dossier, exist_ok=True)
+        index.sauvegarder(self.ivf_fichier, signature)
+        return index
+
+    def reconstruire_projection(self) -> ProjectionIndexService:
+        """
+        Apprend la projection de l'index en deux étapes à partir de la BD et l'enregistre
+        dans PROJECTION_FICHIER. Elle reste valable pour les chansons ajoutées ensuite.
+        """
+        ids, vecteurs, normes = self._lire_embeddings()
+        if not ids:
+            raise Exception("Il n'y a pas de chansons dans la base de données")
+        index = self._index_projection()
+        index.construire(ids, vecteurs, normes)
+        dossier = os.path.dirname(self.projection_fichier)
+        if dossier:
+            os.makedirs(dossier, exist_ok=True)
+        index.sauvegarder_projection(self.projection_fichier)
+        return index
+
+    def _index_projection(self) -> ProjectionIndexService:
+        """
+        Index en deux étapes vide, configuré par les variables d'environnement.
+        """
+        return ProjectionIndexService(
+            dimension=self.projection_dimension,
+            multiplicateur=self.projection_multiplicateur,
+            methode=self.projection_methode,
+        )
+
+    def reconstruire_snapshot(self) -> str:
+        """
+        Écrit l'instantané des embeddings du catalogue dans SNAPSHOT_DOSSIER.
+
+        Returns
+        ----------
+        str
+            la version de l'instantané écrite
+        """
+        if self.snapshot is None:
+            raise Exception("SNAPSHOT_DOSSIER n'est pas renseigné")
+        version = self._ecrire_snapshot(DAO_paroles().get_signature())
+        if version is None:
+            raise Exception("Il n'y a pas de chansons dans la base de données")
+        return version
+
+    def _ecrire_snapshot(self, signature: tuple) -> str | None:
+        """
+        Écrit l'instantané à partir de la BD, pour la génération du catalogue donnée.
+        Retourne None si le catalogue est vide.
+        """
+        ids, vecteurs, normes = self._lire_embeddings()
+        if not ids:
+            return None
+        return self.snapshot.ecrire(ids, vecteurs, normes, signature)
+
+    def _lire_embeddings(self, signature: tuple = None) -> tuple[list, list, list | None]:
+        """
+        Lit les identifiants, embeddings et normes du catalogue.
+        Les normes ne sont retournées que si elles sont toutes connues.
+
+        Si un instantané est configuré et qu'une signature est donnée, les embeddings sont
+        lus depuis l'instantané (matrice normalisée en memmap, normes None) ; un instantané
+        absent ou périmé n'est pas attendu : les embeddings sont lus en BD et l'instantané
+        est réécrit en arrière-plan.
+        """
+        if self.snapshot is not None and signature is not None:
+            instantane = self.snapshot.charger(signature)
+            if instantane is not None:
+                ids, matrice = instantane
+                return ids, matrice, None
+        embeddings = DAO_paroles().get_embeddings()
+        ids, vecteurs, normes = embeddings if embeddings else ([], [], [])
+        if None in normes:
+            normes = None
+        if self.snapshot is not None and signature is not None and ids:
+            self._lancer_ecriture_snapshot(ids, vecteurs, normes, signature)
+        return ids, vecteurs, normes
+
+    def _lancer_ecriture_snapshot(
+        self, ids: list, vecteurs: list, normes: list | None, signature: tuple
+    ) -> None:
+        """
+        Démarre dans un thread en arrière-plan l'écriture de l'instantané à partir des
+        embeddings déjà lus en BD, sauf si une écriture est déjà en cours.
+        """
+        with self._verrou:
+            if self._ecriture_snapshot is not None and self._ecriture_snapshot.is_alive():
+                return
+            self._ecriture_snapshot = threading.Thread(
+                target=self._ecrire_snapshot_en_arriere_plan,
+                args=(ids, vecteurs, normes, signature),
+                daemon=True,
+            )
+            self._ecriture_snapshot.start()
+
+    def _ecrire_snapshot_en_arriere_plan(
+        self, ids: list, vecteurs: list, normes: list | None, signature: tuple
+    ) -> None:
+        """
+        Écrit l'instantané ; un échec est journalisé, la prochaine lecture en BD réessaiera.
+        """
+        try:
+            self.snapshot.ecrire(ids, vecteurs, normes, signature)
+        except Exception as e:
+            logging.error(f"Erreur lors de l'écriture de l'instantané : {e}")
@@ -0,0 +1,70 @@
+import os
+import threading
+
+import dotenv
+
+from dao.dao_paroles import DAO_paroles
+from service.bm25_index_service import Bm25IndexService
+from utils.evenements_catalogue import BusCatalogue, EvenementCatalogue
+from utils.singleton import Singleton
+
+
+class IndexLexicalService(metaclass=Singleton):
+    """
+    Garde en mémoire, pour tout le processus, l'index inversé BM25 des paroles du catalogue.
+    Comme l'index de recherche par embeddings, il n'est reconstruit que lorsque la signature
+    du catalogue en BD change (nombre de chansons, id max et génération : un autre processus
+    peut avoir vidé et rechargé le catalogue) ; les ajouts et suppressions publiés par la
+    couche DAO de ce processus lui sont appliqués sur place.
+
+    Paramètres BM25 (fichier .env) : BM25_K1 et BM25_B.
+    """
+
+    def __init__(self):
+        dotenv.load_dotenv(override=True)
+        self.k1 = float(os.environ.get("BM25_K1", 1.2))
+        self.b = float(os.environ.get("BM25_B", 0.75))
+        self.index = None
+        self.signature = None
+        self._verrou = threading.RLock()
+        BusCatalogue().abonner(self.appliquer_evenement)
+
+    def get_index(self) -> Bm25IndexService:
+        """
+        Retourne l'index lexical, reconstruit si le catalogue a changé en BD.
+        """
+        signature = DAO_paroles().get_signature()
+        with self._verrou:
+            if self.index is None or signature != self.signature:
+                index = Bm25IndexService(self.k1, self.b)
+                index.construire(*DAO_paroles().get_textes())
+                self.index = index
+                self.signature = signature
+            return self.index
+
+    def rechercher(self, requete: str, k: int) -> list[tuple[int, float]]:
+        """
+        Retourne les k chansons dont les paroles correspondent le mieux à la requête.
+        La recherche se fait sous le verrou : l'index n'est pas modifié pendant ce temps.
+        """
+        with self._verrou:
+            return self.get_index().rechercher(requete, k)
+
+    def appliquer_evenement(self, evenement: EvenementCatalogue) -> None:
+        """
+        Applique à l'index lexical un changement du catalogue, sans le reconstruire.
+        """
+        with self._verrou:
+            if evenement.type_evenement == EvenementCatalogue.VIDAGE:
+                self.index = None
+                self.signature = None
+                return
+            if self.index is None:
+                return
+            if evenement.type_evenement == EvenementCatalogue.AJOUT:
+                if not self.index.contient(evenement.id_chanson):
+                    self.index.ajouter(evenement.id_chanson, evenement.paroles)
+            elif evenement.type_evenement == EvenementCatalogue.SUPPRESSION:
+                self.index.supprimer(evenement.id_chanson)
+            # La génération du catalogue ne change pas avec un ajout ou une suppression
+            self.signature = self.index.signature() + tuple(self.signature[2:])
@@ -0,0 +1,226 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+
+class IndexService(ABC):
+    """
+    Classe abstraite pour les index de recherche de chansons par similarité cosinus.
+    Un index est construit à partir des identifiants et des embeddings des paroles,
+    puis interrogé avec le vecteur d'un mot-clé.
+
+    Il est ensuite tenu à jour sur place : ajouter() insère un seul vecteur et supprimer()
+    marque une chanson comme supprimée (tombstone) sans la retirer des structures. Les
+    chansons marquées sont masquées lors de la sélection des résultats (score à -inf ou
+    nœud exclu du parcours) jusqu'à ce que compacte() les élimine.
+    """
+
+    @abstractmethod
+    def construire(self, ids: list, vecteurs: list, normes: list = None) -> None:
+        """
+        Construit l'index à partir des embeddings du catalogue.
+
+        Parameters
+        ----------
+        ids : list[int]
+            identifiants associés à chaque vecteur
+        vecteurs : list[list[float]] ou np.ndarray
+            embeddings des paroles, un par identifiant
+        normes : list[float] ou None
+            normes des embeddings enregistrées en BD, calculées si absentes
+        """
+
+    @abstractmethod
+    def rechercher(self, vecteur: list, k: int) -> list[tuple[int, float]]:
+        """
+        Retourne les k identifiants les plus proches du vecteur, par score décroissant.
+
+        Parameters
+        ----------
+        vecteur : list[float]
+            vecteur du mot-clé
+        k : int
+            nombre de résultats souhaités
+
+        Returns
+        ----------
+        list[tuple[int, float]]
+            liste de couples (id, similarité cosinus)
+        """
+
+    def rechercher_lot(self, vecteurs: list, k: int) -> list[list[tuple[int, float]]]:
+        """
+        Recherche les k plus proches voisins de plusieurs vecteurs.
+        Par défaut une recherche par vecteur ; l'index exact la remplace par un seul
+        produit matrice-matrice.
+
+        Returns
+        ----------
+        list[list[tuple[int, float]]]
+            pour chaque vecteur, la liste de couples (id, similarité cosinus)
+        """
+        return [self.rechercher(vecteur, k) for vecteur in vecteurs]
+
+    @abstractmethod
+    def ajouter(self, id_chanson: int, vecteur: list, norme: float = None) -> None:
+        """
+        Ajoute une chanson à l'index sans le reconstruire.
+
+        Parameters
+        ----------
+        id_chanson : int
+            identifiant de la chanson
+        vecteur : list[float]
+            embedding des paroles
+        norme : float ou None
+            norme de l'embedding enregistrée en BD, calculée si absente
+        """
+
+    @abstractmethod
+    def compacte(self, etat: tuple[int, frozenset]) -> "IndexService":
+        """
+        Retourne un nouvel index sans les chansons supprimées.
+        Peut s'exécuter dans un autre thread pendant que des chansons sont ajoutées ou
+        supprimées : seul l'état donné (voir etat()) est compacté, les changements
+        suivants sont à rejouer sur le nouvel index.
+        """
+
+    def supprimer(self, id_chanson: int) -> None:
+        """
+        Marque une chanson comme supprimée : elle n'apparaît plus dans les résultats.
+        """
+        self.supprimes.add(int(id_chanson))
+
+    def contient(self, id_chanson: int) -> bool:
+        """
+        Indique si l'identifiant est présent dans l'index (même marqué comme supprimé).
+        """
+        return bool(np.any(self._tous_les_ids() == id_chanson))
+
+    def etat(self) -> tuple[int, frozenset]:
+        """
+        Photographie de l'index à passer à compacte() : nombre de vecteurs et chansons
+        supprimées à cet instant.
+        """
+        return len(self.ids), frozenset(self.supprimes)
+
+    def signature(self) -> tuple[int, int | None]:
+        """
+        Nombre de chansons et plus grand identifiant de l'index, comparable à la
+        signature du catalogue en BD (DAO_paroles.get_signature).
+        """
+        ids = self._tous_les_ids()
+        if self.supprimes:
+            ids = ids[~np.isin(ids, list(self.supprimes))]
+        return len(ids), int(ids.max()) if len(ids) else None
+
+    def taux_supprimes(self) -> float:
+        """
+        Part des vecteurs de l'index marqués comme supprimés.
+        """
+        return len(self.supprimes) / max(1, len(self) + len(self.supprimes))
+
+    def __len__(self) -> int:
+        """
+        Nombre de chansons indexées (hors chansons supprimées).
+        """
+        return len(self.ids) - len(self.supprimes)
+
+    def _tous_les_ids(self) -> np.ndarray:
+        """
+        Identifiants de tous les vecteurs stockés, y compris ceux marqués comme supprimés.
+        """
+        return np.asarray(self.ids)
+
+    def _masque_supprimes(self, ids) -> np.ndarray | None:
+        """
+        Booléens marquant, parmi les identifiants donnés, les chansons supprimées.
+        Retourne None si aucune chanson n'est supprimée.
+        """
+        if not self.supprimes:
+            return None
+        return np.isin(ids, list(self.supprimes))
+
+    def _masquer(self, scores: np.ndarray, ids) -> np.ndarray:
+        """
+        Met à -inf le score des chansons supprimées (dernier axe de scores, aligné sur ids) :
+        _top_k ne les retient jamais, le nombre de candidats demandés ne dépend donc pas
+        du nombre de suppressions. Les scores d'origine ne sont pas modifiés.
+        """
+        masque = self._masque_supprimes(ids)
+        if masque is None or not masque.any():
+            return scores
+        scores = np.array(scores, dtype=np.float32)
+        scores[..., masque] = -np.inf
+        return scores
+
+    @staticmethod
+    def _resultats(ids, scores: np.ndarray, positions) -> list[tuple[int, float]]:
+        """
+        Couples (id, score) des positions retenues par _top_k, sans les chansons masquées
+        (retenues seulement quand il reste moins de k chansons).
+        """
+        return [(int(ids[i]), float(scores[i])) for i in positions if scores[i] != -np.inf]
+
+    @staticmethod
+    def _normaliser(matrice: np.ndarray, normes: list = None) -> np.ndarray:
+        """
+        Normalise chaque ligne d'une matrice float32 (les lignes nulles restent nulles).
+        Si les normes sont déjà connues (enregistrées en BD), elles ne sont pas recalculées.
+        """
+        matrice = np.asarray(matrice, dtype=np.float32)
+        if matrice.ndim == 1:
+            norme = np.linalg.norm(matrice)
+            return matrice / norme if norme > 0 else matrice
+        if normes is None:
+            normes = np.linalg.norm(matrice, axis=1, keepdims=True)
+        else:
+            normes = np.asarray(normes, dtype=np.float32).reshape(-1, 1)
+        return np.ascontiguousarray(matrice / np.where(normes > 0, normes, 1.0))
+
+    @classmethod
+    def _normaliser_vecteur(cls, vecteur: list, norme: float = None) -> np.ndarray:
+        """
+        Normalise un seul vecteur, avec sa norme enregistrée si elle est connue.
+        """
+        vecteur = np.asarray(vecteur, dtype=np.float32)
+        if norme:
+            return vecteur / np.float32(norme)
+        return cls._normaliser(vecteur)
+
+    @staticmethod
+    def _ajouter_ligne(tampon: np.ndarray, n: int, ligne) -> np.ndarray:
+        """
+        Écrit la ligne à la position n d'un tampon dont les n premières lignes sont utilisées.
+        Le tampon est réalloué (capacité doublée) s'il est plein ou en lecture seule (memmap),
+        ce qui rend l'ajout d'une ligne amorti en O(1). Les n premières lignes ne sont
+        jamais modifiées : une vue prise avant l'ajout reste valide.
+
+        Returns
+        ----------
+        np.ndarray
+            le tampon, éventuellement réalloué
+        """
+        ligne = np.asarray(ligne, dtype=tampon.dtype)
+        if n >= tampon.shape[0] or not tampon.flags.writeable or tampon.shape[1:] != ligne.shape:
+            nouveau = np.empty((max(2 * n, 16),) + ligne.shape, dtype=tampon.dtype)
+            if n:
+                nouveau[:n] = tampon[:n]
+            tampon = nouveau
+        tampon[n] = ligne
+        return tampon
+
+    @staticmethod
+    def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+        """
+        Retourne les positions des k meilleurs scores, triées par score décroissant.
+        Utilise une sélection partielle (argpartition) plutôt qu'un tri complet.
+        """
+        n = scores.shape[0]
+        if k <= 0 or n == 0:
+            return np.empty(0, dtype=np.int64)
+        if k < n:
+            positions = np.argpartition(-scores, k - 1)[:k]
+        else:
+            positions = np.arange(n)
+        return positions[np.argsort(-scores[positions], kind="stable")]
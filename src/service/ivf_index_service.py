@@ -0,0 +1,228 @@
+import numpy as np
+
+from service.index_service import IndexService
+
+
+class IvfIndexService(IndexService):
+    """
+    Index à fichier inversé (IVF).
+    Les vecteurs normalisés sont regroupés par un k-means mini-batch en nlist clusters ;
+    chaque cluster garde la liste contiguë de ses vecteurs. Une recherche ne parcourt que
+    les nprobe clusters dont le centroïde est le plus proche du mot-clé.
+
+    Attributs
+    ---------
+    nlist : int ou None
+        nombre de clusters (par défaut environ la racine carrée de la taille du catalogue)
+    nprobe : int
+        nombre de clusters parcourus à chaque recherche
+
+    Les chansons ajoutées après la construction sont affectées à leur cluster mais rangées
+    dans une liste de débordement, fusionnée dans les listes contiguës par compacte().
+    Les centroïdes ne sont pas réentraînés (voir rebuild_index.py).
+    """
+
+    def __init__(
+        self,
+        nlist: int = None,
+        nprobe: int = 8,
+        taille_lot: int = 1024,
+        nb_iterations: int = 50,
+        graine=None,
+    ):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.taille_lot = taille_lot
+        self.nb_iterations = nb_iterations
+        self.graine = graine
+        self.ids = np.empty(0, dtype=np.int64)
+        self.centroides = np.empty((0, 0), dtype=np.float32)
+        self._vecteurs = np.empty((0, 0), dtype=np.float32)
+        self._debuts = np.zeros(1, dtype=np.int64)  # début de chaque liste dans _vecteurs
+        self.supprimes = set()
+        # Débordement : chansons ajoutées depuis la construction, avec leur cluster
+        self._nb_ajouts = 0
+        self._ajouts_ids = np.empty(0, dtype=np.int64)
+        self._ajouts_vecteurs = np.empty((0, 0), dtype=np.float32)
+        self._ajouts_clusters = np.empty(0, dtype=np.int64)
+
+    def construire(self, ids: list, vecteurs: list, normes: list = None) -> None:
+        """
+        Entraîne le k-means puis range les vecteurs par cluster.
+        """
+        matrice = self._normaliser(vecteurs, normes)
+        ids = np.asarray(list(ids), dtype=np.int64)
+        n = matrice.shape[0]
+        nlist = self.nlist or max(1, int(np.sqrt(n)))
+        nlist = min(nlist, n)
+        self.centroides = self._kmeans_mini_batch(matrice, nlist)
+        self._ranger(ids, matrice, self._affecter(matrice))
+
+    def ajouter(self, id_chanson: int, vecteur: list, norme: float = None) -> None:
+        """
+        Affecte le vecteur au cluster le plus proche et l'ajoute à la liste de débordement.
+        """
+        vecteur = self._normaliser_vecteur(vecteur, norme)
+        if self.centroides.shape[0] == 0:
+            self.centroides = vecteur[None, :].copy()
+            self._vecteurs = np.empty((0, vecteur.shape[0]), dtype=np.float32)
+            self._debuts = np.zeros(2, dtype=np.int64)
+        n = self._nb_ajouts
+        self._ajouts_vecteurs = self._ajouter_ligne(self._ajouts_vecteurs, n, vecteur)
+        self._ajouts_clusters = self._ajouter_ligne(
+            self._ajouts_clusters, n, np.argmax(self.centroides @ vecteur)
+        )
+        self._ajouts_ids = self._ajouter_ligne(self._ajouts_ids, n, id_chanson)
+        self._nb_ajouts = n + 1
+
+    def etat(self) -> tuple[int, frozenset]:
+        """
+        Les listes contiguës ne changent pas entre deux compactions : seul le nombre
+        d'ajouts en débordement est photographié.
+        """
+        return self._nb_ajouts, frozenset(self.supprimes)
+
+    def compacte(self, etat: tuple[int, frozenset]) -> "IvfIndexService":
+        """
+        Retourne un index dont les listes contiguës incluent les ajouts et excluent
+        les chansons supprimées (mêmes centroïdes).
+        """
+        nb_ajouts, supprimes = etat
+        tailles = np.diff(self._debuts)
+        ids = np.concatenate([self.ids, self._ajouts_ids[:nb_ajouts]])
+        clusters = np.concatenate(
+            [np.repeat(np.arange(len(tailles)), tailles), self._ajouts_clusters[:nb_ajouts]]
+        )
+        garder = ~np.isin(ids, list(supprimes))
+        index = IvfIndexService(
+            self.nlist, self.nprobe, self.taille_lot, self.nb_iterations, self.graine
+        )
+        index.centroides = self.centroides
+        if nb_ajouts:
+            matrice = np.concatenate([self._vecteurs, self._ajouts_vecteurs[:nb_ajouts]])
+        else:
+            matrice = self._vecteurs
+        index._ranger(ids[garder], matrice[garder], clusters[garder])
+        return index
+
+    def rechercher(self, vecteur: list, k: int) -> list[tuple[int, float]]:
+        """
+        Retourne les k chansons les plus proches parmi les nprobe clusters les plus proches.
+        """
+        nb_ajouts = self._nb_ajouts
+        if len(self.ids) + nb_ajouts == 0:
+            return []
+        requete = self._normaliser(np.asarray(vecteur, dtype=np.float32))
+        clusters = self._top_k(self.centroides @ requete, self.nprobe)
+        positions = np.concatenate(
+            [np.arange(self._debuts[c], self._debuts[c + 1]) for c in clusters]
+        )
+        ids = self.ids[positions]
+        scores = self._vecteurs[positions] @ requete
+        if nb_ajouts:
+            ajouts = np.flatnonzero(np.isin(self._ajouts_clusters[:nb_ajouts], clusters))
+            ids = np.concatenate([ids, self._ajouts_ids[ajouts]])
+            scores = np.concatenate([scores, self._ajouts_vecteurs[ajouts] @ requete])
+        scores = self._masquer(scores, ids)
+        return self._resultats(ids, scores, self._top_k(scores, k))
+
+    def __len__(self) -> int:
+        """
+        Nombre de chansons indexées, ajouts en débordement compris (hors chansons supprimées).
+        """
+        return len(self.ids) + self._nb_ajouts - len(self.supprimes)
+
+    def _tous_les_ids(self) -> np.ndarray:
+        """
+        Identifiants des listes contiguës et du débordement.
+        """
+        return np.concatenate([self.ids, self._ajouts_ids[: self._nb_ajouts]])
+
+    def sauvegarder(self, chemin: str, signature: tuple = None) -> None:
+        """
+        Enregistre l'index dans un fichier .npz, avec la signature du catalogue indexé
+        (nombre de chansons, id max et, si elle est connue, génération du catalogue).
+        Les ajouts et suppressions en attente sont d'abord fusionnés.
+        """
+        if self._nb_ajouts or self.supprimes:
+            self.compacte(self.etat()).sauvegarder(chemin, signature)
+            return
+        nb_chansons, id_max = signature[:2] if signature else (-1, -1)
+        generation = signature[2] if signature and len(signature) > 2 else None
+        np.savez(
+            chemin,
+            ids=self.ids,
+            centroides=self.centroides,
+            vecteurs=self._vecteurs,
+            debuts=self._debuts,
+            nprobe=self.nprobe,
+            signature=np.array([nb_chansons, -1 if id_max is None else id_max]),
+            generation=np.array("" if generation is None else generation),
+        )
+
+    @classmethod
+    def charger(cls, chemin: str) -> tuple["IvfIndexService", tuple]:
+        """
+        Charge un index enregistré par sauvegarder().
+
+        Returns
+        ----------
+        tuple[IvfIndexService, tuple]
+            l'index et la signature du catalogue à partir duquel il a été construit ; celle
+            d'un fichier enregistré sans génération ne correspond à aucune signature lue en BD
+        """
+        with np.load(chemin) as donnees:
+            index = cls(nlist=len(donnees["centroides"]), nprobe=int(donnees["nprobe"]))
+            index.ids = donnees["ids"]
+            index.centroides = donnees["centroides"]
+            index._vecteurs = donnees["vecteurs"]
+            index._debuts = donnees["debuts"]
+            nb_chansons, id_max = (int(x) for x in donnees["signature"])
+            generation = str(donnees["generation"]) if "generation" in donnees.files else ""
+        signature = (nb_chansons, None if id_max == -1 else id_max)
+        return index, signature + ((generation,) if generation else ())
+
+    def _ranger(self, ids: np.ndarray, matrice: np.ndarray, clusters: np.ndarray) -> None:
+        """
+        Range les vecteurs par cluster en listes contiguës.
+        """
+        ordre = np.argsort(clusters, kind="stable")
+        self.ids = ids[ordre]
+        self._vecteurs = np.ascontiguousarray(matrice[ordre])
+        tailles = np.bincount(clusters, minlength=self.centroides.shape[0])
+        self._debuts = np.concatenate(([0], np.cumsum(tailles))).astype(np.int64)
+
+    def _affecter(self, matrice: np.ndarray) -> np.ndarray:
+        """
+        Retourne le cluster le plus proche de chaque vecteur (par blocs pour limiter la mémoire).
+        """
+        clusters = np.empty(matrice.shape[0], dtype=np.int64)
+        for debut in range(0, matrice.shape[0], 8192):
+            bloc = matrice[debut : debut + 8192]
+            clusters[debut : debut + 8192] = np.argmax(bloc @ self.centroides.T, axis=1)
+        return clusters
+
+    def _kmeans_mini_batch(self, matrice: np.ndarray, nlist: int) -> np.ndarray:
+        """
+        K-means sphérique mini-batch : chaque centroïde est la moyenne courante des
+        vecteurs qui lui ont été affectés, puis est renormalisé.
+        """
+        generateur = np.random.default_rng(self.graine)
+        n = matrice.shape[0]
+        centroides = matrice[generateur.choice(n, size=nlist, replace=False)].copy()
+        effectifs = np.zeros(nlist, dtype=np.float32)
+        taille_lot = min(self.taille_lot, n)
+        for _ in range(self.nb_iterations):
+            lot = matrice[generateur.choice(n, size=taille_lot, replace=False)]
+            affectations = np.argmax(lot @ centroides.T, axis=1)
+            sommes = np.zeros_like(centroides)
+            np.add.at(sommes, affectations, lot)
+            comptes = np.bincount(affectations, minlength=nlist).astype(np.float32)
+            modifies = comptes > 0
+            nouveaux_effectifs = effectifs[modifies] + comptes[modifies]
+            centroides[modifies] = (
+                centroides[modifies] * effectifs[modifies, None] + sommes[modifies]
+            ) / nouveaux_effectifs[:, None]
+            effectifs[modifies] = nouveaux_effectifs
+            centroides = self._normaliser(centroides)
+        return centroides
@@ -1,10 +1,75 @@
+import os
+
+import dotenv
+
 from service.embedding_service import EmbeddingService
+from utils.cache_sqlite import CacheSQLite
+from utils.singleton import Singleton
+
+
+class CacheParoles(CacheSQLite, metaclass=Singleton):
+    """
+    Cache persistant des embeddings de paroles partagé par tout le processus.
+
+    Le fichier SQLite est choisi par la variable d'environnement EMBED_CACHE_PAROLES
+    (fichier .env) ; une valeur vide désactive le cache.
+    """
+
+    def __init__(self):
+        dotenv.load_dotenv(override=True)
+        chemin = os.environ.get("EMBED_CACHE_PAROLES", "data/embeddings_paroles.sqlite")
+        self.actif = bool(chemin)
+        if self.actif:
+            super().__init__(chemin)
 
 
 class ParolesEmbeddingService(EmbeddingService):
     """
     Service pour vectoriser les paroles de chansons.
-    Hérite uniquement de la méthode vectorise().
+    Les embeddings sont conservés dans un cache sur disque adressé par le contenu des
+    paroles et le modèle : des paroles déjà vectorisées (par exemple lors d'un précédent
+    chargement de la BD) ne repassent pas par l'API.
     """
 
-    pass
+    def vectorise(self, texte: str) -> list:
+        """
+        Vectorise des paroles, en consultant d'abord le cache sur disque.
+
+        Args:
+            texte: Les paroles à vectoriser
+
+        Returns:
+            list: Le vecteur embedding ou None en cas d'erreur
+        """
+        cache = CacheParoles()
+        if not cache.actif:
+            return super().vectorise(texte)
+        vecteur = cache.get(self.model, texte)
+        if vecteur is None:
+            vecteur = super().vectorise(texte)
+            if vecteur is not None:
+                cache.set(self.model, texte, vecteur)
+        return vecteur
+
+    def vectorise_many(self, textes: list[str], batch_size: int = None) -> list:
+        """
+        Vectorise plusieurs paroles : seules celles absentes du cache sont envoyées à l'API.
+
+        Args:
+            textes: Les paroles à vectoriser
+            batch_size: Nombre maximal de textes par appel à l'API
+
+        Returns:
+            list: Un vecteur par texte, dans le même ordre (None en cas d'erreur)
+        """
+        cache = CacheParoles()
+        if not cache.actif:
+            return super().vectorise_many(textes, batch_size)
+        vecteurs = cache.get_many(self.model, textes)
+        manquants = list(dict.fromkeys(t for t, v in zip(textes, vecteurs) if v is None))
+        if manquants:
+            nouveaux = super().vectorise_many(manquants, batch_size)
+            cache.set_many(self.model, manquants, nouveaux)
+            nouveaux = dict(zip(manquants, nouveaux))
+            vecteurs = [v if v is not None else nouveaux[t] for t, v in zip(textes, vecteurs)]
+        return vecteurs
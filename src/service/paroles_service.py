@@ -2,6 +2,7 @@ import requests
 
 from business_object.chanson import Chanson
 from business_object.paroles import Paroles
+from utils.session_http import SessionHttp
 
 
 class ParolesService:
@@ -17,7 +18,10 @@ class ParolesService:
         params = {"track_name": chanson.titre, "artist_name": chanson.artiste}
 
         try:
-            response = requests.get(url, params=params, timeout=20)
+            # LRCLIB répond vite ou pas du tout : 20 s au plus pour la réponse, au lieu du
+            # délai de lecture par défaut de la session prévu pour l'API d'embedding
+            session = SessionHttp()
+            response = session.get(url, params=params, timeout=(session.timeout[0], 20))
             response.raise_for_status()
             data = response.json()
 
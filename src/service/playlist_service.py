@@ -1,11 +1,36 @@
+import os
+
+import dotenv
+
 from business_object.chanson import Chanson
 from business_object.playlist import Playlist
 from dao.dao_chanson import DAO_chanson
 from dao.dao_paroles import DAO_paroles
+from service.exact_index_service import ExactIndexService
+from service.index_catalogue_service import IndexCatalogueService
 from service.request_embedding_service import RequestEmbeddingService
 
+# Le fichier .env est lu une fois par processus, au chargement du module, et non à chaque
+# service créé (un par requête)
+dotenv.load_dotenv(override=True)
+
 
 class PlaylistService:
+    """
+    Mode de recherche (fichier .env) : PLAYLIST_RECHERCHE vaut "vecteur" (par défaut, tout le
+    catalogue est comparé au mot-clé) ou "hybride" : seules les chansons dont les paroles
+    contiennent le mot-clé (recherche plein texte de PostgreSQL, au plus FTS_CANDIDATS_MAX)
+    sont comparées au mot-clé. S'il y a moins de FTS_CANDIDATS_MIN candidats (ou moins que
+    la taille de la playlist), la recherche se fait sur tout le catalogue.
+    """
+
+    def __init__(self):
+        self.recherche = os.environ.get("PLAYLIST_RECHERCHE", "vecteur").lower()
+        if self.recherche not in ("vecteur", "hybride"):
+            raise ValueError("PLAYLIST_RECHERCHE doit valoir 'vecteur' ou 'hybride'")
+        self.fts_candidats_min = int(os.environ.get("FTS_CANDIDATS_MIN", 20))
+        self.fts_candidats_max = int(os.environ.get("FTS_CANDIDATS_MAX", 1000))
+
     def instantiate_playlist(self, keyword, nbsongs):
         """
         Instancie un objet playlist à partir d'un mot-clé et d'un nombre de chanson.
@@ -24,41 +49,112 @@ class PlaylistService:
         Playlist
             un objet playlist
         """
-        # Extraction de tous les objets paroles de la BDD
-        paroles = DAO_paroles().get_paroles()
-        # Vectorisation du mot-clé
-        key_vector = RequestEmbeddingService().vectorise(keyword)
-        # Initialisation de la liste des distances
-        compares = []
-        # Si la DAO a pu récupérer les paroles
-        if paroles:
-            # Calcul de la distance entre chacun des vecteurs paroles et le mot-clé
-            for parole in paroles:
-                compares.append(
-                    [parole, RequestEmbeddingService().compare(key_vector, parole.vecteur)]
-                )
-        # Sinon
-        else:
+        dao_chanson = DAO_chanson()
+        if self.recherche == "hybride":
+            # Préfiltre plein texte : seuls les candidats lexicaux sont comparés au mot-clé
+            ids, vecteurs, normes = DAO_paroles().get_embeddings_fts(
+                keyword, self.fts_candidats_max
+            )
+            if len(ids) >= max(nbsongs, self.fts_candidats_min):
+                # Chansons insérées avant l'ajout de norme_paroles : normes recalculées
+                if None in normes:
+                    normes = None
+                candidats = ExactIndexService()
+                candidats.construire(ids, vecteurs, normes)
+                key_vector = RequestEmbeddingService().vectorise(keyword)
+                resultats = candidats.rechercher(key_vector, nbsongs)
+                chansons = dao_chanson.get_chansons_from_ids([i for i, _ in resultats])
+                return Playlist(keyword, chansons)
+            # Trop peu de candidats : recherche sur tout le catalogue
+        if dao_chanson.index_pgvector:
+            # Recherche faite par PostgreSQL (pgvector) : une seule requête, sans index en mémoire
+            key_vector = RequestEmbeddingService().vectorise(keyword)
+            chansons = dao_chanson.get_chansons_proches(key_vector, nbsongs)
+            if not chansons:
+                raise Exception("Il n'y a pas de chansons dans la base de données")
+            return Playlist(keyword, chansons)
+        # Index du catalogue gardé en mémoire (reconstruit seulement si la BD a changé)
+        index = IndexCatalogueService().get_index()
+        # Si l'index est vide
+        if len(index) == 0:
             # Il n'y a pas de chansons dans la base de données
             raise Exception("Il n'y a pas de chansons dans la base de données")
-        # Tri de la liste des distances dans l'ordre décroissant
-        compares.sort(key=lambda x: x[1], reverse=True)
-        # Initialisation de la liste de chansons
-        chansons = []
-        # Si le nombre de chansons n'est pas supérieur au nombre de chansons dispos dans la BDD
-        if not nbsongs > len(compares):
-            # On ajoute les nbsongs premières chansons correspondant aux vecteurs de la liste des distances
-            for i in range(nbsongs):
-                chansons.append(
-                    DAO_chanson().get_chanson_from_embed_paroles(compares[i][0].vecteur)
-                )
-        # Sinon, on ajoute toutes les chansons dans l'ordre
-        else:
-            for compare in compares:
-                chansons.append(DAO_chanson().get_chanson_from_embed_paroles(compare[0].vecteur))
+        # Vectorisation du mot-clé
+        key_vector = RequestEmbeddingService().vectorise(keyword)
+        # Sélection des nbsongs chansons les plus proches du mot-clé, par score décroissant
+        resultats = index.rechercher(key_vector, nbsongs)
+        # Récupération des chansons sélectionnées en une seule requête, dans l'ordre du classement
+        chansons = dao_chanson.get_chansons_from_ids([id_chanson for id_chanson, _ in resultats])
         # Retour de l'objet playlist avec les chansons
         return Playlist(keyword, chansons)
 
+    def instantiate_playlists(
+        self, demandes: list[tuple[str, int]]
+    ) -> list[tuple[Playlist | None, str | None]]:
+        """
+        Instancie plusieurs playlists en un seul passage : les mots-clés sont vectorisés
+        ensemble, comparés au catalogue en un seul produit matrice-matrice et les chansons
+        de toutes les playlists sont récupérées en une seule requête.
+
+        Parameters
+        ----------
+        demandes : list[tuple[str, int]]
+            couples (mot-clé, nombre maximal de chansons)
+
+        Returns
+        ----------
+        list[tuple[Playlist | None, str | None]]
+            pour chaque demande, dans l'ordre, la playlist ou le message d'erreur
+        """
+        if not demandes:
+            return []
+        dao_chanson = DAO_chanson()
+        if dao_chanson.index_pgvector:
+            return self._instantiate_playlists_pgvector(dao_chanson, demandes)
+        index = IndexCatalogueService().get_index()
+        if len(index) == 0:
+            raise Exception("Il n'y a pas de chansons dans la base de données")
+        # Vectorisation de tous les mots-clés en un seul appel
+        vecteurs = RequestEmbeddingService().vectorise_many([nom for nom, _ in demandes])
+        valides = [i for i, vecteur in enumerate(vecteurs) if vecteur is not None]
+        k = max((demandes[i][1] for i in valides), default=0)
+        classements = index.rechercher_lot([vecteurs[i] for i in valides], k) if valides else []
+        classements = dict(zip(valides, classements))
+        # Une seule requête pour les chansons de toutes les playlists
+        ids = list(dict.fromkeys(id_chanson for c in classements.values() for id_chanson, _ in c))
+        chansons = {c.id_chanson: c for c in dao_chanson.get_chansons_from_ids(ids)}
+        resultats = []
+        for i, (nom, nbsongs) in enumerate(demandes):
+            if i not in classements:
+                resultats.append((None, "La vectorisation du mot-clé a échoué"))
+                continue
+            selection = [
+                chansons[id_chanson]
+                for id_chanson, _ in classements[i][:nbsongs]
+                if id_chanson in chansons
+            ]
+            resultats.append((Playlist(nom, selection), None))
+        return resultats
+
+    def _instantiate_playlists_pgvector(
+        self, dao_chanson: DAO_chanson, demandes: list[tuple[str, int]]
+    ) -> list[tuple[Playlist | None, str | None]]:
+        """
+        Variante pgvector de instantiate_playlists : les mots-clés sont vectorisés ensemble,
+        puis chaque playlist est obtenue par une requête de recherche en SQL.
+        """
+        vecteurs = RequestEmbeddingService().vectorise_many([nom for nom, _ in demandes])
+        resultats = []
+        for (nom, nbsongs), vecteur in zip(demandes, vecteurs):
+            if vecteur is None:
+                resultats.append((None, "La vectorisation du mot-clé a échoué"))
+                continue
+            chansons = dao_chanson.get_chansons_proches(vecteur, nbsongs)
+            if not chansons:
+                raise Exception("Il n'y a pas de chansons dans la base de données")
+            resultats.append((Playlist(nom, chansons), None))
+        return resultats
+
     def add_chanson(self, playlist: Playlist, chanson: Chanson) -> bool:
         """
         Ajoute une chanson à une playlist.
@@ -0,0 +1,203 @@
+import numpy as np
+
+from service.index_service import IndexService
+
+
+class PqIndexService(IndexService):
+    """
+    Index compressé par quantification produit (PQ).
+    Chaque vecteur normalisé est découpé en nb_sous_espaces blocs ; chaque bloc est remplacé
+    par l'indice (un octet) du centroïde le plus proche dans le dictionnaire de son bloc.
+    Un embedding de 1024 flottants tient ainsi en nb_sous_espaces octets.
+
+    Les scores sont estimés par calcul asymétrique (ADC) : le mot-clé reste exact, on
+    précalcule sa similarité avec chaque centroïde puis on somme les tables selon les codes.
+    Si lecteur_vecteurs est renseigné, les meilleurs candidats sont reclassés avec leurs
+    vecteurs complets.
+
+    Attributs
+    ---------
+    nb_sous_espaces : int
+        nombre de blocs (et d'octets) par vecteur, doit diviser la dimension
+    reclassement : int
+        les k * reclassement meilleurs candidats ADC sont reclassés exactement (0 = jamais)
+    lecteur_vecteurs : callable ou None
+        fonction ids -> (ids, vecteurs, normes) qui relit les vecteurs complets
+    """
+
+    def __init__(
+        self,
+        nb_sous_espaces: int = 32,
+        nb_bits: int = 8,
+        reclassement: int = 0,
+        nb_iterations: int = 20,
+        taille_entrainement: int = 20000,
+        graine=None,
+    ):
+        if not 1 <= nb_bits <= 8:
+            raise ValueError("nb_bits doit être compris entre 1 et 8")
+        self.nb_sous_espaces = nb_sous_espaces
+        self.nb_centroides = 2**nb_bits
+        self.reclassement = reclassement
+        self.nb_iterations = nb_iterations
+        self.taille_entrainement = taille_entrainement
+        self.graine = graine
+        self.lecteur_vecteurs = None
+        self.ids = np.empty(0, dtype=np.int64)
+        self.supprimes = set()
+        self.dictionnaires = np.empty((0, 0, 0), dtype=np.float32)  # (m, nb_centroides, d / m)
+        self.codes = np.empty((0, 0), dtype=np.uint8)  # (n, m)
+        # ids et codes sont des vues sur les n premières lignes de ces tampons
+        self._tampon_ids = self.ids
+        self._tampon_codes = self.codes
+
+    def construire(self, ids: list, vecteurs: list, normes: list = None) -> None:
+        """
+        Apprend un dictionnaire par bloc puis encode tous les vecteurs.
+        """
+        matrice = self._normaliser(vecteurs, normes)
+        n, dimension = matrice.shape
+        if dimension % self.nb_sous_espaces != 0:
+            raise ValueError("nb_sous_espaces doit diviser la dimension des vecteurs")
+        generateur = np.random.default_rng(self.graine)
+        echantillon = matrice
+        if n > self.taille_entrainement:
+            echantillon = matrice[generateur.choice(n, self.taille_entrainement, replace=False)]
+        blocs_echantillon = self._decouper(echantillon)
+        self.dictionnaires = np.stack(
+            [self._kmeans(bloc, generateur) for bloc in blocs_echantillon]
+        )
+        self.ids = self._tampon_ids = np.asarray(list(ids), dtype=np.int64)
+        self.codes = self._tampon_codes = self.encoder(matrice)
+        self.supprimes = set()
+
+    def ajouter(self, id_chanson: int, vecteur: list, norme: float = None) -> None:
+        """
+        Encode le vecteur avec les dictionnaires existants (qui ne sont pas réentraînés).
+        """
+        if self.dictionnaires.shape[0] == 0:
+            raise ValueError("l'index PQ doit être construit avant tout ajout")
+        n = len(self.ids)
+        code = self.encoder(self._normaliser_vecteur(vecteur, norme)[None, :])[0]
+        self._tampon_codes = self._ajouter_ligne(self._tampon_codes, n, code)
+        self._tampon_ids = self._ajouter_ligne(self._tampon_ids, n, id_chanson)
+        self.ids = self._tampon_ids[: n + 1]
+        self.codes = self._tampon_codes[: n + 1]
+
+    def compacte(self, etat: tuple[int, frozenset]) -> "PqIndexService":
+        """
+        Retourne un index sans les codes des chansons supprimées (mêmes dictionnaires).
+        """
+        n, supprimes = etat
+        ids = np.asarray(self.ids[:n])
+        garder = ~np.isin(ids, list(supprimes))
+        index = PqIndexService(
+            self.nb_sous_espaces,
+            reclassement=self.reclassement,
+            nb_iterations=self.nb_iterations,
+            taille_entrainement=self.taille_entrainement,
+        )
+        index.nb_centroides = self.nb_centroides
+        index.lecteur_vecteurs = self.lecteur_vecteurs
+        index.dictionnaires = self.dictionnaires
+        index.ids = index._tampon_ids = np.ascontiguousarray(ids[garder])
+        index.codes = index._tampon_codes = np.ascontiguousarray(self.codes[:n][garder])
+        return index
+
+    def encoder(self, matrice: np.ndarray) -> np.ndarray:
+        """
+        Retourne les codes (n, nb_sous_espaces) de vecteurs déjà normalisés.
+        """
+        codes = np.empty((matrice.shape[0], self.nb_sous_espaces), dtype=np.uint8)
+        for j, bloc in enumerate(self._decouper(matrice)):
+            codes[:, j] = self._plus_proches(bloc, self.dictionnaires[j])
+        return codes
+
+    def decoder(self, codes: np.ndarray) -> np.ndarray:
+        """
+        Reconstruit une approximation des vecteurs à partir de leurs codes.
+        """
+        blocs = [self.dictionnaires[j][codes[:, j]] for j in range(self.nb_sous_espaces)]
+        return np.concatenate(blocs, axis=1)
+
+    def scores_adc(self, vecteur: list) -> np.ndarray:
+        """
+        Estime la similarité cosinus entre le vecteur et toutes les chansons (calcul asymétrique).
+        """
+        requete = self._normaliser(np.asarray(vecteur, dtype=np.float32))
+        blocs_requete = requete.reshape(self.nb_sous_espaces, -1)
+        # tables[j, c] = produit scalaire du bloc j de la requête avec le centroïde c
+        tables = np.einsum("mcd,md->mc", self.dictionnaires, blocs_requete)
+        scores = np.zeros(self.codes.shape[0], dtype=np.float32)
+        for j in range(self.nb_sous_espaces):
+            scores += tables[j][self.codes[:, j]]
+        return scores
+
+    def rechercher(self, vecteur: list, k: int) -> list[tuple[int, float]]:
+        """
+        Retourne les k chansons les mieux classées par ADC, éventuellement reclassées exactement.
+        """
+        if len(self.ids) == 0:
+            return []
+        scores = self.scores_adc(vecteur)
+        ids_index = self.ids[: len(scores)]
+        scores = self._masquer(scores, ids_index)
+        if self.reclassement > 0 and self.lecteur_vecteurs is not None:
+            candidats = [
+                i for i in self._top_k(scores, k * self.reclassement) if scores[i] != -np.inf
+            ]
+            ids, vecteurs, normes = self.lecteur_vecteurs(ids_index[candidats].tolist())
+            if ids:
+                return self._reclasser(vecteur, k, ids, vecteurs, normes)
+        return self._resultats(ids_index, scores, self._top_k(scores, k))
+
+    def _reclasser(
+        self, vecteur: list, k: int, ids: list, vecteurs: list, normes: list
+    ) -> list[tuple[int, float]]:
+        """
+        Reclasse les candidats avec la similarité cosinus calculée sur leurs vecteurs complets.
+        """
+        if normes is not None and None in normes:
+            normes = None
+        matrice = self._normaliser(vecteurs, normes)
+        scores_exacts = matrice @ self._normaliser(np.asarray(vecteur, dtype=np.float32))
+        meilleurs = self._top_k(scores_exacts, k)
+        return [(int(ids[i]), float(scores_exacts[i])) for i in meilleurs]
+
+    def _decouper(self, matrice: np.ndarray) -> list[np.ndarray]:
+        """
+        Découpe une matrice (n, d) en nb_sous_espaces blocs contigus (n, d / m).
+        """
+        return [
+            np.ascontiguousarray(bloc) for bloc in np.split(matrice, self.nb_sous_espaces, axis=1)
+        ]
+
+    @staticmethod
+    def _plus_proches(bloc: np.ndarray, centroides: np.ndarray) -> np.ndarray:
+        """
+        Indice du centroïde le plus proche (distance euclidienne) de chaque ligne du bloc.
+        """
+        distances = (
+            -2 * bloc @ centroides.T + np.einsum("cd,cd->c", centroides, centroides)[None, :]
+        )
+        return np.argmin(distances, axis=1)
+
+    def _kmeans(self, bloc: np.ndarray, generateur: np.random.Generator) -> np.ndarray:
+        """
+        K-means de Lloyd sur un bloc ; retourne toujours nb_centroides centroïdes.
+        """
+        n = bloc.shape[0]
+        centroides = bloc[generateur.choice(n, self.nb_centroides, replace=n < self.nb_centroides)]
+        centroides = centroides.copy()
+        for _ in range(self.nb_iterations):
+            affectations = self._plus_proches(bloc, centroides)
+            sommes = np.zeros_like(centroides)
+            np.add.at(sommes, affectations, bloc)
+            comptes = np.bincount(affectations, minlength=self.nb_centroides)
+            remplis = comptes > 0
+            centroides[remplis] = sommes[remplis] / comptes[remplis, None]
+            # Les centroïdes vides sont replacés sur des points tirés au hasard
+            vides = np.flatnonzero(~remplis)
+            if len(vides):
+                centroides[vides] = bloc[generateur.choice(n, len(vides))]
+        return centroides.astype(np.float32)
@@ -0,0 +1,204 @@
+import numpy as np
+
+from service.index_service import IndexService
+
+
+class ProjectionIndexService(IndexService):
+    """
+    Index en deux étapes : présélection en dimension réduite puis reclassement exact.
+    Les embeddings normalisés sont projetés en basse dimension (ACP ou projection aléatoire).
+    Une recherche parcourt d'abord ces projections, bien moins coûteuses, pour retenir
+    k * multiplicateur candidats, puis ne calcule la similarité cosinus complète que sur
+    ces candidats.
+
+    La projection peut être apprise hors ligne (rebuild_index.py) puis chargée avec
+    charger_projection() : l'index n'a alors plus qu'à projeter le catalogue.
+
+    Attributs
+    ---------
+    dimension : int
+        dimension des projections parcourues à la première étape
+    multiplicateur : int
+        nombre de candidats reclassés par résultat demandé (rappel contre latence)
+    methode : str
+        "acp" (analyse en composantes principales) ou "aleatoire" (projection gaussienne)
+    """
+
+    METHODES = ("acp", "aleatoire")
+
+    def __init__(
+        self,
+        dimension: int = 64,
+        multiplicateur: int = 10,
+        methode: str = "acp",
+        taille_entrainement: int = 20000,
+        graine=None,
+    ):
+        if methode not in self.METHODES:
+            raise ValueError(f"methode doit valoir l'une des valeurs {self.METHODES}")
+        if multiplicateur < 1:
+            raise ValueError("multiplicateur doit être supérieur ou égal à 1")
+        self.dimension = dimension
+        self.multiplicateur = multiplicateur
+        self.methode = methode
+        self.taille_entrainement = taille_entrainement
+        self.graine = graine
+        self.projection = None  # (dimension d'origine, dimension réduite)
+        self.moyenne = None  # centre des données pour l'ACP, nul pour la projection aléatoire
+        self.ids = np.empty(0, dtype=np.int64)
+        self.matrice = np.empty((0, 0), dtype=np.float32)
+        self.reduits = np.empty((0, 0), dtype=np.float32)
+        self.supprimes = set()
+        # ids, matrice et reduits sont des vues sur les n premières lignes de ces tampons
+        self._tampon_ids = self.ids
+        self._tampon = self.matrice
+        self._tampon_reduits = self.reduits
+
+    def construire(self, ids: list, vecteurs: list, normes: list = None) -> None:
+        """
+        Apprend la projection si aucune n'a été chargée, puis projette le catalogue.
+        """
+        self.indexer_matrice(
+            np.asarray(list(ids), dtype=np.int64), self._normaliser(vecteurs, normes)
+        )
+
+    def indexer_matrice(self, ids, matrice: np.ndarray) -> None:
+        """
+        Indexe une matrice déjà normalisée, gardée telle quelle (sans copie) pour le
+        reclassement, par exemple la matrice en memmap de l'instantané.
+        """
+        if self.projection is None or self.projection.shape[0] != matrice.shape[1]:
+            self.entrainer(matrice)
+        self.ids = self._tampon_ids = ids
+        self.matrice = self._tampon = matrice
+        self.reduits = self._tampon_reduits = self.projeter(matrice)
+        self.supprimes = set()
+
+    def entrainer(self, matrice: np.ndarray) -> None:
+        """
+        Apprend la projection sur un échantillon de vecteurs normalisés.
+        """
+        n, dimension_origine = matrice.shape
+        generateur = np.random.default_rng(self.graine)
+        if self.methode == "aleatoire":
+            dimension = min(self.dimension, dimension_origine)
+            self.projection = (
+                generateur.standard_normal((dimension_origine, dimension)) / np.sqrt(dimension)
+            ).astype(np.float32)
+            self.moyenne = np.zeros(dimension_origine, dtype=np.float32)
+            return
+        echantillon = matrice
+        if n > self.taille_entrainement:
+            echantillon = matrice[
+                np.sort(generateur.choice(n, self.taille_entrainement, replace=False))
+            ]
+        echantillon = np.asarray(echantillon, dtype=np.float32)
+        self.moyenne = echantillon.mean(axis=0)
+        # Les composantes principales sont les premiers vecteurs singuliers à droite
+        _, _, composantes = np.linalg.svd(echantillon - self.moyenne, full_matrices=False)
+        self.projection = np.ascontiguousarray(composantes[: self.dimension].T, dtype=np.float32)
+
+    def projeter(self, matrice: np.ndarray) -> np.ndarray:
+        """
+        Projette des vecteurs normalisés dans l'espace réduit (par blocs pour limiter la mémoire).
+        """
+        matrice = np.asarray(matrice, dtype=np.float32)
+        if matrice.ndim == 1:
+            return (matrice - self.moyenne) @ self.projection
+        reduits = np.empty((matrice.shape[0], self.projection.shape[1]), dtype=np.float32)
+        for debut in range(0, matrice.shape[0], 8192):
+            bloc = matrice[debut : debut + 8192]
+            reduits[debut : debut + 8192] = (bloc - self.moyenne) @ self.projection
+        return reduits
+
+    def ajouter(self, id_chanson: int, vecteur: list, norme: float = None) -> None:
+        """
+        Ajoute une chanson avec la projection existante (qui n'est pas réapprise).
+        """
+        if self.projection is None:
+            raise ValueError("l'index par projection doit être construit avant tout ajout")
+        n = len(self.ids)
+        vecteur = self._normaliser_vecteur(vecteur, norme)
+        self._tampon = self._ajouter_ligne(self._tampon, n, vecteur)
+        self._tampon_reduits = self._ajouter_ligne(
+            self._tampon_reduits, n, self.projeter(vecteur)
+        )
+        self._tampon_ids = self._ajouter_ligne(self._tampon_ids, n, id_chanson)
+        self.ids = self._tampon_ids[: n + 1]
+        self.matrice = self._tampon[: n + 1]
+        self.reduits = self._tampon_reduits[: n + 1]
+
+    def compacte(self, etat: tuple[int, frozenset]) -> "ProjectionIndexService":
+        """
+        Retourne un index sans les chansons supprimées (même projection).
+        """
+        n, supprimes = etat
+        ids = np.asarray(self.ids[:n])
+        garder = ~np.isin(ids, list(supprimes))
+        index = self._copie_parametres()
+        index.ids = index._tampon_ids = np.ascontiguousarray(ids[garder])
+        index.matrice = index._tampon = np.ascontiguousarray(self.matrice[:n][garder])
+        index.reduits = index._tampon_reduits = np.ascontiguousarray(self.reduits[:n][garder])
+        return index
+
+    def rechercher(self, vecteur: list, k: int) -> list[tuple[int, float]]:
+        """
+        Présélectionne les candidats sur les projections puis les reclasse exactement.
+        """
+        return self.rechercher_lot([vecteur], k)[0]
+
+    def rechercher_lot(self, vecteurs: list, k: int) -> list[list[tuple[int, float]]]:
+        """
+        Présélection de tous les vecteurs en un seul produit matrice-matrice en dimension
+        réduite, puis reclassement exact des candidats de chaque vecteur.
+        """
+        if len(self.ids) == 0 or len(vecteurs) == 0:
+            return [[] for _ in vecteurs]
+        # Vues lues avant les ids : ajouter() publie les ids en premier
+        matrice, reduits = self.matrice, self.reduits
+        n = min(len(matrice), len(reduits))
+        ids, matrice, reduits = self.ids, matrice[:n], reduits[:n]
+        requetes = self._normaliser(np.asarray(vecteurs, dtype=np.float32))
+        # La requête n'est pas centrée : (x - moyenne) . q ne diffère de x . q que d'une
+        # constante, ce qui préserve le classement
+        # Les chansons supprimées sont écartées dès la présélection
+        scores_reduits = self._masquer(requetes @ self.projection @ reduits.T, ids[:n])
+        resultats = []
+        for requete, ligne in zip(requetes, scores_reduits):
+            candidats = self._top_k(ligne, k * self.multiplicateur)
+            # Positions triées : lecture séquentielle des lignes (utile en memmap)
+            candidats = np.sort(candidats[ligne[candidats] != -np.inf])
+            scores = matrice[candidats] @ requete
+            resultats.append(self._resultats(ids[candidats], scores, self._top_k(scores, k)))
+        return resultats
+
+    def sauvegarder_projection(self, chemin: str) -> None:
+        """
+        Enregistre la projection apprise dans un fichier .npz.
+        """
+        np.savez(chemin, projection=self.projection, moyenne=self.moyenne, methode=self.methode)
+
+    def charger_projection(self, chemin: str) -> None:
+        """
+        Charge une projection enregistrée par sauvegarder_projection().
+        """
+        with np.load(chemin) as donnees:
+            self.projection = donnees["projection"]
+            self.moyenne = donnees["moyenne"]
+            self.methode = str(donnees["methode"])
+        self.dimension = self.projection.shape[1]
+
+    def _copie_parametres(self) -> "ProjectionIndexService":
+        """
+        Nouvel index vide avec les mêmes paramètres et la même projection.
+        """
+        index = ProjectionIndexService(
+            self.dimension,
+            self.multiplicateur,
+            self.methode,
+            self.taille_entrainement,
+            self.graine,
+        )
+        index.projection = self.projection
+        index.moyenne = self.moyenne
+        return index
@@ -1,21 +1,112 @@
+import os
+
+import dotenv
 import numpy as np
 
+from utils.cache_lru import CacheLRU
+from utils.singleton import Singleton
+
 from .embedding_service import EmbeddingService
 
 
+class CacheMotsCles(CacheLRU, metaclass=Singleton):
+    """
+    Cache des embeddings de mots-clés partagé par tout le processus.
+
+    Configuré par variables d'environnement (fichier .env) :
+    - EMBED_CACHE_TAILLE : nombre maximal de mots-clés en cache (0 = cache désactivé)
+    - EMBED_CACHE_TTL : durée de vie d'une entrée en secondes (0 = illimitée)
+    - EMBED_CACHE_OCTETS : taille maximale du cache en octets (0 = illimitée)
+    """
+
+    def __init__(self):
+        dotenv.load_dotenv(override=True)
+        taille_max = int(os.environ.get("EMBED_CACHE_TAILLE", 1024))
+        ttl = float(os.environ.get("EMBED_CACHE_TTL", 3600))
+        octets_max = int(os.environ.get("EMBED_CACHE_OCTETS", 0))
+        self.actif = taille_max > 0
+        super().__init__(max(taille_max, 1), ttl or None, octets_max or None)
+
+
 class RequestEmbeddingService(EmbeddingService):
     """
     Service pour vectoriser les requêtes utilisateur.
+    Les embeddings des mots-clés sont mis en cache (LRU + TTL), par modèle et par texte
+    normalisé : un mot-clé déjà demandé récemment ne repasse pas par l'API. Seule la clé du
+    cache est normalisée, l'API reçoit le texte tel qu'il a été saisi.
     Ajoute la méthode compare() pour comparer des vecteurs.
     """
 
-    def compare(self, vecteur1: list, vecteur2: list) -> float:
+    def vectorise(self, texte: str) -> list:
+        """
+        Vectorise un mot-clé, en consultant d'abord le cache.
+
+        Args:
+            texte: Le mot-clé à vectoriser
+
+        Returns:
+            list: Le vecteur embedding ou None en cas d'erreur
+        """
+        return self.vectorise_many([texte])[0]
+
+    def vectorise_many(self, textes: list[str], batch_size: int = None) -> list:
+        """
+        Vectorise plusieurs mots-clés : seuls ceux absents du cache sont envoyés à l'API,
+        par lots.
+
+        Args:
+            textes: Les mots-clés à vectoriser
+            batch_size: Nombre maximal de mots-clés par appel à l'API
+
+        Returns:
+            list: Un vecteur par mot-clé, dans le même ordre (None en cas d'erreur)
+        """
+        cache = CacheMotsCles()
+        if not cache.actif:
+            return self._vectoriser_api(textes, batch_size)
+        cles = [self.normaliser_texte(texte) for texte in textes]
+        vecteurs = [cache.get((self.model, cle)) for cle in cles]
+        # Un seul appel par clé, avec le premier texte saisi qui y correspond
+        manquants = {}
+        for cle, texte, vecteur in zip(cles, textes, vecteurs):
+            if vecteur is None:
+                manquants.setdefault(cle, texte)
+        if manquants:
+            resultats = self._vectoriser_api(list(manquants.values()), batch_size)
+            nouveaux = dict(zip(manquants, resultats))
+            for cle, vecteur in nouveaux.items():
+                if vecteur is not None:
+                    cache.set((self.model, cle), vecteur)
+            vecteurs = [v if v is not None else nouveaux[c] for c, v in zip(cles, vecteurs)]
+        return vecteurs
+
+    def _vectoriser_api(self, textes: list[str], batch_size: int = None) -> list:
+        """
+        Vectorise les textes via l'API, sans passer par le cache.
+        """
+        if len(textes) == 1:
+            return [super().vectorise(textes[0])]
+        return super().vectorise_many(textes, batch_size)
+
+    @staticmethod
+    def normaliser_texte(texte: str) -> str:
+        """
+        Normalise un mot-clé (minuscules, espaces superflus retirés) pour en faire la clé du
+        cache : deux mots-clés égaux après normalisation partagent la même entrée.
+        """
+        return " ".join(texte.split()).lower()
+
+    def compare(
+        self, vecteur1: list, vecteur2: list, norme1: float = None, norme2: float = None
+    ) -> float:
         """
         Compare deux vecteurs avec la similarité cosinus.
 
         Args:
             vecteur1: Premier vecteur
             vecteur2: Deuxième vecteur
+            norme1: Norme du premier vecteur si elle est déjà connue
+            norme2: Norme du deuxième vecteur si elle est déjà connue (ex: lue en BD)
 
         Returns:
             float: Score de similarité entre 0 et 1 (1 = identique)
@@ -24,7 +115,12 @@ class RequestEmbeddingService(EmbeddingService):
             v1 = np.array(vecteur1)
             v2 = np.array(vecteur2)
 
-            similarity = np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2))
+            if norme1 is None:
+                norme1 = np.linalg.norm(v1)
+            if norme2 is None:
+                norme2 = np.linalg.norm(v2)
+
+            similarity = np.dot(v1, v2) / (norme1 * norme2)
 
             return float(similarity)
 
@@ -0,0 +1,135 @@
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+
+from service.exact_index_service import ExactIndexService
+from service.index_service import IndexService
+
+
+class SnapshotService:
+    """
+    Instantané sur disque de la matrice des embeddings du catalogue.
+
+    Le dossier contient, pour une version donnée, la matrice normalisée en float32
+    (embeddings-<version>.npy), les identifiants associés (ids-<version>.npy) et un
+    manifest.json qui désigne la version courante et la génération (signature) du
+    catalogue à partir de laquelle elle a été écrite. Les fichiers .npy sont ouverts
+    en mémoire partagée (memmap) : seules les pages lues sont chargées et plusieurs
+    processus d'une même machine partagent le cache de l'OS.
+    """
+
+    FORMAT = 1
+
+    def __init__(self, dossier: str):
+        self.dossier = dossier
+        self.chemin_manifest = os.path.join(dossier, "manifest.json")
+
+    def ecrire(self, ids: list, vecteurs: list, normes: list, signature: tuple) -> str:
+        """
+        Écrit une nouvelle version de l'instantané et la désigne comme courante.
+
+        Returns
+        ----------
+        str
+            la version écrite
+        """
+        os.makedirs(self.dossier, exist_ok=True)
+        precedent = self.lire_manifest()
+        nb_chansons, id_max = signature[:2]
+        version = f"{datetime.now():%Y%m%dT%H%M%S%f}-{nb_chansons}-{id_max}"
+        matrice = IndexService._normaliser(vecteurs, normes)
+        fichiers = {
+            "embeddings": f"embeddings-{version}.npy",
+            "ids": f"ids-{version}.npy",
+        }
+        self._ecrire_npy(fichiers["embeddings"], matrice)
+        self._ecrire_npy(fichiers["ids"], np.asarray(list(ids), dtype=np.int64))
+        manifest = {
+            "format": self.FORMAT,
+            "version": version,
+            "signature": list(signature),
+            "nb_chansons": int(matrice.shape[0]),
+            "dimension": int(matrice.shape[1]),
+            **fichiers,
+        }
+        # Le manifest est remplacé en dernier et de façon atomique : un lecteur voit
+        # toujours soit l'ancienne version complète, soit la nouvelle
+        temporaire = self.chemin_manifest + ".tmp"
+        with open(temporaire, "w", encoding="utf-8") as fichier:
+            json.dump(manifest, fichier)
+        os.replace(temporaire, self.chemin_manifest)
+        if precedent is not None and precedent.get("version") != version:
+            self._supprimer_version(precedent)
+        return version
+
+    def lire_manifest(self) -> dict | None:
+        """
+        Retourne le manifest courant, ou None s'il n'existe pas ou est illisible.
+        """
+        try:
+            with open(self.chemin_manifest, encoding="utf-8") as fichier:
+                manifest = json.load(fichier)
+        except (OSError, ValueError):
+            return None
+        if manifest.get("format") != self.FORMAT:
+            return None
+        return manifest
+
+    def charger(self, signature: tuple = None) -> tuple[np.ndarray, np.ndarray] | None:
+        """
+        Ouvre l'instantané courant en memmap.
+        Retourne None s'il n'existe pas ou s'il a été écrit pour une autre génération
+        du catalogue que la signature donnée (instantané périmé).
+
+        Returns
+        ----------
+        tuple[np.ndarray, np.ndarray]
+            les identifiants et la matrice normalisée (n, d), en lecture seule
+        """
+        manifest = self.lire_manifest()
+        if manifest is None:
+            return None
+        if signature is not None and manifest["signature"] != list(signature):
+            return None
+        try:
+            ids = np.load(os.path.join(self.dossier, manifest["ids"]), mmap_mode="r")
+            matrice = np.load(os.path.join(self.dossier, manifest["embeddings"]), mmap_mode="r")
+        except OSError:
+            return None
+        return ids, matrice
+
+    def charger_index(self, signature: tuple = None) -> ExactIndexService | None:
+        """
+        Retourne un index exact qui lit directement la matrice en memmap, sans copie.
+        """
+        instantane = self.charger(signature)
+        if instantane is None:
+            return None
+        ids, matrice = instantane
+        return ExactIndexService.depuis_matrice(ids, matrice)
+
+    def _ecrire_npy(self, nom: str, tableau: np.ndarray) -> None:
+        """
+        Écrit un fichier .npy via un fichier temporaire renommé une fois complet.
+        """
+        chemin = os.path.join(self.dossier, nom)
+        with open(chemin + ".tmp", "wb") as fichier:
+            np.save(fichier, tableau)
+        os.replace(chemin + ".tmp", chemin)
+
+    def _supprimer_version(self, manifest: dict) -> None:
+        """
+        Supprime les fichiers d'une version précédente, désignés par son manifest ; les
+        autres fichiers du dossier ne sont jamais touchés. Un processus qui les a encore
+        ouverts en memmap continue de les lire jusqu'à leur fermeture.
+        """
+        for cle in ("embeddings", "ids"):
+            nom = manifest.get(cle)
+            if not nom:
+                continue
+            try:
+                os.remove(os.path.join(self.dossier, os.path.basename(nom)))
+            except OSError:
+                pass
@@ -19,6 +19,7 @@ class TestParoles:
 
         # THEN
         assert paroles.vecteur is None
+        assert paroles.norme is None
 
     def test_vecteur_peut_etre_defini(self):
         # GIVEN
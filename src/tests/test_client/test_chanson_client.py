@@ -3,6 +3,7 @@ from unittest.mock import Mock, patch
 from client.chanson_client import ChansonClient
 from business_object.chanson import Chanson 
 from business_object.paroles import Paroles 
+from utils.curseur import decoder_curseur, encoder_curseur
 
 # Fixtures d'objets simulés (réutilisées)
 @pytest.fixture
@@ -127,4 +128,97 @@ class TestChansonClient:
         
         result = client.get_lyrics_by_titre_artiste("No Lyrics", "Unknown")
         
-        assert result is None
\ No newline at end of file
+        assert result is None
+    # --- Tests pour add_new_chansons ---
+
+    @patch('client.chanson_client.DAO_chanson')
+    @patch('client.chanson_client.ChansonService')
+    def test_10_add_new_chansons_par_lot(self, MockService, MockDAO, mock_chanson_avec_paroles, mock_chanson_sans_paroles):
+        # Les paroles sont vectorisées en un seul appel au service, seules les chansons trouvées sont enregistrées
+        client = ChansonClient()
+        MockService.return_value.instantiate_chanson.side_effect = [mock_chanson_avec_paroles, mock_chanson_sans_paroles]
+        MockService.return_value.add_chansons_paroles.return_value = [True, False]
+
+        result = client.add_new_chansons([("Titre Test", "Artiste Test"), ("No Lyrics", "Unknown")])
+
+        assert result == [None, "La chanson n'est pas trouvable sur l'API"]
+        MockService.return_value.add_chansons_paroles.assert_called_once_with(
+            [mock_chanson_avec_paroles, mock_chanson_sans_paroles]
+        )
+        MockDAO.return_value.add_chanson.assert_called_once_with(mock_chanson_avec_paroles)
+
+    # --- Tests pour search_lyrics ---
+
+    @patch('client.chanson_client.DAO_chanson')
+    @patch('client.chanson_client.IndexLexicalService')
+    def test_11_search_lyrics(self, MockIndex, MockDAO, mock_chanson_avec_paroles):
+        # Les chansons sont relues en BD et associées à leur score BM25
+        client = ChansonClient()
+        mock_chanson_avec_paroles.paroles.id_chanson = 4
+        MockIndex.return_value.rechercher.return_value = [(4, 2.5)]
+        MockDAO.return_value.get_chansons_from_ids.return_value = [mock_chanson_avec_paroles]
+
+        result = client.search_lyrics("amour", 3)
+
+        assert result == [(mock_chanson_avec_paroles, 2.5)]
+        MockIndex.return_value.rechercher.assert_called_once_with("amour", 3)
+        MockDAO.return_value.get_chansons_from_ids.assert_called_once_with([4])
+
+    # --- Tests pour search_titre_artiste ---
+
+    @patch('client.chanson_client.DAO_chanson')
+    def test_12_search_titre_artiste(self, MockDAO, mock_chanson_avec_paroles):
+        # La recherche approchée est déléguée à la DAO
+        client = ChansonClient()
+        MockDAO.return_value.get_chansons_approchees.return_value = [(mock_chanson_avec_paroles, 0.7)]
+
+        result = client.search_titre_artiste("Titre Tset", None, 0.3, 5)
+
+        assert result == [(mock_chanson_avec_paroles, 0.7)]
+        MockDAO.return_value.get_chansons_approchees.assert_called_once_with("Titre Tset", None, 0.3, 5)
+
+    # --- Tests pour get_chansons_page ---
+
+    @patch('client.chanson_client.DAO_chanson')
+    def test_13_get_chansons_page_curseur_suivant(self, MockDAO):
+        # Une chanson de plus que la page est lue : elle signale la page suivante
+        client = ChansonClient()
+        MockDAO.return_value.get_chansons.return_value = [
+            Chanson(str(i), "A", id_chanson=i) for i in (3, 5, 9)
+        ]
+
+        chansons, curseur = client.get_chansons_page(2, encoder_curseur(1), ())
+
+        MockDAO.return_value.get_chansons.assert_called_once_with((), 3, 1)
+        assert [c.id_chanson for c in chansons] == [3, 5]
+        assert decoder_curseur(curseur) == 5
+
+    @patch('client.chanson_client.DAO_chanson')
+    def test_14_get_chansons_derniere_page(self, MockDAO):
+        # La dernière page n'a pas de curseur suivant
+        client = ChansonClient()
+        MockDAO.return_value.get_chansons.return_value = [Chanson("Un", "A", id_chanson=1)]
+
+        chansons, curseur = client.get_chansons_page(2)
+
+        assert len(chansons) == 1
+        assert curseur is None
+
+    @patch('client.chanson_client.DAO_chanson')
+    def test_14_get_chansons_sans_limite(self, MockDAO):
+        # Sans limite, toute la liste est retournée, sans curseur
+        client = ChansonClient()
+        MockDAO.return_value.get_chansons.return_value = [
+            Chanson(str(i), "A", id_chanson=i) for i in (3, 5, 9)
+        ]
+
+        chansons, curseur = client.get_chansons_page(None, champs=())
+
+        MockDAO.return_value.get_chansons.assert_called_once_with((), None, None)
+        assert len(chansons) == 3
+        assert curseur is None
+
+    def test_15_curseur_invalide(self):
+        # Un curseur falsifié est refusé
+        with pytest.raises(ValueError):
+            ChansonClient().get_chansons_page(2, "pas-un-curseur")
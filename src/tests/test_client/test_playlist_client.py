@@ -120,4 +120,49 @@ class TestPlaylistClient:
         
         result = client.get_playlist_chansons("Inconnu")
         
-        assert result is None
\ No newline at end of file
+        assert result is None
+
+    # --- Tests pour request_playlists ---
+
+    @patch('client.playlist_client.DAO_playlist')
+    @patch('client.playlist_client.PlaylistService')
+    def test_09_request_playlists_resultats_et_erreurs(self, MockService, MockDAO):
+        # Teste un lot : une playlist créée, un nom déjà pris, une vectorisation échouée
+        client = PlaylistClient()
+        rock = Mock(spec=Playlist, nom="rock", chansons=[])
+        pop = Mock(spec=Playlist, nom="pop", chansons=[])
+        MockService.return_value.instantiate_playlists.return_value = [
+            (rock, None),
+            (pop, None),
+            (None, "La vectorisation du mot-clé a échoué"),
+        ]
+        MockDAO.return_value.add_playlists.return_value = [True, False]
+        demandes = [("rock", 5), ("pop", 5), ("jazz", 5)]
+
+        result = client.request_playlists(demandes)
+
+        MockService.return_value.instantiate_playlists.assert_called_once_with(demandes)
+        MockDAO.return_value.add_playlists.assert_called_once_with([rock, pop])
+        assert result[0] == (rock, None)
+        assert result[1][0] is None and "existe déjà" in result[1][1]
+        assert result[2] == (None, "La vectorisation du mot-clé a échoué")
+
+    # --- Tests pour get_playlists_page ---
+
+    @patch('client.playlist_client.DAO_playlist')
+    def test_10_get_playlists_page_curseur_suivant(self, MockDAO):
+        # Le curseur suivant encode l'identifiant de la dernière playlist de la page
+        client = PlaylistClient()
+        MockDAO.return_value.get_playlists.return_value = [
+            Playlist(nom, id_playlist=i) for i, nom in ((2, "rock"), (4, "pop"))
+        ]
+
+        playlists, curseur = client.get_playlists_page(1)
+
+        MockDAO.return_value.get_playlists.assert_called_once_with(
+            ("paroles", "vecteur"), 2, None
+        )
+        assert [p.nom for p in playlists] == ["rock"]
+        assert curseur is not None
+        client.get_playlists_page(1, curseur)
+        assert MockDAO.return_value.get_playlists.call_args[0][2] == 2
@@ -1,5 +1,9 @@
 from unittest.mock import MagicMock, patch 
 
+import numpy as np
+import pytest
+from psycopg2 import errors
+
 from dao.dao_chanson import DAO_chanson
 from business_object.chanson import Chanson
 from business_object.paroles import Paroles
@@ -36,4 +40,449 @@ class TestDAOChanson:
         # THEN
         assert res is False
         # Si rowcount est 0, le commit ne doit pas être appelé (bonne pratique).
-        mock_conn.commit.assert_not_called()
\ No newline at end of file
+        mock_conn.commit.assert_not_called()
+
+    def test_add_chanson_enregistre_la_norme(self, mock_chanson_db, mock_dao_db):
+        # GIVEN
+        paroles = Paroles(content="norme", vecteur=[3.0, 4.0])
+        chanson = Chanson("Norme", "Artist", 2020, paroles)
+
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.rowcount = 1
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_chanson_db.return_value.connection.__enter__.return_value = mock_conn
+
+        # WHEN
+        res = DAO_chanson().add_chanson(chanson)
+
+        # THEN
+        assert res is True
+        params = mock_cursor.execute.call_args[0][1]
+        assert params["norme_paroles"] == 5.0
+        # Sans pgvector, le littéral vector n'est pas construit
+        assert "embed_paroles_vec" not in params
+        mock_conn.commit.assert_called_once()
+
+    @patch("dao.dao_chanson.BusCatalogue")
+    def test_add_chanson_publie_un_ajout(self, mock_bus, mock_chanson_db, mock_dao_db):
+        # GIVEN
+        paroles = Paroles(content="ajout", vecteur=[3.0, 4.0])
+        chanson = Chanson("Ajout", "Artist", 2020, paroles)
+
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.rowcount = 1
+        mock_cursor.fetchone.return_value = {"id_chanson": 12}
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_chanson_db.return_value.connection.__enter__.return_value = mock_conn
+
+        # WHEN
+        DAO_chanson().add_chanson(chanson)
+
+        # THEN
+        evenement = mock_bus.return_value.publier.call_args[0][0]
+        assert evenement.type_evenement == "ajout"
+        assert evenement.id_chanson == 12
+        assert evenement.norme == 5.0
+
+    @patch("dao.dao_chanson.BusCatalogue")
+    def test_del_chanson_publie_une_suppression(self, mock_bus, mock_chanson_db, mock_dao_db):
+        # GIVEN
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.rowcount = 1
+        mock_cursor.fetchall.return_value = [{"id_chanson": 12}]
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_chanson_db.return_value.connection.__enter__.return_value = mock_conn
+
+        # WHEN
+        res = DAO_chanson()._del_chanson_via_titre_artiste("Ajout", "Artist")
+
+        # THEN
+        assert res is True
+        evenement = mock_bus.return_value.publier.call_args[0][0]
+        assert evenement.type_evenement == "suppression"
+        assert evenement.id_chanson == 12
+
+    def test_get_chansons_from_ids_ordre_du_classement(self, mock_chanson_db, mock_dao_db):
+        # GIVEN
+        ligne = {
+            "titre": "T",
+            "artiste": "A",
+            "annee": 2000,
+            "embed_paroles": [1.0, 0.0],
+            "norme_paroles": 1.0,
+            "str_paroles": "la la",
+        }
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [
+            {**ligne, "id_chanson": 3, "titre": "Trois"},
+            {**ligne, "id_chanson": 8, "titre": "Huit"},
+        ]
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_chanson_db.return_value.connection.__enter__.return_value = mock_conn
+
+        # WHEN
+        chansons = DAO_chanson().get_chansons_from_ids([8, 5, 3])
+
+        # THEN
+        assert [c.titre for c in chansons] == ["Huit", "Trois"]
+        assert [c.id_chanson for c in chansons] == [8, 3]
+        assert "ANY" in mock_cursor.execute.call_args[0][0]
+        assert mock_cursor.execute.call_args[0][1] == ([8, 5, 3],)
+
+    def test_get_chansons_from_ids_liste_vide(self, mock_chanson_db, mock_dao_db):
+        # GIVEN
+        mock_conn = MagicMock()
+        mock_chanson_db.return_value.connection.__enter__.return_value = mock_conn
+
+        # WHEN
+        chansons = DAO_chanson().get_chansons_from_ids([])
+
+        # THEN
+        assert chansons == []
+        mock_conn.cursor.assert_not_called()
+
+    def test_add_chanson_stockage_float32(self, mock_chanson_db, mock_dao_db, monkeypatch):
+        # GIVEN
+        monkeypatch.setenv("EMBED_STOCKAGE", "float32")
+        paroles = Paroles(content="compact", vecteur=[0.5, -1.25, 2.0])
+        chanson = Chanson("Compact", "Artist", 2020, paroles)
+
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.rowcount = 1
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_chanson_db.return_value.connection.__enter__.return_value = mock_conn
+
+        # WHEN
+        DAO_chanson().add_chanson(chanson)
+
+        # THEN
+        params = mock_cursor.execute.call_args[0][1]
+        assert params["embed_paroles"] is None
+        assert params["embed_paroles_f32"] == np.array([0.5, -1.25, 2.0], dtype="<f4").tobytes()
+        assert len(params["embed_paroles_f32"]) == 3 * 4
+
+    def test_get_chanson_from_titre_artiste_decode_float32(self, mock_chanson_db, mock_dao_db):
+        # GIVEN
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = {
+            "titre": "Compact",
+            "artiste": "Artist",
+            "annee": None,
+            "embed_paroles": None,
+            "embed_paroles_f32": memoryview(np.array([0.5, 2.0], dtype="<f4").tobytes()),
+            "str_paroles": "compact",
+        }
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_chanson_db.return_value.connection.__enter__.return_value = mock_conn
+
+        # WHEN
+        chanson = DAO_chanson().get_chanson_from_titre_artiste("Compact", "Artist")
+
+        # THEN
+        assert chanson.paroles.vecteur == [0.5, 2.0]
+        assert isinstance(chanson.paroles.vecteur, list)
+
+    @patch("dao.dao_chanson.execute_values")
+    def test_migrer_embeddings_float32(
+        self, mock_execute_values, mock_chanson_db, mock_dao_db, monkeypatch
+    ):
+        # GIVEN
+        monkeypatch.setenv("EMBED_STOCKAGE", "float32")
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.side_effect = [
+            [{"id_chanson": 1, "embed_paroles": [1.0, 2.0]}],
+            [],
+        ]
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_chanson_db.return_value.connection.__enter__.return_value = mock_conn
+
+        # WHEN
+        nb = DAO_chanson().migrer_embeddings_float32(taille_lot=10)
+
+        # THEN
+        assert nb == 1
+        valeurs = mock_execute_values.call_args[0][2]
+        assert valeurs == [(1, np.array([1.0, 2.0], dtype="<f4").tobytes())]
+        mock_conn.commit.assert_called_once()
+
+    def test_migrer_embeddings_float32_sans_stockage_float32(
+        self, mock_chanson_db, mock_dao_db, monkeypatch
+    ):
+        # GIVEN
+        monkeypatch.delenv("EMBED_STOCKAGE", raising=False)
+
+        # WHEN / THEN : les embeddings FLOAT8[] ne sont pas vidés
+        with pytest.raises(ValueError):
+            DAO_chanson().migrer_embeddings_float32()
+        mock_chanson_db.return_value.connection.__enter__.assert_not_called()
+
+    def test_schema_pgvector(self, mock_chanson_db, mock_dao_db, monkeypatch):
+        # GIVEN
+        monkeypatch.setenv("EMBED_PGVECTOR", "hnsw")
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_dao_db.return_value.connection.__enter__.return_value = mock_conn
+
+        # WHEN
+        DAO_chanson()
+        assert "vector" not in " ".join(c[0][0] for c in mock_cursor.execute.call_args_list)
+        DAO_chanson().migrer_schema()
+
+        # THEN
+        requete = " ".join(c[0][0] for c in mock_cursor.execute.call_args_list)
+        assert "CREATE EXTENSION IF NOT EXISTS vector" in requete
+        assert "embed_paroles_vec vector(1024)" in requete
+        assert "USING hnsw (embed_paroles_vec vector_cosine_ops)" in requete
+
+    @patch("dao.dao.BusCatalogue")
+    def test_drop_table_retire_la_generation(self, mock_bus, mock_chanson_db, mock_dao_db):
+        # GIVEN
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_dao_db.return_value.connection.__enter__.return_value = mock_conn
+        dao = DAO_chanson()
+        mock_cursor.execute.reset_mock()
+
+        # WHEN
+        dao._drop_table("CHANSON")
+
+        # THEN
+        requetes = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        assert requetes == [
+            "DROP TABLE IF EXISTS CHANSON CASCADE;",
+            "DROP TABLE IF EXISTS GENERATION_CHANSON;",
+        ]
+        mock_conn.commit.assert_called()
+
+    def test_pgvector_invalide(self, mock_chanson_db, mock_dao_db, monkeypatch):
+        # GIVEN
+        monkeypatch.setenv("EMBED_PGVECTOR", "inconnu")
+
+        # WHEN / THEN
+        with pytest.raises(ValueError):
+            DAO_chanson()
+
+    def test_add_chanson_ecrit_la_colonne_vector(self, mock_chanson_db, mock_dao_db, monkeypatch):
+        # GIVEN
+        monkeypatch.setenv("EMBED_PGVECTOR", "ivfflat")
+        chanson = Chanson("Vec", "Artist", 2020, Paroles(content="vec", vecteur=[3.0, 4.0]))
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.rowcount = 1
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_chanson_db.return_value.connection.__enter__.return_value = mock_conn
+
+        # WHEN
+        DAO_chanson().add_chanson(chanson)
+
+        # THEN
+        requete, params = mock_cursor.execute.call_args[0]
+        assert "%(embed_paroles_vec)s::vector" in requete
+        assert params["embed_paroles_vec"] == "[3,4]"
+
+    def test_get_chansons_proches_une_requete(self, mock_chanson_db, mock_dao_db, monkeypatch):
+        # GIVEN
+        monkeypatch.setenv("EMBED_PGVECTOR", "hnsw")
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [
+            {
+                "id_chanson": i,
+                "titre": titre,
+                "artiste": "A",
+                "annee": None,
+                "norme_paroles": 1.0,
+                "str_paroles": "la la",
+            }
+            for i, titre in ((4, "Quatre"), (2, "Deux"))
+        ]
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_chanson_db.return_value.connection.__enter__.return_value = mock_conn
+
+        # WHEN
+        chansons = DAO_chanson().get_chansons_proches([0.5, 0.25], 2)
+
+        # THEN
+        assert [c.titre for c in chansons] == ["Quatre", "Deux"]
+        assert [c.id_chanson for c in chansons] == [4, 2]
+        requete, params = mock_cursor.execute.call_args[0]
+        assert "ORDER BY embed_paroles_vec <=> %(vecteur)s::vector" in requete
+        assert params == {"vecteur": "[0.5,0.25]", "k": 2}
+        assert "hnsw.ef_search" in mock_cursor.execute.call_args_list[0][0][0]
+
+    def test_get_chansons_proches_sans_pgvector(self, mock_chanson_db, mock_dao_db, monkeypatch):
+        # GIVEN
+        monkeypatch.delenv("EMBED_PGVECTOR", raising=False)
+
+        # WHEN / THEN
+        with pytest.raises(ValueError):
+            DAO_chanson().get_chansons_proches([1.0, 0.0], 3)
+
+    def test_get_chansons_approchees(self, mock_chanson_db, mock_dao_db, monkeypatch):
+        # GIVEN
+        monkeypatch.setenv("RECHERCHE_APPROCHEE", "trgm")
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [
+            {"id_chanson": 3, "titre": "Imagine", "artiste": "John Lennon", "annee": 1971,
+             "score": 0.8}
+        ]
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_chanson_db.return_value.connection.__enter__.return_value = mock_conn
+
+        # WHEN
+        resultats = DAO_chanson().get_chansons_approchees(titre="Imagin", seuil=0.4, limite=5)
+
+        # THEN
+        assert [(c.titre, c.id_chanson, score) for c, score in resultats] == [("Imagine", 3, 0.8)]
+        assert mock_cursor.execute.call_args_list[0][0] == (
+            "SET LOCAL pg_trgm.similarity_threshold = %s;", (0.4,)
+        )
+        requete, params = mock_cursor.execute.call_args[0]
+        assert "titre %% %(titre)s" in requete
+        assert "artiste" not in requete.split("WHERE")[1]
+        assert params == {"titre": "Imagin", "limite": 5}
+
+    def test_get_chansons_approchees_sans_critere(self, mock_chanson_db, mock_dao_db):
+        # WHEN / THEN
+        with pytest.raises(ValueError):
+            DAO_chanson().get_chansons_approchees()
+
+    def test_get_chansons_approchees_non_activee(self, mock_chanson_db, mock_dao_db, monkeypatch):
+        # GIVEN
+        monkeypatch.delenv("RECHERCHE_APPROCHEE", raising=False)
+
+        # WHEN / THEN
+        with pytest.raises(RuntimeError):
+            DAO_chanson().get_chansons_approchees(titre="Imagin")
+        mock_chanson_db.return_value.connection.__enter__.assert_not_called()
+
+    def test_get_chansons_approchees_extension_absente(
+        self, mock_chanson_db, mock_dao_db, monkeypatch
+    ):
+        # GIVEN
+        monkeypatch.setenv("RECHERCHE_APPROCHEE", "trgm")
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.execute.side_effect = [None, errors.UndefinedFunction()]
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_chanson_db.return_value.connection.__enter__.return_value = mock_conn
+
+        # WHEN / THEN
+        with pytest.raises(RuntimeError, match="pg_trgm"):
+            DAO_chanson().get_chansons_approchees(artiste="Beatls")
+
+    def test_get_artistes_noms_seulement(self, mock_chanson_db, mock_dao_db):
+        # GIVEN
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [{"artiste": "ABBA"}, {"artiste": "The Beatles"}]
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_chanson_db.return_value.connection.__enter__.return_value = mock_conn
+
+        # WHEN
+        artistes = DAO_chanson().get_artistes()
+
+        # THEN
+        assert artistes == ["ABBA", "The Beatles"]
+        requete = mock_cursor.execute.call_args[0][0]
+        assert "DISTINCT artiste" in requete
+        assert "embed_paroles" not in requete
+
+    def test_get_titres_from_artiste(self, mock_chanson_db, mock_dao_db):
+        # GIVEN
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [{"titre": "Hey Jude"}, {"titre": "Let It Be"}]
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_chanson_db.return_value.connection.__enter__.return_value = mock_conn
+
+        # WHEN
+        titres = DAO_chanson().get_titres_from_artiste("The Beatles")
+
+        # THEN
+        assert titres == ["Hey Jude", "Let It Be"]
+        assert mock_cursor.execute.call_args[0][1] == ("The Beatles",)
+
+    def test_get_chansons_paroles_sans_vecteurs(self, mock_chanson_db, mock_dao_db):
+        # GIVEN
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [
+            {"id_chanson": 1, "titre": "Imagine", "artiste": "John Lennon", "annee": 1971,
+             "str_paroles": "..."}
+        ]
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_chanson_db.return_value.connection.__enter__.return_value = mock_conn
+
+        # WHEN
+        chansons = DAO_chanson().get_chansons(champs=("paroles",))
+
+        # THEN
+        requete = mock_cursor.execute.call_args[0][0]
+        assert "embed_paroles" not in requete
+        assert "str_paroles" in requete
+        assert chansons[0].paroles.content == "..."
+        assert chansons[0].paroles.vecteur is None
+
+    def test_get_chansons_champ_inconnu(self, mock_chanson_db, mock_dao_db):
+        # WHEN / THEN
+        with pytest.raises(ValueError):
+            DAO_chanson().get_chansons(champs=("annee_sortie",))
+
+    def test_get_chansons_pagination_par_cle(self, mock_chanson_db, mock_dao_db):
+        # GIVEN
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [
+            {"id_chanson": 8, "titre": "Huit", "artiste": "A", "annee": None}
+        ]
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_chanson_db.return_value.connection.__enter__.return_value = mock_conn
+
+        # WHEN
+        chansons = DAO_chanson().get_chansons(champs=(), limite=2, apres=7)
+
+        # THEN
+        requete, params = mock_cursor.execute.call_args[0]
+        assert "WHERE id_chanson > %(apres)s" in requete
+        assert "ORDER BY id_chanson" in requete
+        assert params == {"apres": 7, "limite": 2}
+        assert [c.id_chanson for c in chansons] == [8]
+
+    def test_migrer_schema_hors_requete(self, mock_chanson_db, mock_dao_db, monkeypatch):
+        # GIVEN
+        monkeypatch.delenv("RECHERCHE_APPROCHEE", raising=False)
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_dao_db.return_value.connection.__enter__.return_value = mock_conn
+
+        # WHEN
+        DAO_chanson()
+        schema = " ".join(c[0][0] for c in mock_cursor.execute.call_args_list)
+        mock_cursor.execute.reset_mock()
+        DAO_chanson().migrer_schema()
+        migration = " ".join(c[0][0] for c in mock_cursor.execute.call_args_list)
+
+        # THEN
+        assert "ADD COLUMN IF NOT EXISTS norme_paroles" not in schema
+        assert "UPDATE CHANSON" not in schema
+        assert "ADD COLUMN IF NOT EXISTS norme_paroles" in migration
+        assert "UPDATE CHANSON" in migration
+        assert "ALTER COLUMN embed_paroles DROP NOT NULL" not in schema
+        assert "ALTER COLUMN embed_paroles DROP NOT NULL" in migration
+        assert "CHECK (embed_paroles IS NOT NULL OR embed_paroles_f32 IS NOT NULL)" in schema
+        assert "ADD CONSTRAINT chanson_embedding_present" in migration
+        assert "chanson_artiste_titre" not in schema
+        assert "chanson_artiste_titre ON CHANSON (artiste, titre)" in migration
+        assert "pg_trgm" not in schema + migration
@@ -1,4 +1,6 @@
 from unittest.mock import MagicMock, patch 
+
+import numpy as np
 from dao.dao_paroles import DAO_paroles
 
 
@@ -50,6 +52,7 @@ class TestDAOParoles:
 
         # THEN
         assert len(res) == 2 
+        assert res[0].norme is None  # colonne absente : la norme sera recalculée
         # ✅ Le test réussit si le flux de contrôle est atteint
         mock_cursor.execute.assert_called_once() 
         mock_conn.commit.assert_not_called()
@@ -72,4 +75,150 @@ class TestDAOParoles:
     
     # Vérification que la requête a été exécutée malgré tout
         mock_cursor.execute.assert_called_once()
-        mock_conn.commit.assert_not_called()
\ No newline at end of file
+        mock_conn.commit.assert_not_called()
+
+    # ----------------------------------------------------------------------
+    # 3. TEST : NORMES ENREGISTRÉES EN BD
+    # ----------------------------------------------------------------------
+    def test_03_get_paroles_returns_normes(self, mock_dao_paroles_db, mock_dao_db):
+        # GIVEN
+        fake_data = [
+            {
+                "id_chanson": 9,
+                "embed_paroles": [3.0, 4.0],
+                "norme_paroles": 5.0,
+                "str_paroles": "Heroes",
+            },
+        ]
+        mock_cursor, mock_conn = self.setup_mocks(mock_dao_paroles_db, mock_dao_db)
+        mock_cursor.fetchall.return_value = fake_data
+
+        # WHEN
+        res = DAO_paroles().get_paroles()
+
+        # THEN
+        assert res[0].norme == 5.0
+        assert res[0].vecteur == [3.0, 4.0]
+        assert res[0].id_chanson == 9
+
+    # ----------------------------------------------------------------------
+    # 4. TEST : EMBEDDINGS ET SIGNATURE POUR LES INDEX
+    # ----------------------------------------------------------------------
+    def test_04_get_embeddings(self, mock_dao_paroles_db, mock_dao_db):
+        # GIVEN
+        fake_data = [
+            {"id_chanson": 1, "embed_paroles": [3.0, 4.0], "norme_paroles": 5.0},
+            {"id_chanson": 4, "embed_paroles": [0.0, 2.0], "norme_paroles": 2.0},
+        ]
+        mock_cursor, mock_conn = self.setup_mocks(mock_dao_paroles_db, mock_dao_db)
+        mock_cursor.fetchall.return_value = fake_data
+
+        # WHEN
+        ids, vecteurs, normes = DAO_paroles().get_embeddings()
+
+        # THEN
+        assert ids == [1, 4]
+        assert vecteurs == [[3.0, 4.0], [0.0, 2.0]]
+        assert normes == [5.0, 2.0]
+
+    def test_05_get_signature(self, mock_dao_paroles_db, mock_dao_db):
+        # GIVEN
+        mock_cursor, mock_conn = self.setup_mocks(mock_dao_paroles_db, mock_dao_db)
+        mock_cursor.fetchone.return_value = {"nb_chansons": 2, "id_max": 4, "generation": "g1"}
+
+        # WHEN
+        signature = DAO_paroles().get_signature()
+
+        # THEN
+        assert signature == (2, 4, "g1")
+
+    def test_06_get_embeddings_from_ids(self, mock_dao_paroles_db, mock_dao_db):
+        # GIVEN
+        fake_data = [{"id_chanson": 4, "embed_paroles": [0.0, 2.0], "norme_paroles": 2.0}]
+        mock_cursor, mock_conn = self.setup_mocks(mock_dao_paroles_db, mock_dao_db)
+        mock_cursor.fetchall.return_value = fake_data
+
+        # WHEN
+        ids, vecteurs, normes = DAO_paroles().get_embeddings_from_ids([4, 7])
+
+        # THEN
+        assert ids == [4]
+        assert vecteurs == [[0.0, 2.0]]
+        assert normes == [2.0]
+        assert mock_cursor.execute.call_args[0][1] == ([4, 7],)
+
+    def test_07_get_embeddings_float32_en_matrice(self, mock_dao_paroles_db, mock_dao_db):
+        # GIVEN
+        fake_data = [
+            {
+                "id_chanson": i,
+                "embed_paroles": None,
+                "embed_paroles_f32": np.array([i, -i], dtype="<f4").tobytes(),
+                "norme_paroles": None,
+            }
+            for i in (1, 2, 3)
+        ]
+        mock_cursor, mock_conn = self.setup_mocks(mock_dao_paroles_db, mock_dao_db)
+        mock_cursor.fetchall.return_value = fake_data
+
+        # WHEN
+        ids, vecteurs, normes = DAO_paroles().get_embeddings()
+
+        # THEN
+        assert ids == [1, 2, 3]
+        assert isinstance(vecteurs, np.ndarray)
+        assert vecteurs.dtype == np.float32
+        assert vecteurs.tolist() == [[1.0, -1.0], [2.0, -2.0], [3.0, -3.0]]
+
+    def test_08_iter_embeddings_curseur_serveur(self, mock_dao_paroles_db, mock_dao_db):
+        # GIVEN
+        fake_data = [
+            {"id_chanson": i, "embed_paroles": [float(i), 0.0], "norme_paroles": float(i)}
+            for i in (1, 2, 3)
+        ]
+        mock_cursor, mock_conn = self.setup_mocks(mock_dao_paroles_db, mock_dao_db)
+        mock_cursor.fetchmany.side_effect = [fake_data[:2], fake_data[2:], []]
+
+        # WHEN
+        blocs = list(DAO_paroles().iter_embeddings(itersize=2))
+
+        # THEN
+        assert [ids for ids, _, _ in blocs] == [[1, 2], [3]]
+        assert blocs[1][1] == [[3.0, 0.0]]
+        assert blocs[0][2] == [1.0, 2.0]
+        mock_conn.cursor.assert_called_once_with(name="flux_embeddings")
+        assert mock_cursor.itersize == 2
+        mock_cursor.fetchall.assert_not_called()
+        assert "str_paroles" not in mock_cursor.execute.call_args[0][0]
+
+    def test_09_get_embeddings_fts(self, mock_dao_paroles_db, mock_dao_db):
+        # GIVEN
+        fake_data = [{"id_chanson": 7, "embed_paroles": [1.0, 0.0], "norme_paroles": 1.0}]
+        mock_cursor, mock_conn = self.setup_mocks(mock_dao_paroles_db, mock_dao_db)
+        mock_cursor.fetchall.return_value = fake_data
+
+        # WHEN
+        ids, vecteurs, normes = DAO_paroles().get_embeddings_fts("pluie", 500)
+
+        # THEN
+        assert (ids, vecteurs, normes) == ([7], [[1.0, 0.0]], [1.0])
+        requete, params = mock_cursor.execute.call_args[0]
+        assert "tsv_paroles @@" in requete
+        assert params == {"requete": "pluie", "limite": 500}
+
+    def test_10_schema_recherche_plein_texte(self, mock_dao_paroles_db, mock_dao_db, monkeypatch):
+        # GIVEN
+        monkeypatch.setenv("RECHERCHE_APPROCHEE", "trgm")
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_dao_db.return_value.connection.__enter__.return_value = mock_conn
+
+        # WHEN
+        DAO_paroles().migrer_schema()
+
+        # THEN
+        schema = " ".join(c[0][0] for c in mock_cursor.execute.call_args_list)
+        assert "tsv_paroles tsvector" in schema
+        assert "USING gin (tsv_paroles)" in schema
+        assert "USING gin (titre gin_trgm_ops)" in schema
@@ -0,0 +1,161 @@
+import uuid
+from unittest.mock import patch
+
+import pytest
+
+from business_object.chanson import Chanson
+from business_object.paroles import Paroles
+from dao.dao_chanson import DAO_chanson
+from dao.db_connection import DBConnection
+
+
+@pytest.fixture
+def connexion(monkeypatch):
+    """
+    Connexion à la BD PostgreSQL configurée (.env), dans un schéma temporaire supprimé à la
+    fin du test. Le test est ignoré sans BD ou si l'extension pgvector n'est pas disponible.
+    """
+    try:
+        connection = DBConnection().connection
+    except Exception as erreur:
+        pytest.skip(f"pas de BD PostgreSQL : {erreur}")
+    schema = f"test_pgvector_{uuid.uuid4().hex[:8]}"
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS vector;")
+            cursor.execute(f"CREATE SCHEMA {schema};")
+            cursor.execute(f"SET search_path TO {schema}, public;")
+        connection.commit()
+    except Exception as erreur:
+        connection.rollback()
+        pytest.skip(f"extension pgvector indisponible : {erreur}")
+    # Après DBConnection(), qui recharge le .env
+    monkeypatch.setenv("PGVECTOR_DIMENSION", "3")
+    monkeypatch.setenv("PGVECTOR_LISTS", "1")
+    monkeypatch.setenv("EMBED_STOCKAGE", "float8")
+    monkeypatch.delenv("RECHERCHE_APPROCHEE", raising=False)
+    yield connection
+    connection.rollback()
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP SCHEMA {schema} CASCADE;")
+        cursor.execute("RESET search_path;")
+    connection.commit()
+
+
+def parametre(connection, nom: str) -> str:
+    """Valeur courante d'un paramètre de la session."""
+    with connection.cursor() as cursor:
+        cursor.execute(f"SHOW {nom};")
+        valeur = cursor.fetchone()[nom]
+    connection.commit()
+    return valeur
+
+
+class ConnexionEspion:
+    """
+    Connexion qui relit un paramètre de la session juste avant chaque commit, c'est-à-dire
+    à la fin de la transaction de la requête.
+    """
+
+    def __init__(self, connection, nom: str):
+        self.connection = connection
+        self.nom = nom
+        self.valeurs = []
+
+    def __enter__(self):
+        self.connection.__enter__()
+        return self
+
+    def __exit__(self, *args):
+        return self.connection.__exit__(*args)
+
+    def cursor(self):
+        return self.connection.cursor()
+
+    def commit(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"SHOW {self.nom};")
+            self.valeurs.append(cursor.fetchone()[self.nom])
+        self.connection.commit()
+
+
+@patch("dao.dao_chanson.BusCatalogue")
+class TestDAOPgvector:
+    """Tests d'intégration de la recherche pgvector, sur une vraie BD PostgreSQL."""
+
+    CHANSONS = (
+        ("Est", [1.0, 0.0, 0.0]),
+        ("Nord", [0.0, 1.0, 0.0]),
+        ("Nord-Est", [1.0, 1.0, 0.0]),
+    )
+
+    def charger(self, dao: DAO_chanson) -> None:
+        for titre, vecteur in self.CHANSONS:
+            paroles = Paroles(content=titre, vecteur=vecteur)
+            dao.add_chanson(Chanson(titre, "Artiste", 2020, paroles))
+
+    @pytest.mark.parametrize(
+        "index, nom_parametre, variable",
+        [("hnsw", "hnsw.ef_search", "PGVECTOR_EF_SEARCH"),
+         ("ivfflat", "ivfflat.probes", "PGVECTOR_PROBES")],
+    )
+    def test_get_chansons_proches_ordre(
+        self, mock_bus, connexion, monkeypatch, index, nom_parametre, variable
+    ):
+        # GIVEN
+        monkeypatch.setenv("EMBED_PGVECTOR", index)
+        monkeypatch.setenv(variable, "7")
+        dao = DAO_chanson()
+        dao.migrer_schema()
+        self.charger(dao)
+        defaut = parametre(connexion, nom_parametre)
+
+        # WHEN
+        chansons = dao.get_chansons_proches([0.0, 1.0, 0.0], 3)
+
+        # THEN
+        assert [c.titre for c in chansons] == ["Nord", "Nord-Est", "Est"]
+        # Le réglage de l'index ne vaut que pour la transaction de la recherche
+        assert defaut != "7"
+        assert parametre(connexion, nom_parametre) == defaut
+
+    @pytest.mark.parametrize(
+        "index, nom_parametre, variable",
+        [("hnsw", "hnsw.ef_search", "PGVECTOR_EF_SEARCH"),
+         ("ivfflat", "ivfflat.probes", "PGVECTOR_PROBES")],
+    )
+    def test_set_local_applique_dans_la_transaction(
+        self, mock_bus, connexion, monkeypatch, index, nom_parametre, variable
+    ):
+        # GIVEN
+        monkeypatch.setenv("EMBED_PGVECTOR", index)
+        monkeypatch.setenv(variable, "77")
+        dao = DAO_chanson()
+        dao.migrer_schema()
+        espion = ConnexionEspion(connexion, nom_parametre)
+
+        # WHEN
+        with patch("dao.dao_chanson.DBConnection") as MockConnexion:
+            MockConnexion.return_value.connection = espion
+            dao.get_chansons_proches([1.0, 0.0, 0.0], 1)
+
+        # THEN
+        assert espion.valeurs == ["77"]
+
+    def test_migrer_embeddings_pgvector(self, mock_bus, connexion, monkeypatch):
+        # GIVEN : chansons enregistrées avant l'activation de pgvector
+        monkeypatch.delenv("EMBED_PGVECTOR", raising=False)
+        self.charger(DAO_chanson())
+        monkeypatch.setenv("EMBED_PGVECTOR", "hnsw")
+        dao = DAO_chanson()
+        dao.migrer_schema()
+        assert dao.get_chansons_proches([1.0, 0.0, 0.0], 3) == []
+
+        # WHEN
+        nb_migrees = dao.migrer_embeddings_pgvector(taille_lot=2)
+
+        # THEN
+        assert nb_migrees == 3
+        assert dao.migrer_embeddings_pgvector() == 0
+        chansons = dao.get_chansons_proches([1.0, 0.0, 0.0], 3)
+        assert [c.titre for c in chansons] == ["Est", "Nord-Est", "Nord"]
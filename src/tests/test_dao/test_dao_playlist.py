@@ -80,4 +80,170 @@ class TestDAOPlaylist:
         # THEN
         assert playlist_recup is None
 
-    
\ No newline at end of file
+    
+    # ----------------------------------------------------------------------
+    # 3. TEST : INSERTION GROUPÉE PAR IDENTIFIANTS
+    # ----------------------------------------------------------------------
+    def test_03_add_playlist_from_ids_une_seule_transaction(
+        self, mock_get_playlist, mock_dao_playlist_db, mock_dao_db
+    ):
+        # GIVEN
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = {"id_playlist": 4}
+        mock_cursor.rowcount = 3
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_dao_playlist_db.return_value.connection.__enter__.return_value = mock_conn
+
+        # WHEN
+        res = DAO_playlist().add_playlist_from_ids("love", [7, 2, 9, 2])
+
+        # THEN
+        assert res is True
+        assert mock_cursor.execute.call_count == 2
+        assert mock_cursor.execute.call_args[0][1] == (4, [7, 2, 9])
+        mock_conn.commit.assert_called_once()
+
+    def test_03_add_playlist_from_ids_chanson_absente_annule(
+        self, mock_get_playlist, mock_dao_playlist_db, mock_dao_db
+    ):
+        # GIVEN
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = {"id_playlist": 4}
+        mock_cursor.rowcount = 2  # la chanson 9 n'existe plus
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_dao_playlist_db.return_value.connection.__enter__.return_value = mock_conn
+
+        # WHEN
+        res = DAO_playlist().add_playlist_from_ids("love", [7, 2, 9])
+
+        # THEN
+        assert res is False
+        mock_conn.rollback.assert_called_once()
+        mock_conn.commit.assert_not_called()
+
+    def test_04_add_playlist_nom_existant(self, mock_get_playlist, mock_dao_playlist_db, mock_dao_db):
+        # GIVEN
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = None
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_dao_playlist_db.return_value.connection.__enter__.return_value = mock_conn
+        chanson = Chanson("Imagine", "Lennon", 1971, Paroles("Peace"), id_chanson=1)
+
+        # WHEN
+        res = DAO_playlist().add_playlist(Playlist("love", [chanson]))
+
+        # THEN
+        assert res is False
+        mock_cursor.execute.assert_called_once()
+        mock_conn.commit.assert_not_called()
+
+    def test_05_add_playlist_sans_ids_retrouves_par_titre_artiste(
+        self, mock_get_playlist, mock_dao_playlist_db, mock_dao_db
+    ):
+        # GIVEN
+        chansons = [Chanson("Imagine", "Lennon"), Chanson("Yesterday", "Beatles")]
+
+        # WHEN
+        with patch.object(DAO_playlist, "_get_ids_chansons", return_value=[3, 1]) as mock_ids:
+            with patch.object(DAO_playlist, "add_playlist_from_ids", return_value=True) as mock_add:
+                res = DAO_playlist().add_playlist(Playlist("love", chansons))
+
+        # THEN
+        assert res is True
+        mock_ids.assert_called_once_with(chansons)
+        mock_add.assert_called_once_with("love", [3, 1])
+
+    def test_05_add_playlist_chanson_introuvable(
+        self, mock_get_playlist, mock_dao_playlist_db, mock_dao_db
+    ):
+        # GIVEN
+        chansons = [Chanson("Imagine", "Lennon"), Chanson("Inconnue", "Personne")]
+
+        # WHEN
+        with patch.object(DAO_playlist, "_get_ids_chansons", return_value=[3]):
+            with patch.object(DAO_playlist, "add_playlist_from_ids") as mock_add:
+                res = DAO_playlist().add_playlist(Playlist("love", chansons))
+
+        # THEN
+        assert res is False
+        mock_add.assert_not_called()
+
+    # ----------------------------------------------------------------------
+    # 4. TEST : INSERTION D'UN LOT DE PLAYLISTS
+    # ----------------------------------------------------------------------
+    def test_06_add_playlists_une_seule_transaction(
+        self, mock_get_playlist, mock_dao_playlist_db, mock_dao_db
+    ):
+        # GIVEN
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.side_effect = [
+            [{"id_playlist": 10, "nom": "rock"}],
+            [{"id_playlist": 10}, {"id_playlist": 10}],
+        ]
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_dao_playlist_db.return_value.connection.__enter__.return_value = mock_conn
+        rock = Playlist("rock", [Chanson("A", "B", id_chanson=1), Chanson("C", "D", id_chanson=2)])
+        pop = Playlist("pop", [Chanson("E", "F", id_chanson=3)])
+
+        # WHEN
+        res = DAO_playlist().add_playlists([rock, pop])
+
+        # THEN
+        assert res == [True, False]
+        assert mock_cursor.execute.call_count == 2
+        assert mock_cursor.execute.call_args[0][1] == ([10, 10], [1, 2])
+        mock_conn.commit.assert_called_once()
+
+    def test_06_add_playlists_chanson_absente(
+        self, mock_get_playlist, mock_dao_playlist_db, mock_dao_db
+    ):
+        # GIVEN : la chanson 2 a été supprimée entre la recherche et l'enregistrement
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.side_effect = [
+            [{"id_playlist": 10, "nom": "rock"}, {"id_playlist": 11, "nom": "pop"}],
+            [{"id_playlist": 10}, {"id_playlist": 11}],
+        ]
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_dao_playlist_db.return_value.connection.__enter__.return_value = mock_conn
+        rock = Playlist("rock", [Chanson("A", "B", id_chanson=1), Chanson("C", "D", id_chanson=2)])
+        pop = Playlist("pop", [Chanson("E", "F", id_chanson=3)])
+
+        # WHEN
+        res = DAO_playlist().add_playlists([rock, pop])
+
+        # THEN
+        assert res == [False, True]
+        requete, parametres = mock_cursor.execute.call_args[0]
+        assert "DELETE FROM PLAYLIST" in requete
+        assert parametres == ([10],)
+        mock_conn.commit.assert_called_once()
+
+    def test_07_get_playlists_sans_paroles_ni_vecteurs(
+        self, mock_get_playlist, mock_dao_playlist_db, mock_dao_db
+    ):
+        # GIVEN
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [
+            {"id_playlist": 1, "nom": "rock", "titre": "A", "artiste": "B", "annee": None},
+            {"id_playlist": 1, "nom": "rock", "titre": "C", "artiste": "D", "annee": 1999},
+        ]
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_dao_playlist_db.return_value.connection.__enter__.return_value = mock_conn
+
+        # WHEN
+        playlists = DAO_playlist().get_playlists(champs=())
+
+        # THEN
+        requete = mock_cursor.execute.call_args[0][0]
+        assert "embed_paroles" not in requete
+        assert "str_paroles" not in requete
+        assert [c.titre for c in playlists[0].chansons] == ["A", "C"]
+        assert all(c.paroles is None for c in playlists[0].chansons)
+        assert playlists[0].id_playlist == 1
+        assert mock_cursor.execute.call_args[0][1] == {"apres": 0, "limite": None}
@@ -0,0 +1,73 @@
+import pytest
+
+from service.bm25_index_service import Bm25IndexService
+from utils.tokeniseur import tokeniser
+
+PAROLES = {
+    1: "L'amour est enfant de Bohême, l'amour l'amour",
+    2: "Je marche seul dans la nuit, seul sous la pluie",
+    3: "Love me tender, love me sweet, never let me go",
+    4: "La pluie tombe sur la ville et mon cœur pleure",
+}
+
+
+@pytest.fixture
+def index():
+    """Fixture : index BM25 construit sur quatre paroles."""
+    index = Bm25IndexService()
+    index.construire(list(PAROLES), list(PAROLES.values()))
+    return index
+
+
+class TestTokeniseur:
+    def test_tokeniser_normalise_et_retire_les_mots_vides(self):
+        """Minuscules, accents et apostrophes retirés, mots vides ignorés."""
+        assert tokeniser("L'Amour est ENFANT de Bohême !") == ["amour", "enfant", "boheme"]
+
+    def test_tokeniser_texte_vide(self):
+        assert tokeniser("") == []
+
+
+class TestBm25IndexService:
+    def test_rechercher_classe_par_pertinence(self, index):
+        """La chanson qui répète le terme le plus rare passe en premier."""
+        resultats = index.rechercher("amour", 3)
+
+        assert [id_chanson for id_chanson, _ in resultats] == [1]
+        assert resultats[0][1] > 0
+
+    def test_rechercher_plusieurs_termes(self, index):
+        """Une chanson contenant plusieurs termes de la requête est mieux classée."""
+        resultats = index.rechercher("pluie nuit", 4)
+
+        assert [id_chanson for id_chanson, _ in resultats] == [2, 4]
+        assert resultats[0][1] > resultats[1][1]
+
+    def test_rechercher_sans_accents(self, index):
+        """Les accents de la requête n'ont pas d'importance."""
+        assert index.rechercher("coeur", 1)[0][0] == 4
+
+    def test_rechercher_terme_inconnu(self, index):
+        assert index.rechercher("guitare", 5) == []
+
+    def test_ajouter_et_supprimer(self, index):
+        """Les ajouts et suppressions sont visibles sans reconstruire l'index."""
+        index.ajouter(9, "Tender is the night")
+        index.supprimer(3)
+
+        assert [id_chanson for id_chanson, _ in index.rechercher("tender", 5)] == [9]
+        assert not index.contient(3)
+        assert "sweet" not in index.postings
+        assert 3 not in index.termes
+        assert index.signature() == (4, 9)
+
+    def test_ajouter_remplace_les_paroles(self, index):
+        """Réindexer une chanson remplace ses anciens termes."""
+        index.ajouter(1, "Une chanson sur la mer")
+
+        assert index.rechercher("amour", 5) == []
+        assert index.rechercher("mer", 5)[0][0] == 1
+        assert len(index) == 4
+
+    def test_rechercher_index_vide(self):
+        assert Bm25IndexService().rechercher("amour", 3) == []
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from service.embedding_backend import HttpEmbeddingBackend, LocalEmbeddingBackend
+from service.request_embedding_service import CacheMotsCles, RequestEmbeddingService
+from utils.singleton import Singleton
+
+
+class ModeleLocal:
+    """Modèle local simulé : un vecteur par texte, calculé sans réseau."""
+
+    def __init__(self):
+        self.appels = []
+
+    def encode(self, textes, convert_to_numpy=True):
+        self.appels.append(list(textes))
+        return np.array([[float(len(texte)), 1.0] for texte in textes], dtype=np.float32)
+
+
+@pytest.fixture(autouse=True)
+def reset_cache():
+    Singleton._instances.pop(CacheMotsCles, None)
+    yield
+    Singleton._instances.pop(CacheMotsCles, None)
+
+
+class TestEmbeddingBackend:
+    def test_backend_http_par_defaut(self, monkeypatch):
+        """Sans configuration, les embeddings sont demandés à l'API Ollama."""
+        # GIVEN
+        monkeypatch.delenv("EMBED_BACKEND", raising=False)
+        monkeypatch.setenv("EMBED_MODELE", "bge-m3")
+
+        # WHEN
+        service = RequestEmbeddingService()
+
+        # THEN
+        assert isinstance(service.backend, HttpEmbeddingBackend)
+        assert service.model == "bge-m3"
+
+    def test_backend_local(self, monkeypatch):
+        """Avec EMBED_BACKEND=local, le modèle local vectorise sans appel réseau."""
+        # GIVEN
+        monkeypatch.setenv("EMBED_BACKEND", "local")
+        monkeypatch.setenv("EMBED_MODELE_LOCAL", "models/bge-m3")
+        modele = ModeleLocal()
+        monkeypatch.setattr(LocalEmbeddingBackend, "_charger_modele", lambda self: modele)
+
+        def mock_post(*args, **kwargs):
+            raise AssertionError("aucun appel réseau attendu")
+
+        monkeypatch.setattr("requests.Session.post", mock_post)
+
+        # WHEN
+        service = RequestEmbeddingService()
+        vecteurs = service.vectorise_many(["amour", "pluie"])
+
+        # THEN
+        assert isinstance(service.backend, LocalEmbeddingBackend)
+        assert service.model == "local:models/bge-m3"
+        assert vecteurs == [[5.0, 1.0], [5.0, 1.0]]
+        assert modele.appels == [["amour", "pluie"]]
+        assert all(isinstance(x, float) for x in vecteurs[0])
+
+    def test_backend_local_sans_modele(self, monkeypatch):
+        """Le backend local exige le dossier du modèle."""
+        # GIVEN
+        monkeypatch.setenv("EMBED_BACKEND", "local")
+        monkeypatch.setenv("EMBED_MODELE_LOCAL", "")
+
+        # WHEN / THEN
+        with pytest.raises(ValueError):
+            RequestEmbeddingService()
@@ -0,0 +1,126 @@
+import numpy as np
+import pytest
+
+from service.exact_index_service import ExactIndexService
+
+
+class TestExactIndexService:
+    """Tests pour ExactIndexService."""
+
+    @pytest.fixture
+    def index(self):
+        """Fixture pour créer un index de trois vecteurs."""
+        index = ExactIndexService()
+        index.construire([10, 20, 30], [[1.0, 0.0], [0.0, 2.0], [3.0, 3.0]])
+        return index
+
+    def test_construire_matrice_float32_normalisee(self, index):
+        """La matrice doit être contiguë, en float32 et de lignes unitaires."""
+        assert index.matrice.dtype == np.float32
+        assert index.matrice.flags["C_CONTIGUOUS"]
+        assert np.allclose(np.linalg.norm(index.matrice, axis=1), 1.0)
+
+    def test_rechercher_ordre_decroissant(self, index):
+        """Les résultats sont triés par similarité décroissante."""
+        resultats = index.rechercher([1.0, 0.1], 3)
+
+        assert [id_chanson for id_chanson, _ in resultats] == [10, 30, 20]
+        scores = [score for _, score in resultats]
+        assert scores == sorted(scores, reverse=True)
+
+    def test_rechercher_k_inferieur_au_catalogue(self, index):
+        """Seuls les k meilleurs résultats sont retournés."""
+        resultats = index.rechercher([0.0, 1.0], 1)
+
+        assert len(resultats) == 1
+        assert resultats[0][0] == 20
+        assert resultats[0][1] == pytest.approx(1.0)
+
+    def test_rechercher_k_superieur_au_catalogue(self, index):
+        """Si k dépasse la taille du catalogue, toutes les chansons sont retournées."""
+        resultats = index.rechercher([1.0, 1.0], 5)
+
+        assert len(resultats) == 3
+        assert resultats[0][0] == 30
+
+    def test_rechercher_index_vide(self):
+        """Un index vide ne retourne aucun résultat."""
+        index = ExactIndexService()
+
+        assert index.rechercher([1.0, 0.0], 3) == []
+
+    def test_scores_identiques_a_compare(self, index):
+        """Les scores correspondent à la similarité cosinus."""
+        vecteur = np.array([0.3, 0.7])
+        attendu = np.array([[1.0, 0.0], [0.0, 2.0], [3.0, 3.0]]) @ vecteur
+        attendu /= np.linalg.norm([[1.0, 0.0], [0.0, 2.0], [3.0, 3.0]], axis=1)
+        attendu /= np.linalg.norm(vecteur)
+
+        assert np.allclose(index.scores(vecteur), attendu, atol=1e-6)
+
+    def test_construire_avec_normes_enregistrees(self):
+        """Les normes lues en BD sont utilisées à la place d'un recalcul."""
+        index = ExactIndexService()
+        index.construire([1, 2], [[3.0, 4.0], [0.0, 2.0]], normes=[5.0, 2.0])
+
+        assert np.allclose(index.matrice, [[0.6, 0.8], [0.0, 1.0]])
+        assert index.rechercher([0.0, 1.0], 1)[0][0] == 2
+
+    def test_ajouter_sans_reconstruire(self, index):
+        """Une chanson ajoutée est trouvée sans reconstruire la matrice."""
+        index.ajouter(40, [0.0, -3.0], norme=3.0)
+
+        assert len(index) == 4
+        assert index.rechercher([0.0, -1.0], 1) == [(40, pytest.approx(1.0))]
+
+    def test_ajouter_apres_memmap(self, index, tmp_path):
+        """Une matrice en lecture seule (memmap) est recopiée au premier ajout."""
+        chemin = tmp_path / "matrice.npy"
+        np.save(chemin, index.matrice)
+        ouvert = ExactIndexService.depuis_matrice(index.ids, np.load(chemin, mmap_mode="r"))
+
+        ouvert.ajouter(40, [0.0, -1.0])
+
+        assert [id_chanson for id_chanson, _ in ouvert.rechercher([0.0, -1.0], 4)][0] == 40
+
+    def test_supprimer_filtre_les_resultats(self, index):
+        """Une chanson supprimée n'est plus retournée, sans réduire le nombre de résultats."""
+        index.supprimer(10)
+
+        resultats = index.rechercher([1.0, 0.1], 2)
+
+        assert [id_chanson for id_chanson, _ in resultats] == [30, 20]
+        assert len(index) == 2
+        assert index.signature() == (2, 30)
+
+    def test_supprimer_k_superieur_au_catalogue(self, index):
+        """Les chansons supprimées ne complètent pas les résultats quand k dépasse le catalogue."""
+        index.supprimer(10)
+        index.supprimer(30)
+
+        assert [id_chanson for id_chanson, _ in index.rechercher([1.0, 0.1], 3)] == [20]
+        assert [
+            [id_chanson for id_chanson, _ in r] for r in index.rechercher_lot([[1.0, 0.1]], 3)
+        ] == [[20]]
+
+    def test_compacte(self, index):
+        """La compaction retire les lignes supprimées et ne modifie pas l'index d'origine."""
+        index.supprimer(20)
+
+        compacte = index.compacte(index.etat())
+
+        assert compacte.ids.tolist() == [10, 30]
+        assert compacte.supprimes == set()
+        assert len(index.ids) == 3
+
+    def test_rechercher_lot_identique_a_rechercher(self, index):
+        """Le produit matrice-matrice donne les mêmes résultats qu'une recherche par vecteur."""
+        requetes = [[1.0, 0.1], [0.0, 1.0], [-1.0, 1.0]]
+        index.supprimer(30)
+
+        resultats = index.rechercher_lot(requetes, 2)
+
+        for requete, resultat in zip(requetes, resultats):
+            attendu = index.rechercher(requete, 2)
+            assert [r[0] for r in resultat] == [r[0] for r in attendu]
+            assert [r[1] for r in resultat] == pytest.approx([r[1] for r in attendu])
@@ -0,0 +1,84 @@
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from service.exact_index_service import ExactIndexService
+from service.flux_index_service import FluxIndexService
+
+
+@pytest.fixture
+def vecteurs():
+    """Fixture : 1000 vecteurs aléatoires de dimension 32."""
+    return np.random.default_rng(0).standard_normal((1000, 32)).astype(np.float32)
+
+
+def blocs(vecteurs, itersize):
+    """Simule le parcours de la BD par blocs de itersize chansons (ids 1 à n)."""
+    for debut in range(0, len(vecteurs), itersize):
+        bloc = vecteurs[debut : debut + itersize]
+        ids = list(range(debut + 1, debut + 1 + len(bloc)))
+        yield ids, bloc, list(np.linalg.norm(bloc, axis=1))
+
+
+@patch("service.flux_index_service.DAO_paroles")
+class TestFluxIndexService:
+    def test_resultats_identiques_a_l_index_exact(self, MockDAO, vecteurs):
+        """Le parcours par blocs avec un tas borné donne les mêmes résultats que l'index exact."""
+        # GIVEN
+        MockDAO.return_value.iter_embeddings.side_effect = lambda n: blocs(vecteurs, n)
+        exact = ExactIndexService()
+        exact.construire(range(1, 1001), vecteurs)
+        index = FluxIndexService(itersize=64, signature=(1000, 1000))
+
+        # WHEN
+        resultats = index.rechercher(vecteurs[10], 7)
+
+        # THEN
+        attendus = exact.rechercher(vecteurs[10], 7)
+        assert [i for i, _ in resultats] == [i for i, _ in attendus]
+        assert [s for _, s in resultats] == pytest.approx([s for _, s in attendus], abs=1e-5)
+        MockDAO.return_value.iter_embeddings.assert_called_once_with(64)
+
+    def test_rechercher_lot_un_seul_parcours(self, MockDAO, vecteurs):
+        """Plusieurs vecteurs sont scorés en un seul parcours du catalogue."""
+        # GIVEN
+        MockDAO.return_value.iter_embeddings.side_effect = lambda n: blocs(vecteurs, n)
+        exact = ExactIndexService()
+        exact.construire(range(1, 1001), vecteurs)
+        index = FluxIndexService(itersize=100)
+
+        # WHEN
+        lot = index.rechercher_lot(vecteurs[:3], 4)
+
+        # THEN
+        assert [[i for i, _ in r] for r in lot] == [
+            [i for i, _ in exact.rechercher(v, 4)] for v in vecteurs[:3]
+        ]
+        MockDAO.return_value.iter_embeddings.assert_called_once()
+
+    def test_normes_inconnues_recalculees(self, MockDAO):
+        """Un bloc dont une norme manque est normalisé à partir des vecteurs."""
+        # GIVEN
+        MockDAO.return_value.iter_embeddings.return_value = iter(
+            [([1, 2], [[2.0, 0.0], [0.0, 3.0]], [2.0, None])]
+        )
+
+        # WHEN
+        resultats = FluxIndexService().rechercher([0.0, 1.0], 1)
+
+        # THEN
+        assert resultats == [(2, pytest.approx(1.0))]
+
+    def test_signature_suit_les_ajouts(self, MockDAO):
+        """Un ajout met à jour la signature suivie sans rien lire en BD."""
+        # GIVEN
+        index = FluxIndexService(signature=(3, 3))
+
+        # WHEN
+        index.ajouter(7, [1.0, 0.0])
+
+        # THEN
+        assert index.signature() == (4, 7)
+        assert len(index) == 4
+        MockDAO.return_value.iter_embeddings.assert_not_called()
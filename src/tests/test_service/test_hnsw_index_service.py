@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from service.exact_index_service import ExactIndexService
+from service.hnsw_index_service import HnswIndexService
+
+
+class TestHnswIndexService:
+    """Tests pour HnswIndexService."""
+
+    @pytest.fixture
+    def vecteurs(self):
+        """Fixture : 600 vecteurs aléatoires de dimension 16."""
+        return np.random.default_rng(0).standard_normal((600, 16)).astype(np.float32)
+
+    @pytest.fixture
+    def index(self, vecteurs):
+        """Fixture pour créer un index HNSW sur les vecteurs."""
+        index = HnswIndexService(M=8, ef_construction=100, ef_search=64, graine=1)
+        index.construire(range(100, 700), vecteurs)
+        return index
+
+    def test_rappel_par_rapport_a_l_index_exact(self, index, vecteurs):
+        """Les 10 plus proches voisins approximatifs recouvrent ceux de la recherche exacte."""
+        exact = ExactIndexService()
+        exact.construire(range(100, 700), vecteurs)
+        requetes = np.random.default_rng(1).standard_normal((20, 16))
+
+        rappels = []
+        for requete in requetes:
+            attendus = {id_chanson for id_chanson, _ in exact.rechercher(requete, 10)}
+            trouves = {id_chanson for id_chanson, _ in index.rechercher(requete, 10)}
+            rappels.append(len(attendus & trouves) / 10)
+
+        assert np.mean(rappels) >= 0.9
+
+    def test_rechercher_vecteur_indexe(self, index, vecteurs):
+        """Un vecteur présent dans l'index est son propre plus proche voisin."""
+        resultats = index.rechercher(vecteurs[42], 1)
+
+        assert resultats[0][0] == 142
+        assert resultats[0][1] == pytest.approx(1.0, abs=1e-5)
+
+    def test_rechercher_ordre_decroissant(self, index):
+        """Les résultats sont triés par similarité décroissante."""
+        scores = [score for _, score in index.rechercher(np.ones(16), 15)]
+
+        assert len(scores) == 15
+        assert scores == sorted(scores, reverse=True)
+
+    def test_degre_borne_par_M(self, index):
+        """Aucun nœud ne dépasse M voisins (2 * M sur la couche 0)."""
+        for couche, adjacence in enumerate(index._graphe):
+            m_max = index.M0 if couche == 0 else index.M
+            assert all(len(voisins) <= m_max for voisins in adjacence.values())
+
+    def test_rechercher_index_vide(self):
+        """Un index vide ne retourne aucun résultat."""
+        assert HnswIndexService().rechercher([1.0, 0.0], 3) == []
+
+    def test_M_invalide(self):
+        """M doit être au moins égal à 2."""
+        with pytest.raises(ValueError):
+            HnswIndexService(M=1)
+
+    def test_ajouter_et_supprimer(self, index, vecteurs):
+        """Un nœud ajouté est trouvé, un nœud supprimé ne l'est plus."""
+        nouveau = np.random.default_rng(2).standard_normal(16).astype(np.float32)
+
+        index.ajouter(1000, nouveau)
+        index.supprimer(100)
+
+        assert index.rechercher(nouveau, 1)[0][0] == 1000
+        assert 100 not in [id_chanson for id_chanson, _ in index.rechercher(vecteurs[0], 10)]
+        assert len(index) == 600
+
+    def test_supprimes_exclus_du_parcours(self, index, vecteurs):
+        """Malgré de nombreuses suppressions, k chansons non supprimées sont retournées."""
+        # GIVEN
+        for id_chanson in range(100, 400):
+            index.supprimer(id_chanson)
+
+        # WHEN
+        resultats = index.rechercher(vecteurs[0], 10)
+
+        # THEN
+        assert len(resultats) == 10
+        assert all(id_chanson >= 400 for id_chanson, _ in resultats)
+
+    def test_compacte(self, index):
+        """La compaction reconstruit un graphe sans les nœuds supprimés."""
+        for id_chanson in range(100, 150):
+            index.supprimer(id_chanson)
+
+        compacte = index.compacte(index.etat())
+
+        assert len(compacte) == 550
+        assert compacte.signature() == (550, 699)
@@ -0,0 +1,334 @@
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from service.exact_index_service import ExactIndexService
+from service.flux_index_service import FluxIndexService
+from service.hnsw_index_service import HnswIndexService
+from service.index_catalogue_service import IndexCatalogueService
+from service.ivf_index_service import IvfIndexService
+from service.pq_index_service import PqIndexService
+from service.projection_index_service import ProjectionIndexService
+from service.snapshot_service import SnapshotService
+from utils.evenements_catalogue import BusCatalogue, EvenementCatalogue
+from utils.singleton import Singleton
+
+EMBEDDINGS = ([1, 2, 3], [[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]], [1.0, 1.0, 2**0.5])
+
+
+@pytest.fixture(autouse=True)
+def nouvelle_instance(monkeypatch):
+    """Chaque test repart d'une nouvelle instance du singleton, sans instantané sur disque."""
+    monkeypatch.setenv("SNAPSHOT_DOSSIER", "")
+    Singleton._instances.pop(IndexCatalogueService, None)
+    yield
+    Singleton._instances.pop(IndexCatalogueService, None)
+
+
+@patch("service.index_catalogue_service.DAO_paroles")
+class TestIndexCatalogueService:
+    def test_index_exact_par_defaut(self, MockDAO, monkeypatch):
+        monkeypatch.delenv("PLAYLIST_INDEX", raising=False)
+        MockDAO.return_value.get_signature.return_value = (3, 3)
+        MockDAO.return_value.get_embeddings.return_value = EMBEDDINGS
+
+        index = IndexCatalogueService().get_index()
+
+        assert isinstance(index, ExactIndexService)
+        assert len(index) == 3
+
+    def test_index_reutilise_si_catalogue_inchange(self, MockDAO, monkeypatch):
+        monkeypatch.delenv("PLAYLIST_INDEX", raising=False)
+        MockDAO.return_value.get_signature.return_value = (3, 3)
+        MockDAO.return_value.get_embeddings.return_value = EMBEDDINGS
+
+        premier = IndexCatalogueService().get_index()
+        second = IndexCatalogueService().get_index()
+
+        assert premier is second
+        MockDAO.return_value.get_embeddings.assert_called_once()
+
+    def test_index_reconstruit_si_catalogue_modifie(self, MockDAO, monkeypatch):
+        monkeypatch.delenv("PLAYLIST_INDEX", raising=False)
+        MockDAO.return_value.get_signature.side_effect = [(3, 3), (2, 3)]
+        MockDAO.return_value.get_embeddings.return_value = EMBEDDINGS
+
+        IndexCatalogueService().get_index()
+        IndexCatalogueService().get_index()
+
+        assert MockDAO.return_value.get_embeddings.call_count == 2
+
+    def test_hnsw_au_dessus_du_seuil(self, MockDAO, monkeypatch):
+        monkeypatch.setenv("PLAYLIST_INDEX", "hnsw")
+        monkeypatch.setenv("INDEX_SEUIL_EXACT", "2")
+        MockDAO.return_value.get_signature.return_value = (3, 3)
+        MockDAO.return_value.get_embeddings.return_value = EMBEDDINGS
+
+        catalogue = IndexCatalogueService()
+        provisoire = catalogue.get_index()
+        catalogue._construction.join()
+        index = catalogue.get_index()
+
+        # l'index exact est servi pendant la construction du graphe en arrière-plan
+        assert isinstance(provisoire, ExactIndexService)
+        assert isinstance(index, HnswIndexService)
+        assert index.rechercher([0.0, 1.0], 1)[0][0] == 2
+        MockDAO.return_value.get_embeddings.assert_called_once()
+
+    def test_evenements_rejoues_apres_construction(self, MockDAO, monkeypatch):
+        monkeypatch.setenv("PLAYLIST_INDEX", "hnsw")
+        monkeypatch.setenv("INDEX_SEUIL_EXACT", "2")
+        MockDAO.return_value.get_signature.return_value = (3, 3)
+        MockDAO.return_value.get_embeddings.return_value = EMBEDDINGS
+        catalogue = IndexCatalogueService()
+        with catalogue._verrou:
+            catalogue.get_index()
+            # évènement reçu avant que le thread de construction n'installe l'index
+            BusCatalogue().publier(
+                EvenementCatalogue(EvenementCatalogue.AJOUT, 7, [0.0, -2.0], 2.0)
+            )
+
+        catalogue._construction.join()
+
+        assert isinstance(catalogue.index, HnswIndexService)
+        assert catalogue.index.rechercher([0.0, -1.0], 1)[0][0] == 7
+
+    def test_hnsw_sous_le_seuil_utilise_l_index_exact(self, MockDAO, monkeypatch):
+        monkeypatch.setenv("PLAYLIST_INDEX", "hnsw")
+        monkeypatch.setenv("INDEX_SEUIL_EXACT", "1000")
+        MockDAO.return_value.get_signature.return_value = (3, 3)
+        MockDAO.return_value.get_embeddings.return_value = EMBEDDINGS
+
+        index = IndexCatalogueService().get_index()
+
+        assert isinstance(index, ExactIndexService)
+
+    def test_catalogue_vide(self, MockDAO, monkeypatch):
+        monkeypatch.delenv("PLAYLIST_INDEX", raising=False)
+        MockDAO.return_value.get_signature.return_value = (0, None)
+        MockDAO.return_value.get_embeddings.return_value = None
+
+        index = IndexCatalogueService().get_index()
+
+        assert len(index) == 0
+
+    def test_mode_invalide(self, MockDAO, monkeypatch):
+        monkeypatch.setenv("PLAYLIST_INDEX", "inconnu")
+
+        with pytest.raises(ValueError):
+            IndexCatalogueService()
+
+    def test_ivf_au_dessus_du_seuil(self, MockDAO, monkeypatch, tmp_path):
+        monkeypatch.setenv("PLAYLIST_INDEX", "ivf")
+        monkeypatch.setenv("INDEX_SEUIL_EXACT", "2")
+        monkeypatch.setenv("IVF_FICHIER", str(tmp_path / "absent.npz"))
+        MockDAO.return_value.get_signature.return_value = (3, 3)
+        MockDAO.return_value.get_embeddings.return_value = EMBEDDINGS
+
+        catalogue = IndexCatalogueService()
+        provisoire = catalogue.get_index()
+        catalogue._construction.join()
+        index = catalogue.get_index()
+
+        assert isinstance(provisoire, ExactIndexService)
+        assert isinstance(index, IvfIndexService)
+        assert index.rechercher([1.0, 0.0], 1)[0][0] == 1
+
+    def test_reconstruire_ivf_puis_charger(self, MockDAO, monkeypatch, tmp_path):
+        monkeypatch.setenv("PLAYLIST_INDEX", "ivf")
+        monkeypatch.setenv("IVF_FICHIER", str(tmp_path / "index" / "ivf.npz"))
+        MockDAO.return_value.get_signature.return_value = (3, 3)
+        MockDAO.return_value.get_embeddings.return_value = EMBEDDINGS
+
+        IndexCatalogueService().reconstruire_ivf()
+        Singleton._instances.pop(IndexCatalogueService, None)
+        MockDAO.return_value.get_embeddings.reset_mock()
+        index = IndexCatalogueService().get_index()
+
+        # l'index est lu dans le fichier, sans relire les embeddings en BD
+        assert isinstance(index, IvfIndexService)
+        MockDAO.return_value.get_embeddings.assert_not_called()
+
+    def test_fichier_ivf_perime_ignore(self, MockDAO, monkeypatch, tmp_path):
+        monkeypatch.setenv("PLAYLIST_INDEX", "ivf")
+        monkeypatch.setenv("IVF_FICHIER", str(tmp_path / "ivf.npz"))
+        MockDAO.return_value.get_signature.return_value = (3, 3)
+        MockDAO.return_value.get_embeddings.return_value = EMBEDDINGS
+        IndexCatalogueService().reconstruire_ivf()
+
+        MockDAO.return_value.get_embeddings.reset_mock()
+        MockDAO.return_value.get_signature.return_value = (4, 5)
+        IndexCatalogueService().get_index()
+
+        MockDAO.return_value.get_embeddings.assert_called_once()
+
+    def test_fichier_ivf_autre_generation_ignore(self, MockDAO, monkeypatch, tmp_path):
+        """Après suppression et rechargement du catalogue, mêmes nombre et id mais autre génération."""
+        monkeypatch.setenv("PLAYLIST_INDEX", "ivf")
+        monkeypatch.setenv("IVF_FICHIER", str(tmp_path / "ivf.npz"))
+        MockDAO.return_value.get_signature.return_value = (3, 3, "g1")
+        MockDAO.return_value.get_embeddings.return_value = EMBEDDINGS
+        IndexCatalogueService().reconstruire_ivf()
+        Singleton._instances.pop(IndexCatalogueService, None)
+
+        MockDAO.return_value.get_embeddings.reset_mock()
+        MockDAO.return_value.get_signature.return_value = (3, 3, "g2")
+        IndexCatalogueService().get_index()
+
+        MockDAO.return_value.get_embeddings.assert_called_once()
+
+    def test_pq_reclasse_avec_la_bd(self, MockDAO, monkeypatch):
+        monkeypatch.setenv("PLAYLIST_INDEX", "pq")
+        monkeypatch.setenv("INDEX_SEUIL_EXACT", "2")
+        monkeypatch.setenv("PQ_NB_SOUS_ESPACES", "2")
+        MockDAO.return_value.get_signature.return_value = (3, 3)
+        MockDAO.return_value.get_embeddings.return_value = EMBEDDINGS
+        MockDAO.return_value.get_embeddings_from_ids.return_value = ([2], [[0.0, 1.0]], [1.0])
+
+        index = IndexCatalogueService().get_index()
+        resultats = index.rechercher([0.0, 1.0], 1)
+
+        assert isinstance(index, PqIndexService)
+        assert resultats[0][0] == 2
+        assert resultats[0][1] == pytest.approx(1.0)
+        MockDAO.return_value.get_embeddings_from_ids.assert_called_once()
+
+    def test_projection_apprise_hors_ligne_puis_chargee(self, MockDAO, monkeypatch, tmp_path):
+        monkeypatch.setenv("PLAYLIST_INDEX", "projection")
+        monkeypatch.setenv("INDEX_SEUIL_EXACT", "2")
+        monkeypatch.setenv("PROJECTION_DIMENSION", "1")
+        monkeypatch.setenv("PROJECTION_FICHIER", str(tmp_path / "projection.npz"))
+        MockDAO.return_value.get_signature.return_value = (3, 3)
+        MockDAO.return_value.get_embeddings.return_value = EMBEDDINGS
+        projection = IndexCatalogueService().reconstruire_projection().projection
+
+        index = IndexCatalogueService().get_index()
+
+        assert isinstance(index, ProjectionIndexService)
+        np.testing.assert_array_equal(index.projection, projection)
+        assert index.rechercher([0.0, 1.0], 1)[0][0] == 2
+
+    def test_projection_depuis_le_snapshot(self, MockDAO, monkeypatch, tmp_path):
+        monkeypatch.setenv("PLAYLIST_INDEX", "projection")
+        monkeypatch.setenv("INDEX_SEUIL_EXACT", "2")
+        monkeypatch.setenv("SNAPSHOT_DOSSIER", str(tmp_path))
+        monkeypatch.setenv("PROJECTION_FICHIER", str(tmp_path / "absent.npz"))
+        SnapshotService(str(tmp_path)).ecrire(*EMBEDDINGS, (3, 3))
+
+        index = IndexCatalogueService().construire_index((3, 3))
+
+        assert isinstance(index, ProjectionIndexService)
+        assert isinstance(index.matrice, np.memmap)
+        assert index.rechercher([1.0, 0.0], 1)[0][0] == 1
+        MockDAO.return_value.get_embeddings.assert_not_called()
+
+    def test_flux_ne_charge_pas_le_catalogue(self, MockDAO, monkeypatch):
+        monkeypatch.setenv("PLAYLIST_INDEX", "flux")
+        monkeypatch.setenv("FLUX_ITERSIZE", "500")
+        MockDAO.return_value.get_signature.return_value = (3, 3)
+
+        index = IndexCatalogueService().get_index()
+
+        assert isinstance(index, FluxIndexService)
+        assert index.itersize == 500
+        assert len(index) == 3
+        MockDAO.return_value.get_embeddings.assert_not_called()
+
+    def test_snapshot_ecrit_puis_ouvert_en_memmap(self, MockDAO, monkeypatch, tmp_path):
+        monkeypatch.delenv("PLAYLIST_INDEX", raising=False)
+        monkeypatch.setenv("SNAPSHOT_DOSSIER", str(tmp_path))
+        MockDAO.return_value.get_signature.return_value = (3, 3)
+        MockDAO.return_value.get_embeddings.return_value = EMBEDDINGS
+
+        catalogue = IndexCatalogueService()
+        premier = catalogue.construire_index((3, 3))
+        catalogue._ecriture_snapshot.join()
+        second = catalogue.construire_index((3, 3))
+
+        # la première requête est servie depuis la BD, sans attendre l'écriture
+        assert not isinstance(premier.matrice, np.memmap)
+        assert isinstance(second, ExactIndexService)
+        assert isinstance(second.matrice, np.memmap)
+        assert second.rechercher([1.0, 0.0], 1)[0][0] == 1
+        assert premier.rechercher([0.0, 1.0], 1) == second.rechercher([0.0, 1.0], 1)
+        MockDAO.return_value.get_embeddings.assert_called_once()
+
+    def test_snapshot_perime_reecrit(self, MockDAO, monkeypatch, tmp_path):
+        monkeypatch.delenv("PLAYLIST_INDEX", raising=False)
+        monkeypatch.setenv("SNAPSHOT_DOSSIER", str(tmp_path))
+        MockDAO.return_value.get_embeddings.return_value = EMBEDDINGS
+        catalogue = IndexCatalogueService()
+        catalogue.construire_index((3, 3))
+        catalogue._ecriture_snapshot.join()
+
+        index = catalogue.construire_index((4, 4))
+        catalogue._ecriture_snapshot.join()
+
+        assert MockDAO.return_value.get_embeddings.call_count == 2
+        assert SnapshotService(str(tmp_path)).lire_manifest()["signature"] == [4, 4]
+        assert len(index) == 3
+
+    def test_hnsw_construit_depuis_le_snapshot(self, MockDAO, monkeypatch, tmp_path):
+        monkeypatch.setenv("PLAYLIST_INDEX", "hnsw")
+        monkeypatch.setenv("INDEX_SEUIL_EXACT", "2")
+        monkeypatch.setenv("SNAPSHOT_DOSSIER", str(tmp_path))
+        MockDAO.return_value.get_embeddings.return_value = EMBEDDINGS
+        SnapshotService(str(tmp_path)).ecrire(*EMBEDDINGS, (3, 3))
+
+        index = IndexCatalogueService().construire_index((3, 3))
+
+        assert isinstance(index, HnswIndexService)
+        assert index.rechercher([0.0, 1.0], 1)[0][0] == 2
+        MockDAO.return_value.get_embeddings.assert_not_called()
+
+    def test_ajout_applique_sans_reconstruction(self, MockDAO, monkeypatch):
+        monkeypatch.delenv("PLAYLIST_INDEX", raising=False)
+        MockDAO.return_value.get_signature.side_effect = [(3, 3), (4, 7)]
+        MockDAO.return_value.get_embeddings.return_value = EMBEDDINGS
+        IndexCatalogueService().get_index()
+
+        BusCatalogue().publier(EvenementCatalogue(EvenementCatalogue.AJOUT, 7, [0.0, -2.0], 2.0))
+        index = IndexCatalogueService().get_index()
+
+        MockDAO.return_value.get_embeddings.assert_called_once()
+        assert len(index) == 4
+        assert index.rechercher([0.0, -1.0], 1)[0][0] == 7
+
+    def test_suppression_applique_sans_reconstruction(self, MockDAO, monkeypatch):
+        monkeypatch.delenv("PLAYLIST_INDEX", raising=False)
+        monkeypatch.setenv("INDEX_SEUIL_COMPACTION", "0.5")
+        MockDAO.return_value.get_signature.side_effect = [(3, 3), (2, 2)]
+        MockDAO.return_value.get_embeddings.return_value = EMBEDDINGS
+        IndexCatalogueService().get_index()
+
+        BusCatalogue().publier(EvenementCatalogue(EvenementCatalogue.SUPPRESSION, 3))
+        index = IndexCatalogueService().get_index()
+
+        MockDAO.return_value.get_embeddings.assert_called_once()
+        assert [id_chanson for id_chanson, _ in index.rechercher([1.0, 1.0], 3)] == [1, 2]
+
+    def test_compaction_en_arriere_plan(self, MockDAO, monkeypatch):
+        monkeypatch.delenv("PLAYLIST_INDEX", raising=False)
+        monkeypatch.setenv("INDEX_SEUIL_COMPACTION", "0.3")
+        MockDAO.return_value.get_signature.return_value = (3, 3)
+        MockDAO.return_value.get_embeddings.return_value = EMBEDDINGS
+        catalogue = IndexCatalogueService()
+        avant = catalogue.get_index()
+
+        BusCatalogue().publier(EvenementCatalogue(EvenementCatalogue.SUPPRESSION, 1))
+        catalogue._compaction.join()
+
+        assert catalogue.index is not avant
+        assert catalogue.index.ids.tolist() == [2, 3]
+        assert catalogue.signature == (2, 3)
+
+    def test_vidage_reinitialise_l_index(self, MockDAO, monkeypatch):
+        monkeypatch.delenv("PLAYLIST_INDEX", raising=False)
+        MockDAO.return_value.get_signature.return_value = (3, 3)
+        MockDAO.return_value.get_embeddings.return_value = EMBEDDINGS
+        IndexCatalogueService().get_index()
+
+        BusCatalogue().publier(EvenementCatalogue(EvenementCatalogue.VIDAGE))
+
+        assert IndexCatalogueService().index is None
@@ -0,0 +1,65 @@
+from unittest.mock import patch
+
+import pytest
+
+from service.index_lexical_service import IndexLexicalService
+from utils.evenements_catalogue import BusCatalogue, EvenementCatalogue
+from utils.singleton import Singleton
+
+TEXTES = ([1, 2, 3], ["amour toujours", "pluie nuit", "soleil plage"])
+
+
+@pytest.fixture(autouse=True)
+def nouvelle_instance():
+    """Chaque test repart d'une nouvelle instance du singleton."""
+    Singleton._instances.pop(IndexLexicalService, None)
+    yield
+    Singleton._instances.pop(IndexLexicalService, None)
+
+
+@patch("service.index_lexical_service.DAO_paroles")
+class TestIndexLexicalService:
+    def test_index_reutilise_si_catalogue_inchange(self, MockDAO):
+        MockDAO.return_value.get_signature.return_value = (3, 3, "g1")
+        MockDAO.return_value.get_textes.return_value = TEXTES
+
+        resultats = IndexLexicalService().rechercher("pluie", 5)
+        IndexLexicalService().rechercher("soleil", 5)
+
+        assert [id_chanson for id_chanson, _ in resultats] == [2]
+        MockDAO.return_value.get_textes.assert_called_once()
+
+    def test_index_reconstruit_si_catalogue_recharge(self, MockDAO):
+        """Un autre processus a vidé puis rechargé le catalogue : même taille, autre génération."""
+        MockDAO.return_value.get_signature.side_effect = [(3, 3, "g1"), (3, 3, "g2")]
+        MockDAO.return_value.get_textes.return_value = TEXTES
+
+        IndexLexicalService().get_index()
+        IndexLexicalService().get_index()
+
+        assert MockDAO.return_value.get_textes.call_count == 2
+
+    def test_ajout_et_suppression_sans_reconstruction(self, MockDAO):
+        """Les chansons ajoutées ou supprimées par le processus sont appliquées sur place."""
+        MockDAO.return_value.get_signature.side_effect = [(3, 3, "g1"), (3, 7, "g1")]
+        MockDAO.return_value.get_textes.return_value = TEXTES
+        IndexLexicalService().get_index()
+
+        BusCatalogue().publier(
+            EvenementCatalogue(EvenementCatalogue.AJOUT, 7, paroles="pluie d'été")
+        )
+        BusCatalogue().publier(EvenementCatalogue(EvenementCatalogue.SUPPRESSION, 2))
+        resultats = IndexLexicalService().rechercher("pluie", 5)
+
+        MockDAO.return_value.get_textes.assert_called_once()
+        assert [id_chanson for id_chanson, _ in resultats] == [7]
+
+    def test_vidage_reinitialise_l_index(self, MockDAO):
+        MockDAO.return_value.get_signature.return_value = (3, 3, "g1")
+        MockDAO.return_value.get_textes.return_value = TEXTES
+        IndexLexicalService().get_index()
+
+        BusCatalogue().publier(EvenementCatalogue(EvenementCatalogue.VIDAGE))
+        IndexLexicalService().get_index()
+
+        assert MockDAO.return_value.get_textes.call_count == 2
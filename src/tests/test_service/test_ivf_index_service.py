@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from service.exact_index_service import ExactIndexService
+from service.ivf_index_service import IvfIndexService
+
+
+class TestIvfIndexService:
+    """Tests pour IvfIndexService."""
+
+    @pytest.fixture
+    def vecteurs(self):
+        """Fixture : 2000 vecteurs regroupés autour de 20 thèmes."""
+        generateur = np.random.default_rng(0)
+        themes = generateur.standard_normal((20, 32))
+        bruit = 0.3 * generateur.standard_normal((2000, 32))
+        return (themes[generateur.integers(0, 20, 2000)] + bruit).astype(np.float32)
+
+    @pytest.fixture
+    def index(self, vecteurs):
+        """Fixture pour créer un index IVF de 40 clusters."""
+        index = IvfIndexService(nlist=40, nprobe=6, graine=0)
+        index.construire(range(2000), vecteurs)
+        return index
+
+    def test_listes_couvrent_tout_le_catalogue(self, index):
+        """Chaque chanson appartient à exactement une liste."""
+        assert index._debuts[-1] == 2000
+        assert sorted(index.ids.tolist()) == list(range(2000))
+        assert index.centroides.shape == (40, 32)
+
+    def test_rappel_par_rapport_a_l_index_exact(self, index, vecteurs):
+        """Avec nprobe clusters, on retrouve la quasi-totalité des vrais voisins."""
+        exact = ExactIndexService()
+        exact.construire(range(2000), vecteurs)
+
+        rappels = []
+        for requete in vecteurs[:20] + 0.05:
+            attendus = {id_chanson for id_chanson, _ in exact.rechercher(requete, 10)}
+            trouves = {id_chanson for id_chanson, _ in index.rechercher(requete, 10)}
+            rappels.append(len(attendus & trouves) / 10)
+
+        assert np.mean(rappels) >= 0.9
+
+    def test_nprobe_egal_nlist_est_exact(self, index, vecteurs):
+        """Parcourir tous les clusters revient à une recherche exacte."""
+        exact = ExactIndexService()
+        exact.construire(range(2000), vecteurs)
+        index.nprobe = 40
+
+        requete = np.ones(32)
+        assert [i for i, _ in index.rechercher(requete, 5)] == [
+            i for i, _ in exact.rechercher(requete, 5)
+        ]
+
+    def test_sauvegarder_puis_charger(self, index, tmp_path):
+        """Un index rechargé donne les mêmes résultats et sa signature."""
+        chemin = str(tmp_path / "index_ivf.npz")
+        index.sauvegarder(chemin, (2000, 2000))
+
+        recharge, signature = IvfIndexService.charger(chemin)
+
+        assert signature == (2000, 2000)
+        assert recharge.nprobe == 6
+        requete = np.ones(32)
+        assert recharge.rechercher(requete, 5) == index.rechercher(requete, 5)
+
+    def test_sauvegarder_avec_generation(self, index, tmp_path):
+        """La génération du catalogue est enregistrée avec la signature."""
+        chemin = str(tmp_path / "index_ivf.npz")
+        index.sauvegarder(chemin, (2000, 2000, "g1"))
+
+        _, signature = IvfIndexService.charger(chemin)
+
+        assert signature == (2000, 2000, "g1")
+
+    def test_rechercher_index_vide(self):
+        """Un index vide ne retourne aucun résultat."""
+        assert IvfIndexService().rechercher([1.0, 0.0], 3) == []
+
+    def test_ajouter_en_debordement(self, index, vecteurs):
+        """Un vecteur ajouté est trouvé dans la liste de débordement de son cluster."""
+        index.ajouter(5000, vecteurs[7] * 2)
+
+        assert len(index) == 2001
+        assert 5000 in [id_chanson for id_chanson, _ in index.rechercher(vecteurs[7], 2)]
+
+    def test_compacte_fusionne_ajouts_et_suppressions(self, index, vecteurs):
+        """La compaction range les ajouts dans les listes contiguës et retire les suppressions."""
+        index.ajouter(5000, vecteurs[7])
+        index.supprimer(7)
+
+        compacte = index.compacte(index.etat())
+
+        assert compacte._debuts[-1] == 2000
+        assert compacte._nb_ajouts == 0
+        assert 7 not in compacte.ids.tolist()
+        assert compacte.rechercher(vecteurs[7], 1)[0][0] == 5000
@@ -1,6 +1,31 @@
+import json
+
 import pytest
 
-from service.paroles_embedding_service import ParolesEmbeddingService
+from service.paroles_embedding_service import CacheParoles, ParolesEmbeddingService
+from utils.session_http import SessionHttp
+from utils.singleton import Singleton
+
+
+@pytest.fixture(autouse=True)
+def cache_temporaire(monkeypatch, tmp_path):
+    """Chaque test utilise son propre fichier de cache."""
+    monkeypatch.setenv("EMBED_CACHE_PAROLES", str(tmp_path / "cache.sqlite"))
+    Singleton._instances.pop(CacheParoles, None)
+    yield
+    Singleton._instances.pop(CacheParoles, None)
+
+
+class ReponseApi:
+    """Réponse simulée de l'API d'embedding : un vecteur par texte envoyé."""
+
+    status_code = 200
+
+    def __init__(self, data):
+        self.textes = data["input"] if isinstance(data["input"], list) else [data["input"]]
+
+    def json(self):
+        return {"embeddings": [[float(len(texte)), 0.5] for texte in self.textes]}
 
 
 class TestParolesEmbeddingService:
@@ -72,3 +97,109 @@ class TestParolesEmbeddingService:
         assert len(vecteur) == 1024, "La dimension devrait être 1024"
 
         print(f"\n✓ Caractères spéciaux gérés: {paroles}")
+
+    def test_vectorise_cache_persistant(self, service, monkeypatch):
+        """Des paroles déjà vectorisées sont relues dans le cache, même après redémarrage."""
+        appels = []
+
+        def mock_post(url, headers=None, data=None):
+            appels.append(json.loads(data))
+            return ReponseApi(appels[-1])
+
+        monkeypatch.setattr(SessionHttp(), "post", mock_post)
+        premier = service.vectorise("la la la")
+        # Nouveau processus simulé : le singleton est recréé sur le même fichier
+        Singleton._instances.pop(CacheParoles, None)
+
+        second = ParolesEmbeddingService().vectorise("la la la")
+
+        assert premier == second == [8.0, 0.5]
+        assert len(appels) == 1
+        assert len(CacheParoles()) == 1
+
+    def test_vectorise_many_seulement_les_absentes(self, service, monkeypatch):
+        """Seules les paroles absentes du cache sont envoyées à l'API."""
+        appels = []
+
+        def mock_post(url, headers=None, data=None):
+            appels.append(json.loads(data))
+            return ReponseApi(appels[-1])
+
+        monkeypatch.setattr(SessionHttp(), "post", mock_post)
+        service.vectorise("refrain")
+
+        vecteurs = service.vectorise_many(["refrain", "couplet un", "pont"])
+
+        assert vecteurs == [[7.0, 0.5], [10.0, 0.5], [4.0, 0.5]]
+        assert appels[-1]["input"] == ["couplet un", "pont"]
+
+    def test_cache_par_modele(self, service, monkeypatch):
+        """Un autre modèle ne réutilise pas les embeddings du premier."""
+        appels = []
+
+        def mock_post(url, headers=None, data=None):
+            appels.append(json.loads(data))
+            return ReponseApi(appels[-1])
+
+        monkeypatch.setattr(SessionHttp(), "post", mock_post)
+        service.vectorise("refrain")
+        autre = ParolesEmbeddingService()
+        autre.model = "autre-modele"
+
+        autre.vectorise("refrain")
+
+        assert len(appels) == 2
+
+    def test_vectorise_many_par_lots(self, service, monkeypatch):
+        """Les textes sont envoyés par lots de batch_size et les résultats gardent l'ordre."""
+        appels = []
+
+        def mock_post(url, headers=None, data=None):
+            appels.append(json.loads(data))
+            return ReponseApi(appels[-1])
+
+        monkeypatch.setattr(SessionHttp(), "post", mock_post)
+        textes = ["a", "bb", "ccc", "dddd", "eeeee"]
+
+        vecteurs = service.vectorise_many(textes, batch_size=2)
+
+        assert vecteurs == [[float(len(texte)), 0.5] for texte in textes]
+        assert [appel["input"] for appel in appels] == [["a", "bb"], ["ccc", "dddd"], ["eeeee"]]
+
+    def test_vectorise_many_budget_tokens(self, service, monkeypatch):
+        """Un lot ne dépasse pas le budget de tokens, un texte trop long est envoyé seul."""
+        appels = []
+
+        def mock_post(url, headers=None, data=None):
+            appels.append(json.loads(data))
+            return ReponseApi(appels[-1])
+
+        monkeypatch.setattr(SessionHttp(), "post", mock_post)
+        service.tokens_lot = 10
+        long = "x" * 100
+
+        service.vectorise_many(["un", "deux", long, "trois"], batch_size=8)
+
+        assert [appel["input"] for appel in appels] == [["un", "deux"], [long], ["trois"]]
+
+    def test_vectorise_many_reessai_individuel(self, service, monkeypatch):
+        """Si un lot échoue, ses textes sont renvoyés un par un : seul le texte fautif est perdu."""
+        appels = []
+
+        def mock_post(url, headers=None, data=None):
+            appels.append(json.loads(data))
+            if "erreur" in appels[-1]["input"]:
+                raise ConnectionError("texte refusé")
+            return ReponseApi(appels[-1])
+
+        monkeypatch.setattr(SessionHttp(), "post", mock_post)
+
+        vecteurs = service.vectorise_many(["refrain", "erreur", "pont"])
+
+        assert vecteurs == [[7.0, 0.5], None, [4.0, 0.5]]
+        assert [appel["input"] for appel in appels] == [
+            ["refrain", "erreur", "pont"],
+            "refrain",
+            "erreur",
+            "pont",
+        ]
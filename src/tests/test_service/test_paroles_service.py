@@ -6,6 +6,7 @@ import requests
 from business_object.chanson import Chanson
 from business_object.paroles import Paroles
 from service.paroles_service import ParolesService
+from utils.session_http import SessionHttp
 
 # --- Fichier de test (test_paroles_service.py) ---
 
@@ -55,7 +56,7 @@ class TestParolesService:
             )
             return mock_resp
 
-        monkeypatch.setattr("requests.get", mock_request_error)
+        monkeypatch.setattr(SessionHttp(), "get", mock_request_error)
 
         # Le print() du service est testé en vérifiant que le retour est None
         paroles = service.add_from_API(chanson_correcte)
@@ -70,10 +71,28 @@ class TestParolesService:
         def mock_connection_error(*args, **kwargs):
             raise requests.exceptions.ConnectionError("Simulated connection timeout")
 
-        monkeypatch.setattr("requests.get", mock_connection_error)
+        monkeypatch.setattr(SessionHttp(), "get", mock_connection_error)
 
         # Le print() du service est testé en vérifiant que le retour est None
         paroles = service.add_from_API(chanson_correcte)
 
         assert paroles is None
         print("\n✓ Erreur de connexion (requests.exceptions.ConnectionError) gérée.")
+
+    def test_add_from_api_session_partagee(self, monkeypatch, service, chanson_correcte):
+        """Les appels passent par la session partagée, avec 20 s au plus pour la réponse."""
+        appels = []
+
+        def mock_get(url, **kwargs):
+            appels.append(kwargs)
+            return Mock(json=Mock(return_value={"plainLyrics": "Imagine all the people"}))
+
+        monkeypatch.setattr(SessionHttp().session, "get", mock_get)
+
+        paroles = service.add_from_API(chanson_correcte)
+        service.add_from_API(chanson_correcte)
+
+        assert paroles.content == "Imagine all the people"
+        assert len(appels) == 2
+        assert appels[0]["timeout"] == (SessionHttp().timeout[0], 20)
+        assert SessionHttp() is SessionHttp()
@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 import pytest
 
 from business_object.chanson import Chanson
@@ -82,6 +84,129 @@ class TestPlaylistService:
         assert chanson_c in playlist.chansons
         print("\n✓ Instanciation de playlist réussie.")
 
+    @patch("service.playlist_service.DAO_chanson")
+    @patch("service.playlist_service.RequestEmbeddingService")
+    @patch("service.playlist_service.IndexCatalogueService")
+    def test_instantiate_playlists_lot(self, MockIndex, MockEmbedding, MockDAO, service):
+        """
+        Teste l'instanciation d'un lot de playlists : une seule vectorisation, une seule
+        recherche groupée et une seule requête pour toutes les chansons.
+        """
+        MockDAO.return_value.index_pgvector = ""
+        index = MockIndex.return_value.get_index.return_value
+        index.__len__.return_value = 3
+        MockEmbedding.return_value.vectorise_many.return_value = [[1.0, 0.0], None, [0.0, 1.0]]
+        index.rechercher_lot.return_value = [[(1, 0.9), (2, 0.5)], [(2, 0.8), (3, 0.4)]]
+        MockDAO.return_value.get_chansons_from_ids.return_value = [
+            Chanson(titre, "Artiste", id_chanson=i)
+            for i, titre in ((1, "Un"), (2, "Deux"), (3, "Trois"))
+        ]
+
+        resultats = service.instantiate_playlists([("amour", 2), ("x", 3), ("pluie", 1)])
+
+        index.rechercher_lot.assert_called_once_with([[1.0, 0.0], [0.0, 1.0]], 2)
+        MockDAO.return_value.get_chansons_from_ids.assert_called_once_with([1, 2, 3])
+        assert [c.titre for c in resultats[0][0].chansons] == ["Un", "Deux"]
+        assert resultats[1] == (None, "La vectorisation du mot-clé a échoué")
+        assert [c.titre for c in resultats[2][0].chansons] == ["Deux"]
+
+    @patch("service.playlist_service.DAO_chanson")
+    @patch("service.playlist_service.RequestEmbeddingService")
+    @patch("service.playlist_service.IndexCatalogueService")
+    def test_instantiate_playlist_pgvector(self, MockIndex, MockEmbedding, MockDAO, service):
+        """
+        Avec pgvector, la playlist est obtenue par une seule requête SQL, sans index en mémoire.
+        """
+        MockDAO.return_value.index_pgvector = "hnsw"
+        MockEmbedding.return_value.vectorise.return_value = [1.0, 0.0]
+        MockDAO.return_value.get_chansons_proches.return_value = [Chanson("Un", "Artiste")]
+
+        playlist = service.instantiate_playlist("amour", 5)
+
+        MockDAO.return_value.get_chansons_proches.assert_called_once_with([1.0, 0.0], 5)
+        MockIndex.return_value.get_index.assert_not_called()
+        assert [c.titre for c in playlist.chansons] == ["Un"]
+
+    @patch("service.playlist_service.DAO_paroles")
+    @patch("service.playlist_service.DAO_chanson")
+    @patch("service.playlist_service.RequestEmbeddingService")
+    @patch("service.playlist_service.IndexCatalogueService")
+    def test_instantiate_playlist_hybride(
+        self, MockIndex, MockEmbedding, MockDAO, MockDAOParoles, monkeypatch
+    ):
+        """
+        En mode hybride, seuls les candidats de la recherche plein texte sont comparés.
+        """
+        monkeypatch.setenv("PLAYLIST_RECHERCHE", "hybride")
+        monkeypatch.setenv("FTS_CANDIDATS_MIN", "2")
+        MockDAOParoles.return_value.get_embeddings_fts.return_value = (
+            [4, 9, 2],
+            [[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]],
+            [1.0, 1.0, 2**0.5],
+        )
+        MockEmbedding.return_value.vectorise.return_value = [0.0, 1.0]
+        MockDAO.return_value.get_chansons_from_ids.return_value = [Chanson("Neuf", "Artiste")]
+
+        playlist = PlaylistService().instantiate_playlist("pluie", 2)
+
+        MockDAOParoles.return_value.get_embeddings_fts.assert_called_once_with("pluie", 1000)
+        MockDAO.return_value.get_chansons_from_ids.assert_called_once_with([9, 2])
+        MockIndex.return_value.get_index.assert_not_called()
+        assert [c.titre for c in playlist.chansons] == ["Neuf"]
+
+    @patch("service.playlist_service.DAO_paroles")
+    @patch("service.playlist_service.DAO_chanson")
+    @patch("service.playlist_service.RequestEmbeddingService")
+    @patch("service.playlist_service.IndexCatalogueService")
+    def test_instantiate_playlist_hybride_norme_absente(
+        self, MockIndex, MockEmbedding, MockDAO, MockDAOParoles, monkeypatch
+    ):
+        """
+        En mode hybride, une norme NULL en BD fait recalculer les normes des candidats.
+        """
+        monkeypatch.setenv("PLAYLIST_RECHERCHE", "hybride")
+        monkeypatch.setenv("FTS_CANDIDATS_MIN", "2")
+        MockDAOParoles.return_value.get_embeddings_fts.return_value = (
+            [4, 9, 2],
+            [[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]],
+            [1.0, None, 2**0.5],
+        )
+        MockEmbedding.return_value.vectorise.return_value = [0.0, 1.0]
+        MockDAO.return_value.get_chansons_from_ids.return_value = [Chanson("Neuf", "Artiste")]
+
+        PlaylistService().instantiate_playlist("pluie", 2)
+
+        MockDAO.return_value.get_chansons_from_ids.assert_called_once_with([9, 2])
+
+    @patch("service.playlist_service.DAO_paroles")
+    @patch("service.playlist_service.DAO_chanson")
+    @patch("service.playlist_service.RequestEmbeddingService")
+    @patch("service.playlist_service.IndexCatalogueService")
+    def test_instantiate_playlist_hybride_trop_peu_de_candidats(
+        self, MockIndex, MockEmbedding, MockDAO, MockDAOParoles, monkeypatch
+    ):
+        """
+        Avec trop peu de candidats lexicaux, la recherche porte sur tout le catalogue.
+        """
+        monkeypatch.setenv("PLAYLIST_RECHERCHE", "hybride")
+        MockDAO.return_value.index_pgvector = ""
+        MockDAOParoles.return_value.get_embeddings_fts.return_value = ([4], [[1.0, 0.0]], [1.0])
+        index = MockIndex.return_value.get_index.return_value
+        index.__len__.return_value = 3
+        index.rechercher.return_value = [(1, 0.9)]
+        MockEmbedding.return_value.vectorise.return_value = [0.0, 1.0]
+
+        PlaylistService().instantiate_playlist("pluie", 5)
+
+        index.rechercher.assert_called_once_with([0.0, 1.0], 5)
+        MockDAO.return_value.get_chansons_from_ids.assert_called_once_with([1])
+
+    def test_recherche_invalide(self, monkeypatch):
+        monkeypatch.setenv("PLAYLIST_RECHERCHE", "inconnue")
+
+        with pytest.raises(ValueError):
+            PlaylistService()
+
     ### 2. Tests de `add_chanson`
 
     def test_add_chanson_a_playlist_vide(self, service, playlist_vide, chanson_a):
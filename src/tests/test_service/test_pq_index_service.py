@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from service.exact_index_service import ExactIndexService
+from service.pq_index_service import PqIndexService
+
+
+class TestPqIndexService:
+    """Tests pour PqIndexService."""
+
+    @pytest.fixture
+    def vecteurs(self):
+        """Fixture : 1500 vecteurs de dimension 64 regroupés autour de 15 thèmes."""
+        generateur = np.random.default_rng(0)
+        themes = generateur.standard_normal((15, 64))
+        bruit = 0.2 * generateur.standard_normal((1500, 64))
+        return (themes[generateur.integers(0, 15, 1500)] + bruit).astype(np.float32)
+
+    @pytest.fixture
+    def index(self, vecteurs):
+        """Fixture pour créer un index PQ de 8 octets par vecteur."""
+        index = PqIndexService(nb_sous_espaces=8, nb_bits=6, graine=0)
+        index.construire(range(1500), vecteurs)
+        return index
+
+    def test_codes_compacts(self, index):
+        """Chaque vecteur est encodé sur nb_sous_espaces octets."""
+        assert index.codes.dtype == np.uint8
+        assert index.codes.shape == (1500, 8)
+        assert index.dictionnaires.shape == (8, 64, 8)
+
+    def test_scores_adc_proches_des_scores_exacts(self, index, vecteurs):
+        """L'estimation ADC approche la similarité cosinus réelle."""
+        exact = ExactIndexService()
+        exact.construire(range(1500), vecteurs)
+        requete = vecteurs[3]
+
+        ecart = np.abs(index.scores_adc(requete) - exact.scores(requete))
+
+        assert ecart.mean() < 0.05
+
+    def test_decoder_reconstruit_les_vecteurs(self, index, vecteurs):
+        """Les vecteurs décodés restent proches des vecteurs normalisés d'origine."""
+        normalises = vecteurs / np.linalg.norm(vecteurs, axis=1, keepdims=True)
+
+        reconstruits = index.decoder(index.codes)
+        cosinus = np.sum(reconstruits * normalises, axis=1) / np.linalg.norm(reconstruits, axis=1)
+
+        assert cosinus.mean() > 0.95
+
+    def test_reclassement_avec_vecteurs_complets(self, index, vecteurs):
+        """Reclasser tous les candidats redonne exactement la recherche exacte."""
+        exact = ExactIndexService()
+        exact.construire(range(1500), vecteurs)
+        index.reclassement = 300  # 5 * 300 candidats : tout le catalogue
+        index.lecteur_vecteurs = lambda ids: (ids, vecteurs[ids], None)
+
+        requete = vecteurs[7] + 0.05
+        resultats = index.rechercher(requete, 5)
+        attendus = exact.rechercher(requete, 5)
+
+        assert [i for i, _ in resultats] == [i for i, _ in attendus]
+        assert [s for _, s in resultats] == pytest.approx([s for _, s in attendus], abs=1e-5)
+
+    def test_sans_lecteur_pas_de_reclassement(self, index, vecteurs):
+        """Sans lecteur de vecteurs, les scores sont ceux de l'ADC."""
+        index.reclassement = 300
+        resultats = index.rechercher(vecteurs[0], 3)
+
+        scores_adc = index.scores_adc(vecteurs[0])
+        assert [score for _, score in resultats] == pytest.approx(
+            sorted(scores_adc, reverse=True)[:3]
+        )
+
+    def test_dimension_non_divisible(self):
+        """Le nombre de sous-espaces doit diviser la dimension."""
+        with pytest.raises(ValueError):
+            PqIndexService(nb_sous_espaces=3).construire([1, 2], [[1.0, 0.0], [0.0, 1.0]])
+
+    def test_rechercher_index_vide(self):
+        """Un index vide ne retourne aucun résultat."""
+        assert PqIndexService().rechercher([1.0, 0.0], 3) == []
+
+    def test_ajouter_et_supprimer(self, index, vecteurs):
+        """Un vecteur ajouté est encodé avec les dictionnaires existants."""
+        index.ajouter(9000, vecteurs[5])
+        index.supprimer(5)
+
+        resultats = [id_chanson for id_chanson, _ in index.rechercher(vecteurs[5], 5)]
+
+        assert 9000 in resultats
+        assert 5 not in resultats
+        assert index.codes.shape == (1501, 8)
+
+    def test_ajouter_avant_construction(self):
+        """Sans dictionnaires, un vecteur ne peut pas être encodé."""
+        with pytest.raises(ValueError):
+            PqIndexService(nb_sous_espaces=2).ajouter(1, [1.0, 0.0])
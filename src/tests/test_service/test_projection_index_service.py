@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+
+from service.exact_index_service import ExactIndexService
+from service.projection_index_service import ProjectionIndexService
+
+
+class TestProjectionIndexService:
+    """Tests pour ProjectionIndexService."""
+
+    @pytest.fixture
+    def vecteurs(self):
+        """Fixture : 2000 vecteurs de dimension 256 regroupés autour de 20 thèmes."""
+        generateur = np.random.default_rng(0)
+        themes = generateur.standard_normal((20, 256))
+        bruit = 0.3 * generateur.standard_normal((2000, 256))
+        return (themes[generateur.integers(0, 20, 2000)] + bruit).astype(np.float32)
+
+    @pytest.fixture
+    def exact(self, vecteurs):
+        """Fixture : index exact de référence."""
+        exact = ExactIndexService()
+        exact.construire(range(2000), vecteurs)
+        return exact
+
+    @pytest.mark.parametrize("methode", ["acp", "aleatoire"])
+    def test_rappel_proche_de_la_recherche_exacte(self, vecteurs, exact, methode):
+        """Les résultats reclassés retrouvent l'essentiel des voisins exacts."""
+        index = ProjectionIndexService(dimension=32, multiplicateur=10, methode=methode, graine=0)
+        index.construire(range(2000), vecteurs)
+        requetes = vecteurs[:20] + 0.1
+
+        trouves = 0
+        for requete in requetes:
+            attendus = {i for i, _ in exact.rechercher(requete, 10)}
+            trouves += len(attendus & {i for i, _ in index.rechercher(requete, 10)})
+
+        assert index.reduits.shape == (2000, 32)
+        assert trouves / 200 > 0.9
+
+    def test_scores_exacts_apres_reclassement(self, vecteurs, exact):
+        """Les scores retournés sont les similarités cosinus complètes."""
+        index = ProjectionIndexService(dimension=16, graine=0)
+        index.construire(range(2000), vecteurs)
+
+        resultats = index.rechercher(vecteurs[5], 5)
+        scores = exact.scores(vecteurs[5])
+
+        assert resultats[0][0] == 5
+        assert [s for _, s in resultats] == pytest.approx([scores[i] for i, _ in resultats])
+
+    def test_tout_reclasser_redonne_la_recherche_exacte(self, vecteurs, exact):
+        """Avec assez de candidats, le résultat est celui de l'index exact."""
+        index = ProjectionIndexService(dimension=8, multiplicateur=400, graine=0)
+        index.construire(range(2000), vecteurs)
+        requete = vecteurs[7] + 0.05
+
+        resultats = index.rechercher(requete, 5)
+        attendus = exact.rechercher(requete, 5)
+
+        assert [i for i, _ in resultats] == [i for i, _ in attendus]
+
+    def test_rechercher_lot(self, vecteurs):
+        """La recherche par lot donne les mêmes résultats que les recherches une à une."""
+        index = ProjectionIndexService(dimension=32, graine=0)
+        index.construire(range(2000), vecteurs)
+
+        lot = index.rechercher_lot(vecteurs[:3], 4)
+
+        assert lot == [index.rechercher(v, 4) for v in vecteurs[:3]]
+
+    def test_ajouter_supprimer_compacte(self, vecteurs):
+        """Les ajouts utilisent la projection existante, les suppressions sont filtrées."""
+        index = ProjectionIndexService(dimension=32, multiplicateur=50, graine=0)
+        index.construire(range(1000), vecteurs[:1000])
+        projection = index.projection
+
+        index.ajouter(1500, vecteurs[1500])
+        index.supprimer(3)
+
+        assert index.rechercher(vecteurs[1500], 1)[0][0] == 1500
+        assert 3 not in [i for i, _ in index.rechercher(vecteurs[3], 5)]
+        compacte = index.compacte(index.etat())
+        assert len(compacte) == 1000
+        assert compacte.projection is projection
+        assert compacte.rechercher(vecteurs[1500], 1)[0][0] == 1500
+
+    def test_projection_sauvegardee(self, vecteurs, tmp_path):
+        """Une projection apprise hors ligne est rechargée sans réapprentissage."""
+        index = ProjectionIndexService(dimension=16, graine=0)
+        index.construire(range(2000), vecteurs)
+        chemin = str(tmp_path / "projection.npz")
+        index.sauvegarder_projection(chemin)
+
+        recharge = ProjectionIndexService()
+        recharge.charger_projection(chemin)
+        recharge.construire(range(2000), vecteurs)
+
+        assert recharge.dimension == 16
+        np.testing.assert_array_equal(recharge.projection, index.projection)
+        assert recharge.rechercher(vecteurs[9], 3) == index.rechercher(vecteurs[9], 3)
+
+    def test_ajouter_sans_projection(self):
+        """Un index jamais construit refuse les ajouts."""
+        with pytest.raises(ValueError):
+            ProjectionIndexService().ajouter(1, [1.0, 0.0])
+
+    def test_rechercher_index_vide(self):
+        """Un index vide ne retourne aucun résultat."""
+        assert ProjectionIndexService().rechercher([1.0, 0.0], 3) == []
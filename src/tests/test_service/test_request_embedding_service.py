@@ -1,5 +1,30 @@
+import json
+
 import pytest
-from service.request_embedding_service import RequestEmbeddingService
+from service.request_embedding_service import CacheMotsCles, RequestEmbeddingService
+from utils.cache_lru import CacheLRU
+from utils.session_http import SessionHttp
+from utils.singleton import Singleton
+
+
+@pytest.fixture(autouse=True)
+def cache_vide():
+    """Chaque test repart d'un cache de mots-clés vide."""
+    Singleton._instances.pop(CacheMotsCles, None)
+    yield
+    Singleton._instances.pop(CacheMotsCles, None)
+
+
+class ReponseApi:
+    """Réponse simulée de l'API d'embedding : un vecteur par texte envoyé."""
+
+    status_code = 200
+
+    def __init__(self, data):
+        self.textes = data["input"] if isinstance(data["input"], list) else [data["input"]]
+
+    def json(self):
+        return {"embeddings": [[float(len(texte)), 1.0] for texte in self.textes]}
 
 
 class TestRequestEmbeddingService:
@@ -108,4 +133,148 @@ class TestRequestEmbeddingService:
         
         assert abs(similarity_1_2 - similarity_2_1) < 0.0001, "La comparaison doit être symétrique"
         
-        print(f"\n Symétrie vérifiée: {similarity_1_2:.4f} = {similarity_2_1:.4f}")
\ No newline at end of file
+        print(f"\n Symétrie vérifiée: {similarity_1_2:.4f} = {similarity_2_1:.4f}")
+    def test_compare_avec_normes_connues(self, service):
+        """Test que les normes fournies donnent le même score que le calcul complet."""
+        vecteur1 = [3.0, 4.0]
+        vecteur2 = [4.0, 3.0]
+
+        similarity = service.compare(vecteur1, vecteur2, norme1=5.0, norme2=5.0)
+
+        assert abs(similarity - service.compare(vecteur1, vecteur2)) < 0.0001
+        assert abs(similarity - 0.96) < 0.0001
+
+    def test_vectorise_many_un_seul_appel(self, service, monkeypatch):
+        """Tous les textes sont envoyés en un seul appel à l'API."""
+        appels = []
+
+        class Reponse:
+            status_code = 200
+
+            def json(self):
+                return {"embeddings": [[1.0, 0.0], [0.0, 1.0]]}
+
+        def mock_post(url, headers=None, data=None):
+            appels.append(data)
+            return Reponse()
+
+        monkeypatch.setattr(SessionHttp(), "post", mock_post)
+
+        vecteurs = service.vectorise_many(["amour", "guerre"])
+
+        assert vecteurs == [[1.0, 0.0], [0.0, 1.0]]
+        assert len(appels) == 1
+
+    def test_vectorise_many_erreur(self, service, monkeypatch):
+        """En cas d'erreur de l'API, chaque texte reçoit None."""
+
+        def mock_post(url, headers=None, data=None):
+            raise ConnectionError("API indisponible")
+
+        monkeypatch.setattr(SessionHttp(), "post", mock_post)
+
+        assert service.vectorise_many(["amour", "guerre"]) == [None, None]
+
+    def test_vectorise_cache_hit(self, service, monkeypatch):
+        """Un mot-clé déjà vectorisé (après normalisation) ne repasse pas par l'API."""
+        appels = []
+
+        def mock_post(url, headers=None, data=None):
+            appels.append(json.loads(data))
+            return ReponseApi(appels[-1])
+
+        monkeypatch.setattr(SessionHttp(), "post", mock_post)
+
+        premier = service.vectorise("Amour")
+        second = RequestEmbeddingService().vectorise("  amour ")
+
+        assert premier == second == [5.0, 1.0]
+        assert len(appels) == 1
+        assert CacheMotsCles().statistiques()["hits"] == 1
+        assert CacheMotsCles().statistiques()["misses"] == 1
+
+    def test_vectorise_many_seulement_les_absents(self, service, monkeypatch):
+        """Seuls les mots-clés absents du cache sont envoyés à l'API."""
+        appels = []
+
+        def mock_post(url, headers=None, data=None):
+            appels.append(json.loads(data))
+            return ReponseApi(appels[-1])
+
+        monkeypatch.setattr(SessionHttp(), "post", mock_post)
+        service.vectorise("pluie")
+
+        vecteurs = service.vectorise_many(["pluie", "soleil", "nuit"])
+
+        assert vecteurs == [[5.0, 1.0], [6.0, 1.0], [4.0, 1.0]]
+        assert appels[-1]["input"] == ["soleil", "nuit"]
+
+    def test_vectorise_many_texte_original_envoye(self, service, monkeypatch):
+        """Seule la clé du cache est normalisée : l'API reçoit le texte saisi."""
+        appels = []
+
+        def mock_post(url, headers=None, data=None):
+            appels.append(json.loads(data))
+            return ReponseApi(appels[-1])
+
+        monkeypatch.setattr(SessionHttp(), "post", mock_post)
+
+        vecteurs = service.vectorise_many(["Pluie d'Été", "  pluie d'été ", "Soleil"])
+
+        assert len(appels) == 1
+        assert appels[0]["input"] == ["Pluie d'Été", "Soleil"]
+        assert vecteurs[0] == vecteurs[1]
+
+    def test_cache_desactive(self, service, monkeypatch):
+        """Avec EMBED_CACHE_TAILLE = 0, chaque appel passe par l'API."""
+        monkeypatch.setenv("EMBED_CACHE_TAILLE", "0")
+        appels = []
+
+        def mock_post(url, headers=None, data=None):
+            appels.append(json.loads(data))
+            return ReponseApi(appels[-1])
+
+        monkeypatch.setattr(SessionHttp(), "post", mock_post)
+
+        service.vectorise("amour")
+        service.vectorise("amour")
+
+        assert len(appels) == 2
+
+
+class TestCacheLRU:
+    """Tests pour CacheLRU."""
+
+    def test_eviction_lru(self):
+        """L'entrée la moins récemment utilisée est évincée en premier."""
+        cache = CacheLRU(taille_max=2)
+        cache.set("a", [1.0])
+        cache.set("b", [2.0])
+        cache.get("a")
+        cache.set("c", [3.0])
+
+        assert cache.get("b") is None
+        assert cache.get("a") == [1.0]
+        assert len(cache) == 2
+
+    def test_ttl(self, monkeypatch):
+        """Une entrée expirée est considérée comme absente."""
+        horloge = [100.0]
+        monkeypatch.setattr("utils.cache_lru.time.monotonic", lambda: horloge[0])
+        cache = CacheLRU(ttl=10)
+        cache.set("a", [1.0])
+
+        horloge[0] = 111.0
+
+        assert cache.get("a") is None
+        assert cache.statistiques()["misses"] == 1
+
+    def test_limite_en_octets(self):
+        """Le cache évince des entrées pour rester sous sa taille maximale en octets."""
+        cache = CacheLRU(octets_max=16)
+        cache.set("a", [1.0, 2.0])
+        cache.set("b", [3.0, 4.0])
+        cache.set("c", [5.0, 6.0])
+
+        assert cache.octets == 16
+        assert cache.get("a") is None
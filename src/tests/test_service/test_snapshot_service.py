@@ -0,0 +1,80 @@
+import json
+
+import numpy as np
+import pytest
+
+from service.exact_index_service import ExactIndexService
+from service.snapshot_service import SnapshotService
+
+
+class TestSnapshotService:
+    """Tests pour SnapshotService."""
+
+    @pytest.fixture
+    def snapshot(self, tmp_path):
+        """Fixture pour créer un instantané de trois vecteurs."""
+        snapshot = SnapshotService(str(tmp_path))
+        snapshot.ecrire([10, 20, 30], [[1.0, 0.0], [0.0, 2.0], [3.0, 3.0]], None, (3, 30))
+        return snapshot
+
+    def test_ecrire_manifest(self, snapshot):
+        """Le manifest enregistre la génération du catalogue et la taille de la matrice."""
+        manifest = snapshot.lire_manifest()
+
+        assert manifest["signature"] == [3, 30]
+        assert manifest["nb_chansons"] == 3
+        assert manifest["dimension"] == 2
+
+    def test_charger_memmap_normalise(self, snapshot):
+        """La matrice est ouverte en memmap, en float32 et de lignes unitaires."""
+        ids, matrice = snapshot.charger((3, 30))
+
+        assert isinstance(matrice, np.memmap)
+        assert matrice.dtype == np.float32
+        assert np.allclose(np.linalg.norm(matrice, axis=1), 1.0)
+        assert list(ids) == [10, 20, 30]
+
+    def test_charger_perime(self, snapshot):
+        """Un instantané écrit pour une autre génération du catalogue est ignoré."""
+        assert snapshot.charger((4, 31)) is None
+
+    def test_charger_autre_generation(self, tmp_path):
+        """Mêmes nombre de chansons et id max, mais catalogue rechargé : instantané ignoré."""
+        snapshot = SnapshotService(str(tmp_path))
+        snapshot.ecrire([10, 20], [[1.0, 0.0], [0.0, 1.0]], [1.0, 1.0], (2, 20, "g1"))
+
+        assert snapshot.charger((2, 20, "g2")) is None
+        assert snapshot.charger((2, 20, "g1")) is not None
+
+    def test_charger_absent(self, tmp_path):
+        """Sans manifest, il n'y a pas d'instantané."""
+        assert SnapshotService(str(tmp_path)).charger((3, 30)) is None
+
+    def test_charger_manifest_invalide(self, snapshot):
+        """Un manifest d'un autre format est ignoré."""
+        with open(snapshot.chemin_manifest, "w", encoding="utf-8") as fichier:
+            json.dump({"format": 0}, fichier)
+
+        assert snapshot.charger() is None
+
+    def test_ecrire_supprime_les_anciennes_versions(self, snapshot, tmp_path):
+        """Seuls les fichiers de la version précédente sont supprimés, pas les autres .npy."""
+        # GIVEN
+        autre = tmp_path / "autre.npy"
+        np.save(autre, np.zeros(2))
+
+        # WHEN
+        snapshot.ecrire([10], [[1.0, 0.0]], [1.0], (1, 10))
+
+        # THEN
+        fichiers = sorted(p.name for p in tmp_path.glob("*.npy"))
+        manifest = snapshot.lire_manifest()
+        assert fichiers == sorted(["autre.npy", manifest["embeddings"], manifest["ids"]])
+
+    def test_charger_index(self, snapshot):
+        """L'index exact lit la matrice de l'instantané sans la copier."""
+        index = snapshot.charger_index((3, 30))
+
+        assert isinstance(index, ExactIndexService)
+        assert isinstance(index.matrice, np.memmap)
+        assert [id_chanson for id_chanson, _ in index.rechercher([1.0, 0.1], 3)] == [10, 30, 20]
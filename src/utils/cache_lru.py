@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+class CacheLRU:
+    """
+    Cache de vecteurs en mémoire, borné en nombre d'entrées et éventuellement en octets.
+    Les entrées les moins récemment utilisées sont évincées en premier (LRU) et une entrée
+    plus ancienne que ttl secondes est considérée comme absente. Les vecteurs sont stockés
+    en float32. Le cache peut être partagé entre threads.
+
+    Attributs
+    ---------
+    taille_max : int
+        nombre maximal d'entrées
+    ttl : float ou None
+        durée de vie d'une entrée en secondes (None = illimitée)
+    octets_max : int ou None
+        taille maximale des vecteurs stockés en octets (None = illimitée)
+    hits, misses : int
+        nombre de lectures trouvées et manquées
+    """
+
+    def __init__(self, taille_max: int = 1024, ttl: float = None, octets_max: int = None):
+        if taille_max < 1:
+            raise ValueError("taille_max doit être supérieur ou égal à 1")
+        self.taille_max = taille_max
+        self.ttl = ttl
+        self.octets_max = octets_max
+        self.hits = 0
+        self.misses = 0
+        self.octets = 0
+        self._entrees = OrderedDict()  # clé -> (date d'expiration, vecteur float32)
+        self._verrou = threading.Lock()
+
+    def get(self, cle) -> list[float] | None:
+        """
+        Retourne le vecteur associé à la clé, ou None s'il est absent ou expiré.
+        """
+        with self._verrou:
+            entree = self._entrees.get(cle)
+            if entree is not None and entree[0] is not None and entree[0] < time.monotonic():
+                self._retirer(cle)
+                entree = None
+            if entree is None:
+                self.misses += 1
+                return None
+            self._entrees.move_to_end(cle)
+            self.hits += 1
+            return entree[1].tolist()
+
+    def set(self, cle, vecteur: list[float]) -> None:
+        """
+        Enregistre le vecteur puis évince les entrées les plus anciennes si nécessaire.
+        Un vecteur plus gros que octets_max n'est pas mis en cache.
+        """
+        vecteur = np.asarray(vecteur, dtype=np.float32)
+        if self.octets_max is not None and vecteur.nbytes > self.octets_max:
+            return
+        expiration = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._verrou:
+            if cle in self._entrees:
+                self._retirer(cle)
+            self._entrees[cle] = (expiration, vecteur)
+            self.octets += vecteur.nbytes
+            while len(self._entrees) > self.taille_max or (
+                self.octets_max is not None and self.octets > self.octets_max
+            ):
+                self._retirer(next(iter(self._entrees)))
+
+    def vider(self) -> None:
+        """
+        Supprime toutes les entrées et remet les compteurs à zéro.
+        """
+        with self._verrou:
+            self._entrees.clear()
+            self.octets = 0
+            self.hits = 0
+            self.misses = 0
+
+    def statistiques(self) -> dict:
+        """
+        Retourne le nombre d'entrées, d'octets stockés, de hits et de misses.
+        """
+        with self._verrou:
+            return {
+                "entrees": len(self._entrees),
+                "octets": self.octets,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entrees)
+
+    def _retirer(self, cle) -> None:
+        """
+        Retire une entrée (le verrou doit être tenu).
+        """
+        _, vecteur = self._entrees.pop(cle)
+        self.octets -= vecteur.nbytes
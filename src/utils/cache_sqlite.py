@@ -0,0 +1,93 @@
+import hashlib
+import os
+import sqlite3
+import threading
+
+from utils.embedding_binaire import decoder_float32, encoder_float32
+
+
+class CacheSQLite:
+    """
+    Cache persistant d'embeddings adressé par contenu, dans un fichier SQLite.
+    La clé est l'empreinte SHA-256 du nom du modèle et du texte : un même texte vectorisé
+    par le même modèle n'est jamais revectorisé, même après un rechargement de la BD.
+    Les vecteurs sont stockés en float32 little-endian.
+    """
+
+    def __init__(self, chemin: str):
+        dossier = os.path.dirname(chemin)
+        if dossier:
+            os.makedirs(dossier, exist_ok=True)
+        self.chemin = chemin
+        self._verrou = threading.Lock()
+        self._connexion = sqlite3.connect(chemin, check_same_thread=False)
+        with self._verrou, self._connexion:
+            self._connexion.execute("PRAGMA journal_mode=WAL;")
+            self._connexion.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                cle TEXT PRIMARY KEY,
+                modele TEXT NOT NULL,
+                vecteur BLOB NOT NULL
+                );
+                """)
+
+    @staticmethod
+    def cle(modele: str, texte: str) -> str:
+        """
+        Empreinte d'un texte pour un modèle donné.
+        """
+        return hashlib.sha256(f"{modele}\0{texte}".encode("utf-8")).hexdigest()
+
+    def get(self, modele: str, texte: str) -> list[float] | None:
+        """
+        Retourne l'embedding enregistré du texte, ou None s'il est absent.
+        """
+        return self.get_many(modele, [texte])[0]
+
+    def get_many(self, modele: str, textes: list[str]) -> list:
+        """
+        Retourne les embeddings enregistrés des textes, dans le même ordre (None si absent).
+        """
+        cles = [self.cle(modele, texte) for texte in textes]
+        trouves = {}
+        with self._verrou:
+            # Requêtes par paquets pour rester sous la limite de paramètres de SQLite
+            for debut in range(0, len(cles), 500):
+                paquet = list(dict.fromkeys(cles[debut : debut + 500]))
+                lignes = self._connexion.execute(
+                    "SELECT cle, vecteur FROM embeddings WHERE cle IN "
+                    f"({', '.join('?' * len(paquet))});",
+                    paquet,
+                ).fetchall()
+                trouves.update(lignes)
+        return [
+            decoder_float32(trouves[cle]).tolist() if cle in trouves else None for cle in cles
+        ]
+
+    def set(self, modele: str, texte: str, vecteur: list[float]) -> None:
+        """
+        Enregistre l'embedding d'un texte.
+        """
+        self.set_many(modele, [texte], [vecteur])
+
+    def set_many(self, modele: str, textes: list[str], vecteurs: list) -> None:
+        """
+        Enregistre les embeddings de plusieurs textes en une seule transaction.
+        Les vecteurs None sont ignorés.
+        """
+        lignes = [
+            (self.cle(modele, texte), modele, encoder_float32(vecteur))
+            for texte, vecteur in zip(textes, vecteurs)
+            if vecteur is not None
+        ]
+        if not lignes:
+            return
+        with self._verrou, self._connexion:
+            self._connexion.executemany(
+                "INSERT OR REPLACE INTO embeddings (cle, modele, vecteur) VALUES (?, ?, ?);",
+                lignes,
+            )
+
+    def __len__(self) -> int:
+        with self._verrou:
+            return self._connexion.execute("SELECT count(*) FROM embeddings;").fetchone()[0]
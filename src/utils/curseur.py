@@ -0,0 +1,19 @@
+import base64
+import binascii
+
+
+def encoder_curseur(id_dernier: int) -> str:
+    """Encode l'identifiant du dernier élément d'une page en curseur opaque (base64 url)"""
+    return base64.urlsafe_b64encode(f"id:{id_dernier}".encode()).decode().rstrip("=")
+
+
+def decoder_curseur(curseur: str) -> int:
+    """Retrouve l'identifiant encodé dans un curseur ; lève ValueError s'il est invalide"""
+    try:
+        texte = base64.urlsafe_b64decode(curseur + "=" * (-len(curseur) % 4)).decode()
+    except (binascii.Error, UnicodeDecodeError):
+        raise ValueError("curseur invalide")
+    prefixe, _, id_dernier = texte.partition(":")
+    if prefixe != "id" or not id_dernier.isdigit():
+        raise ValueError("curseur invalide")
+    return int(id_dernier)
@@ -0,0 +1,23 @@
+import numpy as np
+
+# Format de stockage compact des embeddings : float32 little-endian (4 octets par valeur)
+FORMAT_FLOAT32 = np.dtype("<f4")
+
+
+def encoder_float32(vecteur) -> bytes:
+    """Encode un embedding en octets float32 little-endian (colonne bytea)"""
+    return np.asarray(vecteur, dtype=FORMAT_FLOAT32).tobytes()
+
+
+def decoder_float32(donnees) -> np.ndarray:
+    """Décode une colonne bytea float32 en tableau NumPy, sans analyse valeur par valeur"""
+    return np.frombuffer(donnees, dtype=FORMAT_FLOAT32)
+
+
+def decoder_matrice_float32(liste_donnees: list) -> np.ndarray:
+    """Décode plusieurs embeddings bytea de même dimension en une seule matrice (n, d)"""
+    if not liste_donnees:
+        return np.empty((0, 0), dtype=FORMAT_FLOAT32)
+    return np.frombuffer(b"".join(liste_donnees), dtype=FORMAT_FLOAT32).reshape(
+        len(liste_donnees), -1
+    )
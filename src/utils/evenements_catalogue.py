@@ -0,0 +1,81 @@
+import logging
+import weakref
+
+from utils.singleton import Singleton
+
+
+class EvenementCatalogue:
+    """
+    Changement du catalogue des chansons, publié par la couche DAO après le commit.
+
+    Attributs
+    ---------
+    type_evenement : str
+        AJOUT, SUPPRESSION ou VIDAGE (table CHANSON vidée ou supprimée)
+    id_chanson : int ou None
+        identifiant de la chanson ajoutée ou supprimée
+    vecteur : list[float] ou None
+        embedding enregistré de la chanson ajoutée
+    norme : float ou None
+        norme enregistrée de l'embedding
+    paroles : str ou None
+        texte des paroles de la chanson ajoutée
+    """
+
+    AJOUT = "ajout"
+    SUPPRESSION = "suppression"
+    VIDAGE = "vidage"
+
+    def __init__(
+        self,
+        type_evenement: str,
+        id_chanson: int = None,
+        vecteur=None,
+        norme=None,
+        paroles: str = None,
+    ):
+        self.type_evenement = type_evenement
+        self.id_chanson = id_chanson
+        self.vecteur = vecteur
+        self.norme = norme
+        self.paroles = paroles
+
+
+class BusCatalogue(metaclass=Singleton):
+    """
+    Diffuse les changements du catalogue aux abonnés du processus (index en mémoire...).
+    Les méthodes abonnées sont référencées faiblement : un abonné détruit est oublié.
+    """
+
+    def __init__(self):
+        self._abonnes = []
+
+    def abonner(self, callback) -> None:
+        """
+        Abonne une fonction ou une méthode, appelée avec chaque EvenementCatalogue.
+        """
+        if hasattr(callback, "__self__"):
+            self._abonnes.append(weakref.WeakMethod(callback))
+        else:
+            self._abonnes.append(lambda: callback)
+
+    def desabonner(self, callback) -> None:
+        """
+        Désabonne une fonction ou une méthode.
+        """
+        self._abonnes = [ref for ref in self._abonnes if ref() not in (None, callback)]
+
+    def publier(self, evenement: EvenementCatalogue) -> None:
+        """
+        Transmet l'évènement à tous les abonnés.
+        L'erreur d'un abonné est journalisée sans empêcher l'écriture en BD déjà validée.
+        """
+        self._abonnes = [ref for ref in self._abonnes if ref() is not None]
+        for ref in list(self._abonnes):
+            callback = ref()
+            if callback is None:
+                continue
+            try:
+                callback(evenement)
+            except Exception as e:
+                logging.error(f"Erreur lors du traitement d'un évènement du catalogue : {e}")
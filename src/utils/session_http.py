@@ -0,0 +1,58 @@
+import os
+
+import dotenv
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.singleton import Singleton
+
+
+class SessionHttp(metaclass=Singleton):
+    """
+    Session HTTP partagée par tous les appels sortants du processus (API d'embedding, LRCLIB).
+    Les connexions sont gardées ouvertes (keep-alive) et réutilisées d'un appel à l'autre :
+    la poignée de main TCP + TLS n'est faite qu'une fois par connexion.
+
+    Configurée par variables d'environnement (fichier .env) :
+    - HTTP_CONNEXIONS_PAR_HOTE : nombre de connexions gardées ouvertes vers un même hôte ;
+      au-delà, un appel ouvre une connexion supplémentaire, fermée après usage, plutôt que
+      d'attendre sans limite qu'une connexion du pool se libère
+    - HTTP_TIMEOUT_CONNEXION : délai maximal d'établissement d'une connexion, en secondes
+    - HTTP_TIMEOUT_LECTURE : délai maximal d'attente de la réponse, en secondes
+    """
+
+    def __init__(self):
+        dotenv.load_dotenv(override=True)
+        connexions_par_hote = int(os.environ.get("HTTP_CONNEXIONS_PAR_HOTE", 10))
+        self.timeout = (
+            float(os.environ.get("HTTP_TIMEOUT_CONNEXION", 5)),
+            float(os.environ.get("HTTP_TIMEOUT_LECTURE", 60)),
+        )
+        self.session = requests.Session()
+        # Pas de pool_block : requests ne borne pas l'attente d'une connexion libre, un appel
+        # pourrait attendre indéfiniment (sans timeout) derrière des réponses lentes
+        adaptateur = HTTPAdapter(
+            pool_connections=4, pool_maxsize=connexions_par_hote, pool_block=False
+        )
+        self.session.mount("https://", adaptateur)
+        self.session.mount("http://", adaptateur)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        Requête GET sur une connexion du pool, avec les timeouts configurés par défaut.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.get(url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """
+        Requête POST sur une connexion du pool, avec les timeouts configurés par défaut.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.post(url, **kwargs)
+
+    def fermer(self) -> None:
+        """
+        Ferme toutes les connexions du pool.
+        """
+        self.session.close()
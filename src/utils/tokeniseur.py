@@ -0,0 +1,36 @@
+import re
+import unicodedata
+
+# Mots trop fréquents en français et en anglais pour distinguer des paroles
+MOTS_VIDES = frozenset(
+    """
+    a au aux avec ce ces cet cette dans de des du elle en et eux il ils je la le les leur lui
+    ma mais me mes moi mon ne nos notre nous on ou par pas pour qu que qui sa se ses son sur ta
+    te tes toi ton tu un une vos votre vous y c d j l m n s t est suis es sont ai as
+    an and are as at be but by for from he her him his i if in into is it its me my no not of
+    on or our she so that the their them they this to was we were what when with you your
+    oh ooh yeah
+    """.split()
+)
+
+_MOT = re.compile(r"[a-z0-9]+")
+
+
+def normaliser(texte: str) -> str:
+    """
+    Met un texte en minuscules et retire les accents (é -> e, ç -> c, œ -> oe...).
+    """
+    texte = texte.lower().replace("œ", "oe").replace("æ", "ae")
+    decompose = unicodedata.normalize("NFKD", texte)
+    return "".join(c for c in decompose if not unicodedata.combining(c))
+
+
+def tokeniser(texte: str) -> list[str]:
+    """
+    Découpe des paroles (françaises ou anglaises) en termes : minuscules sans accents,
+    apostrophes et ponctuation comme séparateurs (l'amour -> amour, don't -> don),
+    mots vides et lettres isolées retirés.
+    """
+    return [
+        mot for mot in _MOT.findall(normaliser(texte)) if len(mot) > 1 and mot not in MOTS_VIDES
+    ]
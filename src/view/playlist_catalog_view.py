@@ -12,16 +12,24 @@ class PlaylistCatalogView(AbstractView):
         self.list_playlist_noms = ["Quitter"]
         
         try:
-            # Récupère la liste de toutes les playlists
-            response = requests.get("http://0.0.0.0:5000/playlists")
-            response.raise_for_status() 
-            
-            playlists_data = response.json()
-            
-            # Ajoute les noms des playlists à la liste
-            for playlist in playlists_data:
-                if playlist['nom'] not in playlist:
-                    self.list_playlist_noms.append(playlist['nom'])
+            # Récupère la liste de toutes les playlists, page par page
+            params = {"include": "", "limit": 1000}
+            while True:
+                response = requests.get("http://0.0.0.0:5000/playlists", params=params)
+                response.raise_for_status() 
+                
+                playlists_data = response.json()
+                
+                # Ajoute les noms des playlists à la liste
+                for playlist in playlists_data:
+                    if playlist['nom'] not in playlist:
+                        self.list_playlist_noms.append(playlist['nom'])
+
+                # Curseur de la page suivante, absent à la dernière page
+                curseur = response.headers.get("X-Next-Cursor")
+                if not curseur:
+                    break
+                params["after"] = curseur
 
         except requests.exceptions.RequestException as e:
             print(f"Erreur lors de la récupération des playlists : {e}")
@@ -67,7 +75,7 @@ class PlaylistDetailView(AbstractView):
         try:
             # Appelle l'endpoint pour récupérer les chansons de cette playlist
             url = f"http://0.0.0.0:5000/playlists/{self.nom_playlist}/songs"
-            response = requests.get(url)
+            response = requests.get(url, params={"include": ""})
             response.raise_for_status()
             
             chansons = response.json()
@@ -6,11 +6,8 @@ from view.abstract_view import AbstractView
 
 class SongCatalogArtist(AbstractView):
     def __init__(self):
-        allsongs = requests.get("http://0.0.0.0:5000/chansons/").json()
-        songs = ["Quitter"]
-        for song in allsongs:
-            if song["artiste"] not in songs:
-                songs.append(song["artiste"])
+        artistes = requests.get("http://0.0.0.0:5000/chansons/artistes").json()
+        songs = ["Quitter"] + artistes
 
         self.__questions = [
             {
@@ -38,11 +35,10 @@ class SongCatalogArtist(AbstractView):
 class SongCatalogTitle(AbstractView):
     def __init__(self, artiste):
         self.__artiste = artiste
-        allsongs = requests.get("http://0.0.0.0:5000/chansons/").json()
-        songs = ["Quitter"]
-        for song in allsongs:
-            if song["artiste"] == artiste:
-                songs.append(song["titre"])
+        titres = requests.get(
+            "http://0.0.0.0:5000/chansons/titres", params={"artiste": artiste}
+        ).json()
+        songs = ["Quitter"] + titres
 
         self.__questions = [
             {
@@ -3,7 +3,7 @@ from client.chanson_client import ChansonClient
 from dao.dao import DAO
 
 DAO()._drop_table()
-DAO()
+DAO().migrer_schema()
 
 musiques = [
 ["Bohemian Rhapsody","Queen"],
@@ -39,11 +39,10 @@ musiques = [
 ["Highway to Hell","AC/DC"],
 ]
 
-i=0
-for musique in musiques:
-    ChansonClient().add_new_chanson(musique[0], musique[1])
-    i=i+1
-    print(i)
+# Les paroles sont vectorisées par lots plutôt qu'une chanson à la fois
+messages = ChansonClient().add_new_chansons(musiques)
+for i, (musique, message) in enumerate(zip(musiques, messages), start=1):
+    print(i, musique[0], message or "")
 
 # chansons = ChansonClient().get_chansons()
 